@@ -1,18 +1,27 @@
 from api.models import (
     ChatRequest, ChatResponse,
-    IndexRequest, IndexResponse,
-    HealthResponse, CacheResponse
+    IndexRequest, IndexResponse, IndexJobResponse,
+    HealthResponse, CacheResponse, CacheStatsResponse,
+    GraphNodeResponse, GraphRelationResponse, GraphQueryRequest, GraphQueryResponse
 )
 from core.container import get_container
-from core.graphrag import answer_question, clear_cache, summarize_question
+from core.graphrag import answer_question, cache_stats, clear_cache, summarize_question
 from core.graphrag import stream_answer
-from core.chunker import ingest_folder
+from core.code_exceptions import GraphQueryError, IndexJobConflict
+from core.graph_query import RELATIONS, get_query_engine
+from core.index_jobs import get_index_jobs
+from core.startup import startup_status
+from core.write_behind import get_write_behind
 import chromadb
 import os
 import json
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 from pathlib import Path
 
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
 # Phoenix instrumentation
 from observability.tracing import trace_span
 from observability.rag import log_rag_event, record_generation_metrics
@@ -41,15 +50,31 @@ def save_chat_history(history: List[Dict]):
         pass
 
 
+def append_chat_history(items: List[Dict]):
+    """Append a batch of items with one read and one write of the history file."""
+    history = load_chat_history()
+    history.extend(items)
+    save_chat_history(history)
+
+
+# History file writes run on the write-behind queue, off the request path
+get_write_behind().register("history.append", append_chat_history)
+
+
 class ChatHistoryController:
     @trace_span("rag.history.get")
     def get_history(self):
+        # Read-your-writes: apply any queued appends before reading the file
+        get_write_behind().flush(timeout=2.0)
         return load_chat_history()
 
     @trace_span("rag.history.add")
     def add_history(self, item: Dict):
         # Summarize title if it's the raw question
         title = item.get("title", "")
+        # Keep what was actually asked; cache warm-up reads it back
+        if title and not item.get("question"):
+            item["question"] = title
         # Heuristic: if title is long (> 30 chars) or looks like a question, summarize it
         if len(title) > 30 or "?" in title:
             try:
@@ -58,9 +83,8 @@ class ChatHistoryController:
             except Exception:
                 pass # Keep original if summarization fails
         
-        history = load_chat_history()
-        history.append(item)
-        save_chat_history(history)
+        if not get_write_behind().submit("history.append", item):
+            append_chat_history([item])
         return item
 
 
@@ -84,7 +108,10 @@ class ChatController:
             )
 
             # ----- Run RAG pipeline -----
-            result = answer_question(
+            # Off the event loop so concurrent requests can overlap and be
+            # coalesced by the single-flight layer in answer_question().
+            result = await run_in_threadpool(
+                answer_question,
                 req.message,
                 bypass_cache=req.bypass_cache,
                 llm_overrides={
@@ -150,26 +177,109 @@ class IndexController:
     @trace_span("rag.controller.index")
     async def run(self, req: IndexRequest) -> IndexResponse:
         """
-        Takes a folder path, chunk + embed + index its files.
+        Enqueues a background job that chunks + embeds + indexes a folder.
+        Poll /api/index/jobs/{job_id} for progress.
         """
-        path = req.path
-        indexed_files, chunks = ingest_folder(path)
-        return IndexResponse(
-            indexed_files=indexed_files,
-            chunks_processed=chunks
-        )
+        try:
+            job = get_index_jobs().submit(req.path, rebuild=req.rebuild)
+        except IndexJobConflict as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+        return IndexResponse(job_id=job.id, status=job.status)
+
+    @trace_span("rag.controller.index.job")
+    def job(self, job_id: str) -> IndexJobResponse:
+        """
+        Returns status and progress of an indexing job.
+        """
+        job = get_index_jobs().get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown indexing job {job_id}")
+        return IndexJobResponse(**job.snapshot())
+
+    @trace_span("rag.controller.index.jobs")
+    def jobs(self) -> List[IndexJobResponse]:
+        """
+        Lists recent indexing jobs, newest first.
+        """
+        return [IndexJobResponse(**job.snapshot()) for job in get_index_jobs().list()]
+
+    @trace_span("rag.controller.index.cancel")
+    def cancel(self, job_id: str) -> IndexJobResponse:
+        """
+        Requests cancellation of an indexing job.
+        """
+        job = get_index_jobs().cancel(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown indexing job {job_id}")
+        return IndexJobResponse(**job.snapshot())
 
 
 class HealthController:
     @trace_span("rag.controller.health")
     def status(self) -> HealthResponse:
         """
-        Simple health endpoint.
+        Simple health endpoint; services still cold report as "cold".
         """
+        startup = startup_status()
+        chroma = startup["services"].get("chroma", {})
         return HealthResponse(
             status="ok",
-            vector_db_status="ready",
-            graph_status="connected"
+            vector_db_status="ready" if chroma.get("ready") else "cold",
+            graph_status="connected",
+            startup=startup,
+        )
+
+
+class GraphController:
+    @trace_span("rag.controller.graph.node")
+    def node(self, node_id: str) -> GraphNodeResponse:
+        """
+        Returns a knowledge-graph node by id or unambiguous short name.
+        """
+        engine = get_query_engine()
+        resolved = engine.resolve(node_id)
+        node = engine.graph.node(resolved) if resolved else None
+        if node is None:
+            raise HTTPException(status_code=404, detail=f"Unknown graph node {node_id}")
+        return GraphNodeResponse(**node)
+
+    @trace_span("rag.controller.graph.relation")
+    def relation(self, relation: str, node_id: str, transitive: bool = False,
+                 limit: Optional[int] = None) -> GraphRelationResponse:
+        """
+        Structural lookup (callers, importers, dependents, ...) answered from the graph.
+        """
+        if relation not in RELATIONS:
+            raise HTTPException(status_code=404, detail=f"Unknown relation {relation}; expected one of {', '.join(RELATIONS)}")
+        t0 = time.perf_counter()
+        engine = get_query_engine()
+        resolved = engine.resolve(node_id)
+        if resolved is None and relation in ("importers", "dependents") and engine.is_imported(node_id):
+            resolved = node_id
+        if resolved is None:
+            raise HTTPException(status_code=404, detail=f"Unknown or ambiguous graph node {node_id}")
+        results = engine.relation(relation, resolved, transitive)
+        return GraphRelationResponse(
+            relation=relation,
+            node=resolved,
+            transitive=transitive,
+            count=len(results),
+            results=results[:limit] if limit else results,
+            elapsed_ms=(time.perf_counter() - t0) * 1000,
+        )
+
+    @trace_span("rag.controller.graph.query")
+    def query(self, req: GraphQueryRequest) -> GraphQueryResponse:
+        """
+        Runs a statement of the supported Cypher subset against the local graph.
+        """
+        t0 = time.perf_counter()
+        try:
+            result = get_query_engine().cypher(req.query, req.limit)
+        except GraphQueryError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return GraphQueryResponse(
+            columns=result.columns, rows=result.rows, elapsed_ms=(time.perf_counter() - t0) * 1000
         )
 
 
@@ -185,6 +295,16 @@ class CacheController:
         except Exception:
             return CacheResponse(status="error", cleared=False)
 
+    @trace_span("rag.controller.cache.stats")
+    def stats(self) -> CacheStatsResponse:
+        """
+        Returns semantic cache hit/miss counters and size.
+        """
+        try:
+            return CacheStatsResponse(**cache_stats())
+        except Exception:
+            return CacheStatsResponse(status="error")
+
 
 from starlette.responses import StreamingResponse
 
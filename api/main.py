@@ -1,15 +1,77 @@
 # api/main.py
 
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routes import router
 from core.ratelimit import RateLimitMiddleware
+from core.write_behind import get_write_behind
+from core.index_watcher import start_index_watcher
+from core.index_jobs import shutdown_index_jobs
+from core.startup import warm_up
+from core.graph_expansion import close_expander
+from config.settings import CacheConfig, IndexConfig, StartupConfig
 from observability.tracing import instrument_fastapi
 from observability.tracing.tracer import tracer_provider
 from observability.logging import get_json_logger
 import os
 
+
+def _warm_semantic_cache(config: CacheConfig) -> None:
+    """Preload cached answers into memory and optionally precompute more."""
+    from core.graphrag import preload_cache
+
+    if config.preload:
+        try:
+            preload_cache()
+        except Exception:
+            logger.exception("Semantic cache preload failed")
+
+    if config.warmup_file:
+        from core.cache_warmup import load_question_file, warm_cache
+
+        def _run() -> None:
+            try:
+                warm_cache(load_question_file(config.warmup_file))
+            except Exception:
+                logger.exception("Semantic cache warm-up failed")
+
+        # Generation is slow; don't hold up startup for it
+        threading.Thread(target=_run, name="cache-warmup", daemon=True).start()
+
+
+def _warm_services(startup: StartupConfig, cache: CacheConfig) -> None:
+    """Create the lazily initialized services, then warm the semantic cache."""
+    warm_up(startup.warmup, startup.budget_ms)
+    _warm_semantic_cache(cache)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup = StartupConfig.from_env()
+    if startup.background:
+        # Serve immediately; early requests initialize what they need themselves
+        threading.Thread(
+            target=_warm_services, args=(startup, CacheConfig.from_env()), name="startup-warmup", daemon=True
+        ).start()
+    else:
+        _warm_services(startup, CacheConfig.from_env())
+    # Keep the index in sync with INDEX_WATCH_PATHS, if configured
+    watcher = start_index_watcher(IndexConfig.from_env())
+    yield
+    if watcher is not None:
+        watcher.stop()
+    # Job processes are not daemons; stop them rather than wait for them
+    shutdown_index_jobs()
+    # Apply queued cache/history writes before the process exits
+    get_write_behind().shutdown()
+    close_expander()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="GraphRAG API",
     version="1.0.0",
     description="Hybrid GraphRAG with Neo4j + ChromaDB + Groq",
@@ -1,7 +1,7 @@
 # api/models.py
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 
 class ChatRequest(BaseModel):
@@ -24,16 +24,88 @@ class IndexRequest(BaseModel):
 
 
 class IndexResponse(BaseModel):
-    indexed_files: List[str]
-    chunks_processed: int
+    indexed_files: List[str] = []
+    chunks_processed: int = 0
+    job_id: Optional[str] = None
+    status: Optional[str] = None
+
+
+class IndexJobResponse(BaseModel):
+    job_id: str
+    collection: str
+    path: str
+    rebuild: bool = False
+    status: str
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    elapsed_s: float = 0.0
+    files_total: int = 0
+    files_done: int = 0
+    chunks_written: int = 0
+    files_per_s: float = 0.0
+    embeds_per_s: float = 0.0
+    eta_s: Optional[float] = None
+    indexed_files: List[str] = []
+    chunks_processed: int = 0
 
 
 class HealthResponse(BaseModel):
     status: str = "ok"
     vector_db_status: str
     graph_status: str
+    startup: Optional[Dict[str, Any]] = None
+
+
+class GraphNodeResponse(BaseModel):
+    id: str
+    type: Optional[str] = None
+    props: Dict[str, Any] = {}
+
+
+class GraphRelationResponse(BaseModel):
+    relation: str
+    node: str
+    transitive: bool = False
+    count: int = 0
+    results: List[str] = []
+    elapsed_ms: float = 0.0
+
+
+class GraphQueryRequest(BaseModel):
+    query: str = Field(..., description="Statement in the supported Cypher subset")
+    limit: Optional[int] = Field(default=None, description="Row cap (never above GRAPH_QUERY_LIMIT)")
+
+
+class GraphQueryResponse(BaseModel):
+    columns: List[str] = []
+    rows: List[Dict[str, Any]] = []
+    elapsed_ms: float = 0.0
 
 
 class CacheResponse(BaseModel):
     status: str = "ok"
     cleared: bool = True
+
+
+class CacheStatsResponse(BaseModel):
+    status: str = "ok"
+    exact_hits: int = 0
+    exact_misses: int = 0
+    vector_hits: int = 0
+    vector_misses: int = 0
+    empty_misses: int = 0
+    hit_rate: float = 0.0
+    lexical_rejections: int = 0
+    miss_similarity_histogram: Dict[str, int] = {}
+    avg_generation_ms: float = 0.0
+    llm_ms_saved_estimate: float = 0.0
+    evictions: int = 0
+    clears: int = 0
+    entries: int = 0
+    payload_bytes: int = 0
+    threshold: float = 0.9
+    min_overlap: float = 0.3
+    pending_writes: int = 0
+    dropped_writes: int = 0
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Body
+from typing import List
+
+from fastapi import APIRouter, Body, Query
 from api.models import (
     ChatRequest, ChatResponse,
-    IndexRequest, IndexResponse,
-    HealthResponse, CacheResponse
+    IndexRequest, IndexResponse, IndexJobResponse,
+    HealthResponse, CacheResponse, CacheStatsResponse,
+    GraphNodeResponse, GraphRelationResponse, GraphQueryRequest, GraphQueryResponse
 )
 from api.controllers import ChatController, IndexController, HealthController, CacheController
+from api.controllers import GraphController
 from api.controllers import ChatStreamController, ChatHistoryController
 
 # Phoenix instrumentation
@@ -51,7 +55,11 @@ async def chat_endpoint(
     "/index",
     response_model=IndexResponse,
     summary="Index folder",
-    description="Chunk + embed Python files under a folder into ChromaDB collections.",
+    description=(
+        "Starts a background job that chunks + embeds Python files under a folder into "
+        "ChromaDB collections. Returns the job id immediately; 409 if a job is already "
+        "running for the collection."
+    ),
     tags=["Indexing"],
 )
 @trace_span("api.index")
@@ -72,6 +80,42 @@ async def index_endpoint(
     return await IndexController().run(req)
 
 
+@router.get(
+    "/index/jobs",
+    response_model=List[IndexJobResponse],
+    summary="List indexing jobs",
+    description="Recent indexing jobs, newest first.",
+    tags=["Indexing"],
+)
+@trace_span("api.index.jobs")
+async def index_jobs_endpoint():
+    return IndexController().jobs()
+
+
+@router.get(
+    "/index/jobs/{job_id}",
+    response_model=IndexJobResponse,
+    summary="Indexing job status",
+    description="Status and progress (files, chunks, embeds per second, ETA) of an indexing job.",
+    tags=["Indexing"],
+)
+@trace_span("api.index.job")
+async def index_job_endpoint(job_id: str):
+    return IndexController().job(job_id)
+
+
+@router.post(
+    "/index/jobs/{job_id}/cancel",
+    response_model=IndexJobResponse,
+    summary="Cancel indexing job",
+    description="Stops the job after the file it is processing; the next run redoes unfinished files.",
+    tags=["Indexing"],
+)
+@trace_span("api.index.cancel")
+async def index_job_cancel_endpoint(job_id: str):
+    return IndexController().cancel(job_id)
+
+
 @router.get(
     "/health",
     response_model=HealthResponse,
@@ -84,6 +128,64 @@ async def health_endpoint():
     return HealthController().status()
 
 
+@router.get(
+    "/graph/node",
+    response_model=GraphNodeResponse,
+    summary="Graph node",
+    description="A knowledge-graph node by id or unambiguous short name.",
+    tags=["Graph"],
+)
+@trace_span("api.graph.node")
+def graph_node_endpoint(id: str = Query(..., description="Node id or short name")):
+    return GraphController().node(id)
+
+
+@router.post(
+    "/graph/query",
+    response_model=GraphQueryResponse,
+    summary="Graph query (Cypher subset)",
+    description=(
+        "Runs one MATCH or CALL statement of a Cypher subset against the in-process "
+        "knowledge graph; 400 if the statement is outside the subset."
+    ),
+    tags=["Graph"],
+)
+@trace_span("api.graph.query")
+def graph_query_endpoint(
+    req: GraphQueryRequest = Body(
+        ...,
+        openapi_examples={
+            "calls": {
+                "summary": "CALLS edges",
+                "value": {"query": "MATCH (a:Node)-[:CALLS]->(b:Node) RETURN a.id, b.id LIMIT 20"},
+            }
+        },
+    )
+):
+    return GraphController().query(req)
+
+
+@router.get(
+    "/graph/{relation}",
+    response_model=GraphRelationResponse,
+    summary="Graph relation",
+    description=(
+        "Callers, callees, importers, imports, subclasses, bases, children, parent, "
+        "dependencies or dependents of a node, answered from the knowledge graph "
+        "without retrieval or the LLM."
+    ),
+    tags=["Graph"],
+)
+@trace_span("api.graph.relation")
+def graph_relation_endpoint(
+    relation: str,
+    id: str = Query(..., description="Node id, short name, or (for importers/dependents) any imported name"),
+    transitive: bool = Query(False, description="Follow the relation transitively"),
+    limit: int = Query(0, ge=0, description="Return at most this many results (0 = all)"),
+):
+    return GraphController().relation(relation, id, transitive, limit or None)
+
+
 @router.post(
     "/cache/clear",
     response_model=CacheResponse,
@@ -96,6 +198,22 @@ async def cache_clear_endpoint():
     return CacheController().clear()
 
 
+@router.get(
+    "/cache/stats",
+    response_model=CacheStatsResponse,
+    summary="Semantic cache statistics",
+    description=(
+        "Hits and misses per tier, a histogram of the best similarity on misses, "
+        "lexical-overlap rejections, entry count and size, evictions and an "
+        "estimate of LLM time saved."
+    ),
+    tags=["Cache"],
+)
+@trace_span("api.cache.stats")
+def cache_stats_endpoint():
+    return CacheController().stats()
+
+
 @router.post(
     "/chat/stream",
     summary="Chat (stream)",
@@ -14,8 +14,8 @@ by keeping configuration logic separate from business logic.
 """
 
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
 
 
 @dataclass
@@ -45,6 +45,7 @@ class EmbeddingConfig:
     model_name: str = "BAAI/bge-small-en"
     cache_size: int = 1
     normalize_embeddings: bool = True
+    batch_size: int = 32
     
     @classmethod
     def from_env(cls) -> "EmbeddingConfig":
@@ -53,6 +54,7 @@ class EmbeddingConfig:
             model_name=os.getenv("EMBEDDING_MODEL", "BAAI/bge-small-en"),
             cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "1")),
             normalize_embeddings=os.getenv("EMBEDDING_NORMALIZE", "true").lower() == "true",
+            batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
         )
 
 
@@ -63,6 +65,10 @@ class Neo4jConfig:
     username: Optional[str] = None
     password: Optional[str] = None
     use_neo4j: bool = False
+    database: Optional[str] = None
+    max_pool_size: int = 50
+    import_batch_size: int = 1000
+    import_workers: int = 4
     
     @classmethod
     def from_env(cls) -> "Neo4jConfig":
@@ -72,6 +78,10 @@ class Neo4jConfig:
             username=os.getenv("NEO4J_USERNAME"),
             password=os.getenv("NEO4J_PASSWORD"),
             use_neo4j=os.getenv("USE_NEO4J", "false").lower() == "true",
+            database=os.getenv("NEO4J_DATABASE") or None,
+            max_pool_size=int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+            import_batch_size=int(os.getenv("NEO4J_IMPORT_BATCH_SIZE", "1000")),
+            import_workers=int(os.getenv("NEO4J_IMPORT_WORKERS", "4")),
         )
 
 
@@ -98,12 +108,142 @@ class LLMConfig:
 class CacheConfig:
     """Configuration for the semantic cache."""
     threshold: float = 0.9
+    min_overlap: float = 0.3
+    preload: bool = True
+    warmup_file: Optional[str] = None
     
     @classmethod
     def from_env(cls) -> "CacheConfig":
         """Create a configuration instance from environment variables."""
         return cls(
             threshold=float(os.getenv("CACHE_THRESHOLD", "0.9")),
+            min_overlap=float(os.getenv("CACHE_MIN_OVERLAP", "0.3")),
+            preload=os.getenv("CACHE_PRELOAD", "true").lower() == "true",
+            warmup_file=os.getenv("CACHE_WARMUP_FILE") or None,
+        )
+
+
+@dataclass
+class WriteBehindConfig:
+    """Configuration for the background write-behind queue."""
+    max_pending: int = 1024
+    batch_size: int = 32
+    linger_s: float = 0.05
+    shutdown_timeout_s: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "WriteBehindConfig":
+        """Create a configuration instance from environment variables."""
+        return cls(
+            max_pending=int(os.getenv("WRITE_BEHIND_MAX_PENDING", "1024")),
+            batch_size=int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "32")),
+            linger_s=float(os.getenv("WRITE_BEHIND_LINGER_S", "0.05")),
+            shutdown_timeout_s=float(os.getenv("WRITE_BEHIND_SHUTDOWN_TIMEOUT_S", "10.0")),
+        )
+
+
+@dataclass
+class IndexConfig:
+    """Configuration for code indexing."""
+    # Inside the Chroma store, so wiping or moving the store drops its manifests too
+    manifest_dir: str = "vectorstore/chroma_db/index_manifests"
+    write_batch_size: int = 256
+    parse_workers: int = 0
+    queue_size: int = 8
+    job_niceness: int = 10
+    job_threads: int = 0
+    job_cancel_grace_s: float = 30.0
+    # Also inside the Chroma store: aliases name collections of that store only
+    alias_manifest: str = "vectorstore/chroma_db/collection_aliases.json"
+    keep_versions: int = 1
+    min_count_ratio: float = 0.5
+    min_recall: float = 0.9
+    recall_samples: int = 20
+    kg_path: str = "graph_indexing/knowledge_graph.json"
+    watch_paths: Tuple[str, ...] = ()
+    watch_backend: str = "auto"
+    watch_debounce_ms: int = 500
+    watch_max_delay_ms: int = 5000
+    watch_poll_interval_s: float = 1.0
+
+    @classmethod
+    def from_env(cls) -> "IndexConfig":
+        """Create a configuration instance from environment variables."""
+        return cls(
+            manifest_dir=os.getenv("INDEX_MANIFEST_DIR")
+            or os.path.join(os.getenv("CHROMA_PATH", "vectorstore/chroma_db"), "index_manifests"),
+            write_batch_size=int(os.getenv("INDEX_WRITE_BATCH_SIZE", "256")),
+            parse_workers=int(os.getenv("INDEX_PARSE_WORKERS", "0")),
+            queue_size=int(os.getenv("INDEX_QUEUE_SIZE", "8")),
+            job_niceness=int(os.getenv("INDEX_JOB_NICENESS", "10")),
+            job_threads=int(os.getenv("INDEX_JOB_THREADS", "0")),
+            job_cancel_grace_s=float(os.getenv("INDEX_JOB_CANCEL_GRACE_S", "30.0")),
+            alias_manifest=os.getenv("INDEX_ALIAS_MANIFEST")
+            or os.path.join(os.getenv("CHROMA_PATH", "vectorstore/chroma_db"), "collection_aliases.json"),
+            keep_versions=int(os.getenv("INDEX_KEEP_VERSIONS", "1")),
+            min_count_ratio=float(os.getenv("INDEX_MIN_COUNT_RATIO", "0.5")),
+            min_recall=float(os.getenv("INDEX_MIN_RECALL", "0.9")),
+            recall_samples=int(os.getenv("INDEX_RECALL_SAMPLES", "20")),
+            kg_path=os.getenv("INDEX_KG_PATH", "graph_indexing/knowledge_graph.json"),
+            watch_paths=tuple(p.strip() for p in os.getenv("INDEX_WATCH_PATHS", "").split(",") if p.strip()),
+            watch_backend=os.getenv("INDEX_WATCH_BACKEND", "auto").lower(),
+            watch_debounce_ms=int(os.getenv("INDEX_WATCH_DEBOUNCE_MS", "500")),
+            watch_max_delay_ms=int(os.getenv("INDEX_WATCH_MAX_DELAY_MS", "5000")),
+            watch_poll_interval_s=float(os.getenv("INDEX_WATCH_POLL_INTERVAL_S", "1.0")),
+        )
+
+
+@dataclass
+class StartupConfig:
+    """Configuration for warming lazily initialized services at startup."""
+    warmup: Tuple[str, ...] = ("embedding_model", "chroma", "semantic_cache", "llm", "graph")
+    background: bool = False
+    budget_ms: float = 15000.0
+
+    @classmethod
+    def from_env(cls) -> "StartupConfig":
+        """Create a configuration instance from environment variables."""
+        raw = os.getenv("STARTUP_WARMUP", "embedding_model,chroma,semantic_cache,llm,graph")
+        return cls(
+            warmup=tuple(name.strip() for name in raw.split(",") if name.strip() and name.strip() != "none"),
+            background=os.getenv("STARTUP_WARMUP_BACKGROUND", "false").lower() == "true",
+            budget_ms=float(os.getenv("STARTUP_BUDGET_MS", "15000")),
+        )
+
+
+@dataclass
+class GraphConfig:
+    """Configuration for graph expansion of retrieved nodes."""
+    backend: str = "local"
+    kg_path: str = "graph_indexing/knowledge_graph.json"
+    depth: int = 1
+    edge_types: Tuple[str, ...] = ("CALLS", "INHERITS", "CONTAINS", "IMPORTS")
+    fanout: int = 16
+    max_neighbors: int = 40
+    top_neighbors: int = 12
+    context_tokens: int = 600
+    doc_chars: int = 160
+    structural_answers: bool = True
+    query_limit: int = 1000
+
+    @classmethod
+    def from_env(cls) -> "GraphConfig":
+        """Create a configuration instance from environment variables."""
+        # USE_NEO4J predates GRAPH_BACKEND and still selects Neo4j on its own
+        default_backend = "neo4j" if os.getenv("USE_NEO4J", "false").lower() == "true" else "local"
+        raw_types = os.getenv("GRAPH_EDGE_TYPES", "CALLS,INHERITS,CONTAINS,IMPORTS")
+        return cls(
+            backend=os.getenv("GRAPH_BACKEND", default_backend).lower(),
+            kg_path=os.getenv("GRAPH_KG_PATH", os.getenv("INDEX_KG_PATH", "graph_indexing/knowledge_graph.json")),
+            depth=int(os.getenv("GRAPH_EXPAND_DEPTH", "1")),
+            edge_types=tuple(t.strip().upper() for t in raw_types.split(",") if t.strip()),
+            fanout=int(os.getenv("GRAPH_FANOUT", "16")),
+            max_neighbors=int(os.getenv("GRAPH_MAX_NEIGHBORS", "40")),
+            top_neighbors=int(os.getenv("GRAPH_TOP_NEIGHBORS", "12")),
+            context_tokens=int(os.getenv("GRAPH_CONTEXT_TOKENS", "600")),
+            doc_chars=int(os.getenv("GRAPH_DOC_CHARS", "160")),
+            structural_answers=os.getenv("GRAPH_STRUCTURAL_ANSWERS", "true").lower() == "true",
+            query_limit=int(os.getenv("GRAPH_QUERY_LIMIT", "1000")),
         )
 
 
@@ -115,6 +255,9 @@ class GraphRAGConfig:
     neo4j: Neo4jConfig
     llm: LLMConfig
     cache: CacheConfig
+    write_behind: WriteBehindConfig = field(default_factory=WriteBehindConfig)
+    index: IndexConfig = field(default_factory=IndexConfig)
+    graph: GraphConfig = field(default_factory=GraphConfig)
     
     @classmethod
     def from_env(cls) -> "GraphRAGConfig":
@@ -125,4 +268,7 @@ class GraphRAGConfig:
             neo4j=Neo4jConfig.from_env(),
             llm=LLMConfig.from_env(),
             cache=CacheConfig.from_env(),
+            write_behind=WriteBehindConfig.from_env(),
+            index=IndexConfig.from_env(),
+            graph=GraphConfig.from_env(),
         )
@@ -0,0 +1,134 @@
+# batch_writer.py
+"""Buffered embed-and-upsert writer for Chroma collections.
+
+Indexers add documents one at a time; the writer embeds and upserts them in
+batches, so each batch costs one model call and one Chroma transaction
+instead of one per document.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, cast
+
+import chromadb
+
+from config.logger import log
+from core.code_exceptions import EmbeddingError
+from core.embeddings import embed_texts
+
+
+def embed_documents(ids: Sequence[str], documents: Sequence[str]) -> List[List[float]]:
+    """Embed a batch, retrying one document at a time if the batch fails.
+
+    Args:
+        ids: Document ids, used for logging.
+        documents: Texts to embed.
+
+    Returns:
+        One vector per document; empty for documents that failed.
+    """
+    try:
+        return embed_texts(list(documents))
+    except EmbeddingError:
+        log.warning(f"Batch embedding of {len(ids)} documents failed, retrying individually")
+    vectors: List[List[float]] = []
+    for doc_id, document in zip(ids, documents):
+        try:
+            vectors.append(embed_texts([document])[0])
+        except EmbeddingError:
+            log.warning(f"Failed to embed {doc_id}, skipping")
+            vectors.append([])
+    return vectors
+
+
+def upsert_embedded(
+    collection: chromadb.Collection,
+    ids: Sequence[str],
+    documents: Sequence[str],
+    metadatas: Sequence[Mapping[str, Any]],
+    vectors: Sequence[List[float]],
+) -> List[str]:
+    """Write one embedded batch with a single upsert, dropping empty vectors.
+
+    Returns:
+        Ids that were written.
+    """
+    rows = [i for i, vec in enumerate(vectors) if vec]
+    if not rows:
+        return []
+    embeddings: List[Sequence[float]] = [cast(Sequence[float], vectors[i]) for i in rows]
+    collection.upsert(
+        ids=[ids[i] for i in rows],
+        embeddings=embeddings,
+        documents=[documents[i] for i in rows],
+        metadatas=cast(Any, [metadatas[i] for i in rows]),
+    )
+    log.debug(f"Upserted batch of {len(rows)} documents into {collection.name}")
+    return [ids[i] for i in rows]
+
+
+class BatchUpserter:
+    """Accumulates documents and flushes them with one embed + upsert per batch.
+
+    Documents whose embedding comes back empty are skipped. If embedding a
+    batch fails, the batch is retried one document at a time so a single
+    bad document only loses itself.
+    """
+
+    def __init__(self, collection: chromadb.Collection, batch_size: int = 256, skip_unchanged: bool = False) -> None:
+        """Initialize the writer.
+
+        Args:
+            collection: Target Chroma collection.
+            batch_size: Number of documents per embed + upsert call.
+            skip_unchanged: Look each batch up in the collection first and
+                leave documents whose stored text and metadata are equal
+                alone, instead of embedding them again.
+        """
+        self._collection = collection
+        self._batch_size = max(1, batch_size)
+        self._skip_unchanged = skip_unchanged
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Mapping[str, Any]] = []
+        self.written: List[str] = []
+        self.skipped: List[str] = []
+        self.unchanged: List[str] = []
+
+    def add(self, doc_id: str, document: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Buffer a document, flushing when the batch is full."""
+        self._ids.append(doc_id)
+        self._documents.append(document)
+        self._metadatas.append(metadata or {})
+        if len(self._ids) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Embed and upsert everything buffered so far."""
+        if not self._ids:
+            return
+        ids, documents, metadatas = self._ids, self._documents, self._metadatas
+        self._ids, self._documents, self._metadatas = [], [], []
+        if self._skip_unchanged:
+            ids, documents, metadatas = self._drop_unchanged(ids, documents, metadatas)
+            if not ids:
+                return
+
+        vectors = embed_documents(ids, documents)
+        self.skipped.extend(doc_id for doc_id, vec in zip(ids, vectors) if not vec)
+        self.written.extend(upsert_embedded(self._collection, ids, documents, metadatas, vectors))
+
+    def _drop_unchanged(
+        self, ids: List[str], documents: List[str], metadatas: List[Mapping[str, Any]]
+    ) -> Tuple[List[str], List[str], List[Mapping[str, Any]]]:
+        """Remove the documents already stored with the same text and metadata."""
+        stored = self._collection.get(ids=ids, include=cast(Any, ["documents", "metadatas"]))
+        current = {
+            doc_id: (document, dict(metadata or {}))
+            for doc_id, document, metadata in zip(stored["ids"], stored["documents"] or [], stored["metadatas"] or [])
+        }
+        rows = []
+        for i, doc_id in enumerate(ids):
+            if current.get(doc_id) == (documents[i], dict(metadatas[i])):
+                self.unchanged.append(doc_id)
+            else:
+                rows.append(i)
+        return [ids[i] for i in rows], [documents[i] for i in rows], [metadatas[i] for i in rows]
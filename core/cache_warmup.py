@@ -0,0 +1,167 @@
+# cache_warmup.py
+"""Semantic cache warm-up.
+
+Precomputes answers for a known question set so the first users after a
+deploy hit the cache instead of paying for retrieval plus generation.
+Questions can come from the evaluation golden dataset, the most frequent
+entries in the chat history, or an operator-supplied file.
+
+Usage:
+    python -m core.cache_warmup --golden --history 20 --file questions.txt
+"""
+
+import argparse
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.logger import log
+from core.singleflight import normalize_question
+
+GOLDEN_DATASET_PATH = os.path.join("evaluation", "golden_dataset.json")
+
+
+def load_question_file(path: str) -> List[str]:
+    """Load questions from a JSON, JSONL or plain-text file.
+
+    JSON files may hold a list of strings or a list of objects with a
+    ``question`` (or ``title``) field, as in ``evaluation/golden_dataset.json``.
+    Plain-text files hold one question per line.
+
+    Args:
+        path: File to read.
+
+    Returns:
+        Questions in file order.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    if path.endswith(".json"):
+        return _questions_from_items(json.loads(text))
+    if path.endswith(".jsonl"):
+        return _questions_from_items(json.loads(line) for line in text.splitlines() if line.strip())
+    return [line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+
+
+def _questions_from_items(items: Iterable[Any]) -> List[str]:
+    questions: List[str] = []
+    for item in items:
+        if isinstance(item, str):
+            questions.append(item)
+        elif isinstance(item, dict):
+            q = item.get("question") or item.get("message") or item.get("title")
+            if isinstance(q, str) and q.strip():
+                questions.append(q.strip())
+    return questions
+
+
+def history_questions(path: str) -> List[str]:
+    """Return the questions recorded in the chat history, oldest first.
+
+    Only the raw ``question`` recorded with each entry is used; the
+    ``title`` is an LLM-written summary that nobody actually asks.
+
+    Args:
+        path: Path to ``chat_history.json``.
+
+    Returns:
+        Questions in history order; empty if the file is missing or unreadable.
+    """
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+    except Exception:
+        log.warning(f"Could not read chat history from {path}")
+        return []
+
+    questions: List[str] = []
+    for item in items if isinstance(items, list) else []:
+        q = item.get("question") if isinstance(item, dict) else None
+        if isinstance(q, str) and q.strip():
+            questions.append(q.strip())
+    return questions
+
+
+def frequent_history_questions(path: str, limit: int = 20) -> List[str]:
+    """Return the most frequently asked questions in the chat history.
+
+    Args:
+        path: Path to ``chat_history.json``.
+        limit: Maximum number of questions to return.
+
+    Returns:
+        Questions ordered by descending frequency.
+    """
+    counts: Counter = Counter()
+    first_seen: Dict[str, str] = {}
+    for q in history_questions(path):
+        key = normalize_question(q)
+        counts[key] += 1
+        first_seen.setdefault(key, q)
+    return [first_seen[key] for key, _ in counts.most_common(limit)]
+
+
+def warm_cache(questions: Iterable[str], llm_overrides: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """Answer each question once so its answer lands in the semantic cache.
+
+    Each question goes through ``answer_question`` once, which returns the
+    cached answer for questions already cached and otherwise queues the new
+    answer on the write-behind queue; the queue is flushed before returning.
+    Cache statistics are paused meanwhile, so warm-up is not counted as
+    traffic.
+
+    Args:
+        questions: Questions to precompute.
+        llm_overrides: Optional LLM parameters, matching what clients send.
+
+    Returns:
+        Counts of requested, answered and failed questions.
+    """
+    from core.graphrag import answer_question, get_cache, write_behind
+
+    unique: Dict[str, str] = {}
+    for q in questions:
+        if q and q.strip():
+            unique.setdefault(normalize_question(q), q.strip())
+
+    stats = {"requested": len(unique), "answered": 0, "failed": 0}
+    with get_cache().stats.paused():
+        for question in unique.values():
+            try:
+                answer_question(question, llm_overrides=llm_overrides)
+                stats["answered"] += 1
+            except Exception:
+                log.exception(f"Warm-up failed for question: {question[:50]}...")
+                stats["failed"] += 1
+
+    write_behind.flush()
+    log.info(f"Cache warm-up complete: {stats}")
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute answers into the semantic cache")
+    parser.add_argument("--golden", action="store_true", help=f"Use questions from {GOLDEN_DATASET_PATH}")
+    parser.add_argument("--history", type=int, default=0, metavar="N",
+                        help="Use the N most frequent questions from the chat history")
+    parser.add_argument("--history-path", default=os.getenv("CHAT_HISTORY_PATH", "chat_history.json"))
+    parser.add_argument("--file", action="append", default=[], help="Operator question file (JSON, JSONL or text)")
+    args = parser.parse_args()
+
+    questions: List[str] = []
+    if args.golden or not (args.history or args.file):
+        questions.extend(load_question_file(GOLDEN_DATASET_PATH))
+    if args.history:
+        questions.extend(frequent_history_questions(args.history_path, args.history))
+    for path in args.file:
+        questions.extend(load_question_file(path))
+
+    stats = warm_cache(questions)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
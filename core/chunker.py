@@ -1,129 +1,298 @@
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
 
-from tree_sitter import Parser
-import warnings
-
-from config.logger import log
-
-# Suppress FutureWarning from tree_sitter (deprecated Language constructor)
-with warnings.catch_warnings():
-    warnings.filterwarnings("ignore", category=FutureWarning, module="tree_sitter")
-    from tree_sitter_languages import get_language  # type: ignore[import-untyped]
-
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 import chromadb
 
-from core.embeddings import embed_text
+from config.logger import log
+from config.settings import IndexConfig
+from core.collection_alias import blue_green_rebuild, drop_index_manifest, get_aliases, resolve_collection
+from core.code_splitter import CHUNKING_VERSION, PY_LANG, parser, splitter, extract_blocks, chunk_file  # noqa: F401
+from core.index_manifest import FileEntry, IndexManifest, stat_entry
+from core.ingest_pipeline import FileTask, IngestPipeline
+from core.semantic_cache import invalidate_cached_references
+from core.startup import LazyService
+from graph_indexing.kgbuild.graph import KG
 
 # Observability
 from observability.tracing import trace_span
 from opentelemetry import trace as otel_trace
 
-from typing import Optional
-try:
-    # Suppress FutureWarning from tree_sitter (deprecated Language constructor)
-    # We filter by message because the module path can be tricky
-    with warnings.catch_warnings():
-        warnings.filterwarnings("ignore", category=FutureWarning, message=".*Language\\(path, name\\) is deprecated.*")
-        PY_LANG = get_language("python")
-        
-    parser: Optional[Parser] = Parser()
-    parser.set_language(PY_LANG)
-except Exception as e:
-    log.warning(f"Failed to initialize tree-sitter parser: {e}")
-    PY_LANG = None
-    parser = None  # runtime fallback when tree-sitter not available
-
-client = chromadb.PersistentClient(path=os.getenv("CHROMA_PATH", "vectorstore/chroma_db"))
-collection = client.get_or_create_collection(
-    name="code_chunks",
-    metadata={"hnsw:space": "cosine"},
-)
 
-splitter = RecursiveCharacterTextSplitter(
-    chunk_size=800,
-    chunk_overlap=150,
+def _client() -> chromadb.ClientAPI:
+    return chromadb.PersistentClient(path=os.getenv("CHROMA_PATH", "vectorstore/chroma_db"))
+
+
+# The physical collection currently serving the ``code_chunks`` alias,
+# opened on first use so importing this module does no I/O
+_serving = LazyService(
+    "code_chunks",
+    lambda: _client().get_or_create_collection(name=resolve_collection("code_chunks"), metadata={"hnsw:space": "cosine"}),
 )
+# When set, used instead of the serving collection
+collection: Optional[chromadb.Collection] = None
 
 
-def extract_blocks(code: str) -> list[str]:
-    if parser is None:
-        return []  # Return empty list if parser not available
+def get_collection() -> chromadb.Collection:
+    """Return the collection indexing writes to by default."""
+    return collection if collection is not None else _serving.get()
 
-    tree = parser.parse(code.encode("utf-8"))
-    root = tree.root_node
-    blocks: list[str] = []
 
-    def walk(node):
-        if node.type in ("function_definition", "class_definition"):
-            s, e = node.start_byte, node.end_byte
-            blocks.append(code[s:e])
-        for child in node.children:
-            walk(child)
+def _manifest(target: Optional[chromadb.Collection] = None) -> IndexManifest:
+    return IndexManifest.for_collection(IndexConfig.from_env().manifest_dir, (target or get_collection()).name)
 
-    walk(root)
-    return blocks
 
+@dataclass
+class IngestReport:
+    """Outcome of an indexing run."""
+    indexed_files: list[str] = field(default_factory=list)
+    stored: int = 0
+    # Chunk ids written or removed; cached answers citing them are stale
+    affected_chunk_ids: list[str] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+    # Files (relative to the indexed root) whose chunks were dropped
+    deleted_files: list[str] = field(default_factory=list)
+    # Knowledge-graph nodes written or removed by a graph patch
+    affected_node_ids: list[str] = field(default_factory=list)
 
-@trace_span("rag.chunk.file")
-def chunk_file(path: Path) -> list[str]:
-    text = path.read_text(encoding="utf-8")
-    blocks = extract_blocks(text) or [text]
 
-    chunks: list[str] = []
-    for block in blocks:
-        if len(block) < 1200:
-            chunks.append(block)
-        else:
-            chunks.extend(splitter.split_text(block))
-    return chunks
+def ingest_folder(folder: str, rebuild: bool = False):
+    """Index the ``.py`` files under ``folder`` and evict stale cached answers.
+
+    Args:
+        folder: Root directory to index.
+        rebuild: Drop everything previously indexed for ``folder`` and
+            re-index all files.
+
+    Returns:
+        Tuple of (re-indexed file paths, number of chunks embedded and written).
+    """
+    report = run_ingest(folder, rebuild=rebuild)
+    invalidate_cached_references(chunk_ids=report.affected_chunk_ids)
+    return report.indexed_files, report.stored
 
 
 @trace_span("rag.index.ingest_folder")
-def ingest_folder(folder: str):
+def run_ingest(
+    folder: str,
+    rebuild: bool = False,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    target: Optional[chromadb.Collection] = None,
+    kg: Optional[KG] = None,
+    fragments: Optional[Dict[str, KG]] = None,
+) -> IngestReport:
+    """Index the ``.py`` files under ``folder`` into the code chunk collection.
+
+    Only files that were added or changed since the last run (according to
+    the index manifest) are re-chunked, and within those only chunks whose
+    content changed are re-embedded. Chunks of deleted files and superseded
+    chunks of changed files are removed. Files go through the staged
+    parse -> embed -> write pipeline in ``core.ingest_pipeline``.
+
+    Cache invalidation is left to the caller, which may live in another
+    process than the one serving the cache.
+
+    Args:
+        folder: Root directory to index.
+        rebuild: Drop everything previously indexed for ``folder`` and
+            re-index all files.
+        progress: Optional callback receiving running counts, including
+            ``files_total``.
+        cancelled: Optional predicate polled between files.
+        target: Collection to write to instead of the one serving
+            ``code_chunks`` (used by blue/green rebuilds).
+        kg: When given, every file is parsed (unchanged files are still
+            not re-embedded) and the knowledge graph extracted by the same
+            parse is merged into it, so building the KG costs no extra parse.
+        fragments: When given, receives the KG fragment of every re-indexed
+            file, keyed by path relative to ``folder`` (for patching a KG).
+
+    Returns:
+        The re-indexed files, chunks written and affected chunk ids.
+
+    Raises:
+        IndexingCancelled: If ``cancelled`` returned True. The manifest is
+            not updated, so the next run redoes the unfinished files.
+    """
     root = Path(folder)
-    py_files = list(root.rglob("*.py"))
-    stored = 0
-    indexed_files: set[str] = set()
+    base = root.resolve()
+    root_key = str(base)
+    py_files = sorted(base.rglob("*.py"))
+    target = target or get_collection()
+    manifest = _manifest(target)
+    indexed_files: list[str] = []
+    written_ids: list[str] = []
+    stale_ids: list[str] = []
 
     # Attach basic indexing stats to current span
     span = otel_trace.get_current_span()
     if span and span.is_recording():
         span.set_attribute("rag.index.num_py_files", len(py_files))
         span.set_attribute("rag.index.root", str(root))
+        span.set_attribute("rag.index.rebuild", rebuild)
 
-    for file in py_files:
-        chunks = chunk_file(file)
-        stored_for_file = 0
-        for i, chunk in enumerate(chunks):
-            chunk_id = f"{file.relative_to(root)}::{i}"
-            # Skip empty chunks or failed embeddings to prevent Chroma errors
-            if not chunk.strip():
-                continue
-            embedding_vector = embed_text(chunk)
-            if not embedding_vector:
-                continue
-            from typing import Sequence, List, cast
-            embeddings: List[Sequence[float]] = [cast(Sequence[float], embedding_vector)]
-            collection.add(
-                ids=[chunk_id],
-                embeddings=embeddings,
-                documents=[chunk],
-                metadatas=[{"file": str(file)}],
-            )
-            stored += 1
-            stored_for_file += 1
-        if stored_for_file > 0:
-            indexed_files.add(str(file))
+    if manifest.roots() and target.count() == 0:
+        # The collection was wiped or recreated; nothing the manifest lists
+        # is stored any more, so every root is indexed from scratch.
+        log.info(f"{target.name} is empty, discarding its index manifest")
+        manifest.clear()
+        manifest.save()
+
+    if rebuild or not manifest.has_root(root_key):
+        # Drop what the manifest knows about, plus chunks written before the
+        # manifest existed (positional ids) for the files being indexed.
+        # Chunks other roots also contain are kept.
+        previous = manifest.reset(root_key)
+        referenced = manifest.chunk_ids()
+        dropped = [cid for cid in previous if cid not in referenced]
+        if dropped:
+            target.delete(ids=dropped)
+        legacy_files = [str(root / f.relative_to(base)) for f in py_files]
+        for i in range(0, len(legacy_files), 500):
+            found = target.get(where={"file": {"$in": legacy_files[i:i + 500]}}, include=[])["ids"]
+            unreferenced = [cid for cid in found if cid not in referenced]
+            if unreferenced:
+                target.delete(ids=unreferenced)
+        # Cached answers citing the dropped ids are evicted below
+        written_ids.extend(previous)
+        manifest.save()
+
+    recorded = manifest.files(root_key)
+    diff = manifest.diff(root_key, py_files, chunking=CHUNKING_VERSION)
+
+    for rel in diff.deleted:
+        stale_ids.extend(recorded[rel].chunk_ids)
+    manifest.remove(root_key, diff.deleted)
+
+    tasks = [
+        FileTask(
+            rel=rel,
+            path=str(base / rel),
+            metadata={"file": str(root / rel)},
+            old_ids=set(recorded[rel].chunk_ids) if rel in recorded else set(),
+            root=root_key,
+        )
+        for rel in (sorted(diff.to_index + diff.unchanged) if kg is not None else diff.to_index)
+    ]
+    on_progress = None
+    if progress is not None:
+        def on_progress(counts: Dict[str, int]) -> None:
+            progress({"files_total": len(tasks), **counts})
+    result = IngestPipeline(
+        target, progress=on_progress, cancelled=cancelled, collect_graph=kg is not None or fragments is not None
+    ).run(tasks)
+    if kg is not None:
+        for rel in sorted(result.graphs):
+            kg.merge(result.graphs[rel])
+    if fragments is not None:
+        fragments.update(result.graphs)
+
+    failed = set(result.skipped)
+    for task in tasks:
+        chunk_ids = result.chunk_ids.get(task.rel, [])
+        stale_ids.extend(task.old_ids - set(chunk_ids))
+        spans = result.spans.get(task.rel) or {}
+        if failed.intersection(chunk_ids):
+            # Some chunks failed to embed and are not stored. Record only the
+            # stored ones, without the file's stat and hash, so the next run
+            # sees the file as changed and embeds the missing chunks.
+            stored_ids = [cid for cid in chunk_ids if cid not in failed]
+            stored_spans = {cid: spans[cid] for cid in stored_ids if cid in spans}
+            entry = FileEntry(0.0, -1, "", stored_ids, CHUNKING_VERSION, stored_spans)
+        else:
+            entry = stat_entry(Path(task.path), diff.hashes.get(task.rel), chunk_ids, CHUNKING_VERSION, spans)
+        manifest.record(root_key, task.rel, entry)
+        indexed_files.append(task.metadata["file"])
+
+    stored = len(result.written)
+    written_ids.extend(result.written)
+    # A chunk is shared by every file containing the same text; delete it
+    # only once no indexed file references it.
+    unreferenced = sorted(set(stale_ids) - manifest.chunk_ids())
+    if unreferenced:
+        target.delete(ids=unreferenced)
+    manifest.save()
 
     # Final indexing metrics on span
     if span and span.is_recording():
         span.set_attribute("rag.index.total_chunks", stored)
         span.set_attribute("rag.index.indexed_files", len(indexed_files))
+        span.set_attribute("rag.index.files_added", len(diff.added))
+        span.set_attribute("rag.index.files_changed", len(diff.changed))
+        span.set_attribute("rag.index.files_deleted", len(diff.deleted))
+        span.set_attribute("rag.index.files_unchanged", len(diff.unchanged))
+        span.set_attribute("rag.index.stale_chunks", len(unreferenced))
+        for key, value in result.span_attributes().items():
+            span.set_attribute(key, value)
+
+    log.info(
+        f"Stored {stored} chunks into {target.name} "
+        f"(added={len(diff.added)}, changed={len(diff.changed)}, deleted={len(diff.deleted)}, "
+        f"unchanged={len(diff.unchanged)}, stale chunks removed={len(unreferenced)})."
+    )
+    return IngestReport(
+        indexed_files=indexed_files,
+        stored=stored,
+        affected_chunk_ids=written_ids + sorted(set(stale_ids)),
+        counts={
+            "added": len(diff.added),
+            "changed": len(diff.changed),
+            "deleted": len(diff.deleted),
+            "unchanged": len(diff.unchanged),
+        },
+        deleted_files=diff.deleted,
+    )
+
+
+def rebuild_code_chunks(
+    folders: Iterable[str],
+    progress: Optional[Callable[[Dict[str, int]], None]] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> IngestReport:
+    """Rebuild ``code_chunks`` into a new collection version and flip the alias.
+
+    Every root indexed into the serving version is re-indexed, plus
+    ``folders``. Retrieval keeps reading the serving version until the new
+    one has been validated (see ``core.collection_alias``).
+
+    Args:
+        folders: Additional roots to index.
+        progress: Optional callback receiving running counts per root.
+        cancelled: Optional predicate polled between files.
+
+    Returns:
+        Combined report; ``affected_chunk_ids`` are the ids of the old
+        version that the new one no longer contains.
+
+    Raises:
+        ChromaError: If the new version fails validation.
+        IndexingCancelled: If ``cancelled`` returned True. The serving
+            version is unchanged.
+    """
+    previous = _manifest()
+    roots = list(dict.fromkeys([*previous.roots(), *(str(Path(f).resolve()) for f in folders)]))
+    combined = IngestReport()
+
+    def build(target: chromadb.Collection) -> None:
+        for root in roots:
+            if not Path(root).is_dir():
+                log.warning(f"Skipping missing index root {root}")
+                continue
+            report = run_ingest(root, rebuild=True, progress=progress, cancelled=cancelled, target=target)
+            combined.indexed_files.extend(report.indexed_files)
+            combined.stored += report.stored
+            for key, value in report.counts.items():
+                combined.counts[key] = combined.counts.get(key, 0) + value
 
-    log.info(f"Stored {stored} chunks into code_chunks.")
-    return list(indexed_files), stored
+    client = _client()
+    physical = blue_green_rebuild(
+        client, get_aliases(), "code_chunks", build, IndexConfig.from_env(), on_delete=drop_index_manifest
+    )
+    _serving.set(client.get_collection(physical))
+    combined.affected_chunk_ids = sorted(previous.chunk_ids() - _manifest().chunk_ids())
+    return combined
 
 
 if __name__ == "__main__":
@@ -22,3 +22,15 @@ class LLMError(GraphRAGError):
 
 class CacheMiss(GraphRAGError):
     """Raised internally to indicate a semantic-cache miss (non-fatal)."""
+
+
+class IndexingCancelled(GraphRAGError):
+    """Raised inside an indexing run when its job has been cancelled."""
+
+
+class IndexJobConflict(GraphRAGError):
+    """Raised when an indexing job is already active for a collection."""
+
+
+class GraphQueryError(GraphRAGError):
+    """Raised when a structural graph query is malformed or unsupported."""
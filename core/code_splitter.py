@@ -0,0 +1,153 @@
+# code_splitter.py
+"""Splitting of Python source into code chunks.
+
+Files are parsed once by the single Tree-sitter pass in
+``graph_indexing.kgbuild.unified``, which yields each class and function
+tagged with its knowledge-graph node id (and, on request, the file's KG
+fragment), so chunking and KG extraction share one parse.
+
+Chunks are hierarchical rather than nested copies: a class becomes a skeleton
+chunk (signature, docstring, attributes and member signatures) and each of
+its methods a separate chunk whose ``parent`` is the class, so no code is
+embedded twice.
+
+Kept free of vector-store imports so the ingestion pipeline can run it in
+worker processes without each worker opening ChromaDB.
+"""
+
+import time
+import warnings
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from tree_sitter import Parser
+
+from config.logger import log
+
+# Suppress FutureWarning from tree_sitter (deprecated Language constructor)
+with warnings.catch_warnings():
+    warnings.filterwarnings("ignore", category=FutureWarning, module="tree_sitter")
+    from tree_sitter_languages import get_language  # type: ignore[import-untyped]
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from graph_indexing.kgbuild.graph import KG
+from graph_indexing.kgbuild.unified import class_skeleton, parse_source
+
+# Observability
+from observability.tracing import trace_span
+
+try:
+    # Suppress FutureWarning from tree_sitter (deprecated Language constructor)
+    # We filter by message because the module path can be tricky
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=FutureWarning, message=".*Language\\(path, name\\) is deprecated.*")
+        PY_LANG = get_language("python")
+
+    parser: Optional[Parser] = Parser()
+    parser.set_language(PY_LANG)
+except Exception as e:
+    log.warning(f"Failed to initialize tree-sitter parser: {e}")
+    PY_LANG = None
+    parser = None  # runtime fallback when tree-sitter not available
+
+# Bump when the chunking scheme changes; files chunked under an older scheme
+# are re-indexed by the next incremental run.
+CHUNKING_VERSION = 2
+
+splitter = RecursiveCharacterTextSplitter(
+    chunk_size=800,
+    chunk_overlap=150,
+)
+
+
+def extract_blocks(code: str) -> list[str]:
+    if parser is None:
+        return []  # Return empty list if parser not available
+
+    data = code.encode("utf-8")
+    tree = parser.parse(data)
+    root = tree.root_node
+    blocks: list[str] = []
+
+    def walk(node):
+        if node.type == "function_definition":
+            # Nested definitions stay inside their function's block
+            blocks.append(data[node.start_byte:node.end_byte].decode("utf-8", errors="replace"))
+            return
+        if node.type == "class_definition":
+            blocks.append(class_skeleton(node, data))
+        for child in node.children:
+            walk(child)
+
+    walk(root)
+    return blocks
+
+
+def split_blocks(blocks: list[str]) -> list[str]:
+    chunks: list[str] = []
+    for block in blocks:
+        if len(block) < 1200:
+            chunks.append(block)
+        else:
+            chunks.extend(splitter.split_text(block))
+    return chunks
+
+
+@trace_span("rag.chunk.file")
+def chunk_file(path: Path) -> list[str]:
+    text = path.read_text(encoding="utf-8")
+    return split_blocks(extract_blocks(text) or [text])
+
+
+class FileChunks(NamedTuple):
+    """Chunks of one file, each tagged with the KG node it belongs to."""
+    chunks: List[str]
+    kg_nodes: List[str]
+    # KG node of the enclosing class, or None
+    parents: List[Optional[str]]
+    # 1-based (start_line, end_line) of each chunk
+    spans: List[Tuple[int, int]]
+    parse_s: float
+    split_s: float
+    graph: Optional[KG] = None
+
+
+def parse_file(path: str, root: Optional[str] = None, with_graph: bool = False) -> FileChunks:
+    """Read, parse and split one file; the process-pool entry point.
+
+    Args:
+        path: File to chunk.
+        root: Project root that KG node ids are relative to. Defaults to the
+            file's directory.
+        with_graph: Also return the file's knowledge-graph fragment.
+
+    Returns:
+        The chunks with their KG node and parent ids and line spans,
+        read+parse and split seconds, and the KG fragment if requested.
+    """
+    parsed = parse_source(path, root or str(Path(path).parent))
+    t1 = time.perf_counter()
+    # Files without classes or functions become one chunk owned by the module
+    blocks = [(b.text, b.kg_node, b.parent, b.start_line) for b in parsed.blocks]
+    blocks = blocks or [(parsed.source, parsed.module, None, 1)]
+
+    chunks: List[str] = []
+    kg_nodes: List[str] = []
+    parents: List[Optional[str]] = []
+    spans: List[Tuple[int, int]] = []
+    for text, kg_node, parent, start_line in blocks:
+        pos = 0
+        for chunk in split_blocks([text]):
+            # Pieces are substrings of the block, in order (overlapping)
+            offset = text.find(chunk, pos)
+            if offset < 0:
+                offset = max(text.find(chunk), 0)
+            pos = offset + 1
+            first = start_line + text.count("\n", 0, offset)
+            chunks.append(chunk)
+            kg_nodes.append(kg_node)
+            parents.append(parent)
+            spans.append((first, first + chunk.count("\n")))
+    split_s = time.perf_counter() - t1
+    return FileChunks(chunks, kg_nodes, parents, spans, parsed.parse_s, split_s, parsed.kg if with_graph else None)
@@ -0,0 +1,377 @@
+# collection_alias.py
+"""Blue/green versioned Chroma collections behind logical aliases.
+
+Readers resolve a logical name (``code_chunks``, ``node_embeddings``) to the
+physical collection currently serving it (``code_chunks__v7``). A rebuild
+writes a new version while the old one keeps serving, validates it (count
+and sample self-recall), then flips the alias by atomically replacing the
+alias manifest. Older versions are garbage-collected, keeping the previous
+one so processes that have not yet switched can still read it.
+
+Chroma collection names may only contain ``[a-zA-Z0-9._-]``, so versions
+use ``<name>__v<N>`` rather than ``<name>@v<N>``.
+
+Usage:
+    python -m core.collection_alias status
+    python -m core.collection_alias rebuild code_chunks --path infos
+    python -m core.collection_alias rebuild node_embeddings --kg graph_indexing/knowledge_graph.json
+    python -m core.collection_alias gc code_chunks
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import chromadb
+
+from config.logger import log
+from config.settings import EmbeddingConfig, IndexConfig
+from core.code_exceptions import ChromaError, GraphRAGError
+from core.index_manifest import IndexManifest
+
+VERSION_SEPARATOR = "__v"
+
+
+def version_name(logical: str, version: int) -> str:
+    """Physical collection name of ``version`` of ``logical``."""
+    return f"{logical}{VERSION_SEPARATOR}{version}"
+
+
+@dataclass
+class ValidationReport:
+    """Result of validating a freshly built collection version."""
+    ok: bool
+    count: int
+    baseline_count: int
+    recall: float
+    reason: str = ""
+
+
+class CollectionAliases:
+    """Logical -> physical collection mapping persisted as JSON.
+
+    Reads are cached and refreshed when the file's mtime changes, so
+    resolving an alias on every request costs one ``os.stat``.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = {"aliases": {}}
+        self._mtime: Optional[float] = None
+
+    def _refresh(self) -> None:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            self._data, self._mtime = {"aliases": {}}, None
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+            self._mtime = mtime
+        except Exception:
+            log.warning(f"Could not read collection aliases from {self.path}")
+
+    def _write(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, indent=2)
+        os.replace(tmp, self.path)
+        self._mtime = os.stat(self.path).st_mtime
+
+    def _entry(self, logical: str) -> Dict[str, Any]:
+        return self._data.setdefault("aliases", {}).setdefault(
+            logical, {"current": None, "next_version": 1, "versions": []}
+        )
+
+    def resolve(self, logical: str) -> str:
+        """Return the physical collection serving ``logical``.
+
+        Without an alias the logical name itself is the collection, which
+        keeps un-versioned deployments working unchanged.
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._data.get("aliases", {}).get(logical)
+            return (entry or {}).get("current") or logical
+
+    def describe(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return json.loads(json.dumps(self._data.get("aliases", {})))
+
+    def begin_version(self, logical: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Allocate the next version of ``logical`` and mark it as building."""
+        with self._lock:
+            self._refresh()
+            entry = self._entry(logical)
+            version = int(entry.get("next_version", 1))
+            entry["next_version"] = version + 1
+            physical = version_name(logical, version)
+            entry["versions"].append({
+                "name": physical,
+                "version": version,
+                "status": "building",
+                "created_at": time.time(),
+                **(metadata or {}),
+            })
+            self._write()
+            return physical
+
+    def _set_status(self, entry: Dict[str, Any], physical: str, status: str, **extra: Any) -> None:
+        for version in entry["versions"]:
+            if version["name"] == physical:
+                version["status"] = status
+                version.update(extra)
+
+    def mark_failed(self, logical: str, physical: str, reason: str) -> None:
+        with self._lock:
+            self._refresh()
+            self._set_status(self._entry(logical), physical, "failed", reason=reason)
+            self._write()
+
+    def promote(self, logical: str, physical: str, **extra: Any) -> Optional[str]:
+        """Atomically point ``logical`` at ``physical``.
+
+        Returns:
+            The previously current physical collection, if any.
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._entry(logical)
+            previous = entry.get("current") or logical
+            if entry.get("current"):
+                self._set_status(entry, entry["current"], "retired", retired_at=time.time())
+            else:
+                # The un-versioned collection served until now; retire it as v0
+                entry["versions"].append(
+                    {"name": logical, "version": 0, "status": "retired", "retired_at": time.time()}
+                )
+            self._set_status(entry, physical, "live", promoted_at=time.time(), **extra)
+            entry["current"] = physical
+            self._write()
+            return previous
+
+    def collect_garbage(
+        self,
+        client: Any,
+        logical: str,
+        keep: int = 1,
+        on_delete: Optional[Callable[[str], None]] = None,
+    ) -> List[str]:
+        """Delete retired and failed versions, keeping the newest ``keep`` retired ones.
+
+        Args:
+            client: Chroma client owning the collections.
+            logical: Logical collection name.
+            keep: Retired versions to keep for processes not yet switched.
+            on_delete: Called with each deleted collection name, e.g. to
+                drop its index manifest.
+
+        Returns:
+            Names of the deleted collections.
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._entry(logical)
+            retired = [v for v in entry["versions"] if v["status"] == "retired"]
+            retired.sort(key=lambda v: v["version"], reverse=True)
+            doomed = retired[keep:] + [v for v in entry["versions"] if v["status"] == "failed"]
+            deleted: List[str] = []
+            for version in doomed:
+                try:
+                    client.delete_collection(version["name"])
+                except Exception:
+                    log.debug(f"Collection {version['name']} already gone")
+                if on_delete is not None:
+                    on_delete(version["name"])
+                deleted.append(version["name"])
+            names = set(deleted)
+            entry["versions"] = [v for v in entry["versions"] if v["name"] not in names]
+            if deleted:
+                self._write()
+            return deleted
+
+
+def validate_collection(
+    collection: chromadb.Collection,
+    baseline_count: int,
+    config: Optional[IndexConfig] = None,
+) -> ValidationReport:
+    """Check a new collection version before it starts serving.
+
+    The version must not be empty, must hold at least ``min_count_ratio`` of
+    the documents of the version it replaces, and a sample of its own
+    vectors must find themselves among the top results (self-recall).
+
+    Args:
+        collection: Freshly built collection.
+        baseline_count: Document count of the currently serving version.
+        config: Validation thresholds.
+
+    Returns:
+        Validation report.
+    """
+    config = config or IndexConfig.from_env()
+    count = collection.count()
+    if count == 0:
+        return ValidationReport(False, count, baseline_count, 0.0, "new version is empty")
+    if baseline_count and count < config.min_count_ratio * baseline_count:
+        return ValidationReport(
+            False, count, baseline_count, 0.0,
+            f"new version has {count} documents, fewer than {config.min_count_ratio:.0%} of {baseline_count}",
+        )
+
+    ids = collection.get(include=[])["ids"]
+    sample = random.sample(ids, min(config.recall_samples, len(ids)))
+    rows = collection.get(ids=sample, include=["embeddings"])
+    embeddings = rows.get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        return ValidationReport(False, count, baseline_count, 0.0, "sampled documents have no embeddings")
+    results = collection.query(query_embeddings=embeddings, n_results=min(5, count), include=[])
+    hits = sum(1 for doc_id, found in zip(rows["ids"], results["ids"]) if doc_id in found)
+    recall = hits / len(rows["ids"])
+    if recall < config.min_recall:
+        return ValidationReport(
+            False, count, baseline_count, recall, f"sample recall {recall:.2f} below {config.min_recall:.2f}"
+        )
+    return ValidationReport(True, count, baseline_count, recall)
+
+
+def blue_green_rebuild(
+    client: Any,
+    aliases: CollectionAliases,
+    logical: str,
+    build: Callable[[chromadb.Collection], None],
+    config: Optional[IndexConfig] = None,
+    on_delete: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Build a new version of ``logical`` and flip the alias once it validates.
+
+    The serving version is untouched until the flip, so readers never see a
+    half-written collection.
+
+    Args:
+        client: Chroma client.
+        aliases: Alias manifest.
+        logical: Logical collection name.
+        build: Fills the new (empty) collection.
+        config: Validation and retention settings.
+        on_delete: Called with each garbage-collected collection name.
+
+    Returns:
+        Name of the new physical collection.
+
+    Raises:
+        ChromaError: If the build or validation fails; the alias is unchanged.
+        GraphRAGError: Errors of the project's own types (e.g.
+            ``IndexingCancelled``) raised by ``build`` propagate unchanged.
+    """
+    config = config or IndexConfig.from_env()
+    current = aliases.resolve(logical)
+    try:
+        baseline = client.get_collection(current).count()
+    except Exception:
+        baseline = 0
+
+    physical = aliases.begin_version(logical, {"embedding_model": EmbeddingConfig.from_env().model_name})
+    log.info(f"Building {physical} (serving {current} with {baseline} documents)")
+    try:
+        target = client.get_or_create_collection(name=physical, metadata={"hnsw:space": "cosine"})
+        build(target)
+        report = validate_collection(target, baseline, config)
+    except Exception as exc:
+        aliases.mark_failed(logical, physical, f"{type(exc).__name__}: {exc}")
+        aliases.collect_garbage(client, logical, keep=config.keep_versions, on_delete=on_delete)
+        if isinstance(exc, GraphRAGError):
+            raise
+        raise ChromaError(f"Rebuild of {logical} failed: {exc}") from exc
+
+    if not report.ok:
+        aliases.mark_failed(logical, physical, report.reason)
+        aliases.collect_garbage(client, logical, keep=config.keep_versions, on_delete=on_delete)
+        raise ChromaError(f"Rebuild of {logical} rejected: {report.reason}")
+
+    aliases.promote(logical, physical, count=report.count, recall=round(report.recall, 3))
+    deleted = aliases.collect_garbage(client, logical, keep=config.keep_versions, on_delete=on_delete)
+    log.info(
+        f"{logical} now served by {physical} ({report.count} documents, recall {report.recall:.2f}); "
+        f"garbage-collected {deleted or 'nothing'}"
+    )
+    return physical
+
+
+# Global alias manifest
+_aliases: Optional[CollectionAliases] = None
+_aliases_lock = threading.Lock()
+
+
+def get_aliases() -> CollectionAliases:
+    """Get the process-wide alias manifest configured from the environment."""
+    global _aliases
+    if _aliases is None:
+        with _aliases_lock:
+            if _aliases is None:
+                _aliases = CollectionAliases(IndexConfig.from_env().alias_manifest)
+    return _aliases
+
+
+def resolve_collection(logical: str) -> str:
+    """Resolve a logical collection name through the global alias manifest."""
+    return get_aliases().resolve(logical)
+
+
+def drop_index_manifest(collection_name: str) -> None:
+    """Remove the index manifest of a deleted collection version."""
+    path = IndexManifest.for_collection(IndexConfig.from_env().manifest_dir, collection_name).path
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage versioned Chroma collections")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Show aliases and versions")
+    rebuild = sub.add_parser("rebuild", help="Build a new version and flip the alias")
+    rebuild.add_argument("collection", choices=["code_chunks", "node_embeddings"])
+    rebuild.add_argument("--path", action="append", default=[], help="Folder to index (code_chunks)")
+    rebuild.add_argument("--kg", default=os.getenv("KG_JSON_PATH", "graph_indexing/knowledge_graph.json"),
+                         help="Knowledge graph JSON (node_embeddings)")
+    gc = sub.add_parser("gc", help="Delete old versions")
+    gc.add_argument("collection")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        print(json.dumps(get_aliases().describe(), indent=2))
+        return
+
+    client = chromadb.PersistentClient(path=os.getenv("CHROMA_PATH", "vectorstore/chroma_db"))
+    if args.command == "gc":
+        print(get_aliases().collect_garbage(
+            client, args.collection, IndexConfig.from_env().keep_versions, on_delete=drop_index_manifest
+        ))
+    elif args.collection == "code_chunks":
+        from core.chunker import rebuild_code_chunks
+
+        report = rebuild_code_chunks(args.path)
+        print(json.dumps({"indexed_files": len(report.indexed_files), "stored": report.stored}))
+    else:
+        from core.embed_nodes import embed_nodes
+
+        physical = blue_green_rebuild(
+            client, get_aliases(), "node_embeddings", lambda target: embed_nodes(args.kg, collection=target)
+        )
+        print(physical)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,16 @@ transformer, and stored in the `node_embeddings` collection.
 
 import json
 import os
+from typing import Any, Dict, Iterable, List, Set, Tuple
 
 import chromadb
+from config.settings import IndexConfig
+from core.batch_writer import BatchUpserter
 from core.code_exceptions import ChromaError, EmbeddingError
+from core.collection_alias import resolve_collection
 from config.logger import log
-from core.embeddings import embed_text
+from core.semantic_cache import invalidate_cached_references
+from graph_indexing.kgbuild.kgio import iter_nodes, read_graph
 
 
 def load_kg(path: str) -> dict:
@@ -29,8 +34,7 @@ def load_kg(path: str) -> dict:
     """
     try:
         log.info(f"Loading knowledge graph from {path}")
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = read_graph(path)
         log.info("Knowledge graph loaded successfully")
         return data
     except (FileNotFoundError, json.JSONDecodeError):
@@ -72,76 +76,147 @@ def build_text_blob(node: dict) -> str:
     return blob
 
 
-def embed_nodes(kg_path: str, chroma_path: str | None = None) -> None:
+def _open_collection(chroma_path: str | None = None) -> chromadb.Collection:
+    chroma_path = chroma_path or os.getenv("CHROMA_PATH", "vectorstore/chroma_db")
+    log.info(f"Connecting to ChromaDB at {chroma_path}")
+    client = chromadb.PersistentClient(path=chroma_path)
+    return client.get_or_create_collection(
+        name=resolve_collection("node_embeddings"),
+        metadata={"hnsw:space": "cosine"},
+    )
+
+
+def upsert_nodes(collection: chromadb.Collection, nodes: Iterable[Dict[str, Any]]) -> Tuple[List[str], int, int]:
+    """Embed knowledge-graph nodes and upsert them in batches.
+
+    Nodes stored with the same text blob and metadata are not embedded
+    again and are not reported as written, so re-embedding a graph only
+    costs (and invalidates) the nodes that changed.
+
+    Args:
+        collection: Collection receiving the node embeddings.
+        nodes: Node dictionaries as stored in ``knowledge_graph.json``.
+
+    Returns:
+        Tuple of (ids written, number of nodes skipped, number of nodes
+        unchanged).
+    """
+    skipped = 0
+    writer = BatchUpserter(collection, IndexConfig.from_env().write_batch_size, skip_unchanged=True)
+    for node in nodes:
+        nid = node.get("id")
+        if not nid:
+            log.debug("Skipping node without ID")
+            skipped += 1
+            continue
+
+        blob = build_text_blob(node)
+        if not blob:
+            log.debug(f"Skipping node {nid}: empty text blob")
+            skipped += 1
+            continue
+
+        # File and signature let neighbour hydration skip parsing the blob
+        props = node.get("props") or {}
+        metadata = {"type": node.get("type", "unknown")}
+        metadata.update({key: props[key] for key in ("file", "signature") if props.get(key)})
+        writer.add(nid, blob, metadata)
+
+    writer.flush()
+    return writer.written, skipped + len(writer.skipped), len(writer.unchanged)
+
+
+def update_node_embeddings(
+    nodes: List[Dict[str, Any]],
+    removed_ids: Set[str],
+    collection: chromadb.Collection | None = None,
+) -> List[str]:
+    """Apply a knowledge-graph patch to the node embeddings.
+
+    Args:
+        nodes: Nodes added or re-extracted by the patch.
+        removed_ids: Ids of the nodes the patch replaced or deleted.
+        collection: Collection to update instead of the one serving
+            ``node_embeddings``.
+
+    Returns:
+        Ids of every node embedding written or deleted.
+
+    Raises:
+        ChromaError: If ChromaDB operations fail.
+    """
+    try:
+        collection = collection or _open_collection()
+        written, _, _ = upsert_nodes(collection, nodes)
+        gone = sorted(removed_ids - {node["id"] for node in nodes})
+        if gone:
+            collection.delete(ids=gone)
+        log.info(f"Node embeddings patched: {len(written)} written, {len(gone)} deleted")
+        return written + gone
+    except (ChromaError, EmbeddingError):
+        raise
+    except Exception as exc:
+        log.exception("Failed to patch node embeddings")
+        raise ChromaError(f"Node embedding patch failed: {exc}") from exc
+
+
+def apply_graph_diff(diff_path: str, collection: chromadb.Collection | None = None) -> List[str]:
+    """Apply a ``knowledge_graph.diff.json`` written by an incremental KG build.
+
+    Only added and changed nodes are embedded, and removed nodes deleted,
+    instead of re-embedding the whole graph.
+
+    Args:
+        diff_path: Diff written next to the knowledge graph by ``runner.py``.
+        collection: Collection to update instead of the one serving
+            ``node_embeddings``.
+
+    Returns:
+        Ids of every node embedding written or deleted.
+
+    Raises:
+        ChromaError: If ChromaDB operations fail.
+    """
+    from graph_indexing.kgbuild.incremental import load_diff
+
+    diff = load_diff(diff_path)
+    log.info(f"Applying knowledge-graph diff {diff_path}: {diff.summary()}")
+    affected = update_node_embeddings(diff.added_nodes + diff.changed_nodes, set(diff.removed_nodes), collection)
+    invalidate_cached_references(node_ids=affected)
+    return affected
+
+
+def embed_nodes(
+    kg_path: str,
+    chroma_path: str | None = None,
+    collection: chromadb.Collection | None = None,
+) -> None:
     """Embed all nodes from a knowledge graph into ChromaDB.
 
     Args:
         kg_path: Path to the JSON knowledge-graph file.
         chroma_path: Directory where ChromaDB data is stored.
+        collection: Collection to write to instead of the one serving
+            ``node_embeddings`` (used by blue/green rebuilds).
     
     Raises:
         ChromaError: If ChromaDB operations fail.
         EmbeddingError: If text embedding fails.
     """
     try:
-        kg = load_kg(kg_path)
-        nodes = kg.get("nodes", [])
-        log.info(f"Loaded {len(nodes)} nodes from {kg_path}")
-
-        if not nodes:
+        if not os.path.exists(kg_path):
+            raise FileNotFoundError(kg_path)
+        if collection is None:
+            # Use environment variable or provided path
+            collection = _open_collection(chroma_path)
+        log.info(f"ChromaDB collection {collection.name} ready")
+
+        # Nodes are streamed from NDJSON graphs, so memory stays flat
+        written, skipped, unchanged = upsert_nodes(collection, iter_nodes(kg_path))
+        if not written and not skipped and not unchanged:
             log.warning("No nodes found in knowledge graph")
-            return
-
-        # Use environment variable or provided path
-        chroma_path = chroma_path or os.getenv("CHROMA_PATH", "vectorstore/chroma_db")
-        
-        log.info(f"Connecting to ChromaDB at {chroma_path}")
-        client = chromadb.PersistentClient(path=chroma_path)
-        collection = client.get_or_create_collection(
-            name="node_embeddings",
-            metadata={"hnsw:space": "cosine"},
-        )
-        log.info("ChromaDB collection ready")
-
-        count = 0
-        skipped = 0
-        
-        for node in nodes:
-            nid = node.get("id")
-            if not nid:
-                log.debug("Skipping node without ID")
-                skipped += 1
-                continue
-
-            blob = build_text_blob(node)
-            if not blob:
-                log.debug(f"Skipping node {nid}: empty text blob")
-                skipped += 1
-                continue
-
-            try:
-                vec = embed_text(blob)
-                if not vec:
-                    log.debug(f"Skipping node {nid}: empty embedding")
-                    skipped += 1
-                    continue
-                    
-                from typing import Sequence, List, cast
-                embeddings: List[Sequence[float]] = [cast(Sequence[float], vec)]
-                collection.upsert(
-                    ids=[nid],
-                    embeddings=embeddings,
-                    documents=[blob],
-                    metadatas=[{"type": node.get("type", "unknown")}],
-                )
-                count += 1
-                log.debug(f"Embedded node {nid}")
-            except EmbeddingError:
-                log.warning(f"Failed to embed node {nid}, skipping")
-                skipped += 1
-                continue
-
-        log.info(f"Embedded {count} nodes into ChromaDB (skipped {skipped})")
+        log.info(f"Embedded {len(written)} nodes into ChromaDB (unchanged {unchanged}, skipped {skipped})")
+        invalidate_cached_references(node_ids=written)
         
     except (ChromaError, EmbeddingError):
         raise
@@ -151,9 +226,18 @@ def embed_nodes(kg_path: str, chroma_path: str | None = None) -> None:
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Embed knowledge-graph nodes into ChromaDB")
+    parser.add_argument("--kg", default=os.getenv("KG_JSON_PATH", "graph_indexing/knowledge_graph.json"),
+                        help="Knowledge-graph JSON to embed")
+    parser.add_argument("--diff", help="Apply only this knowledge_graph.diff.json instead of embedding every node")
+    args = parser.parse_args()
     try:
-        kg_path = os.getenv("KG_JSON_PATH", "graph_indexing/knowledge_graph.json")
-        embed_nodes(kg_path)
+        if args.diff:
+            apply_graph_diff(args.diff)
+        else:
+            embed_nodes(args.kg)
         log.info("Node embedding process completed successfully")
     except (ChromaError, EmbeddingError):
         log.error("Node embedding process failed")
@@ -7,18 +7,36 @@ Refactored to use dependency injection for better testability.
 """
 
 from functools import lru_cache
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, List, Optional
 import threading
 
 from config.settings import EmbeddingConfig
 from core.code_exceptions import EmbeddingError
 from core.interfaces import EmbeddingProvider
+from core.startup import LazyService
 from config.logger import log
-from sentence_transformers import SentenceTransformer
 
 # Observability
 from observability.tracing import trace_span
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+def _sentence_transformer_class() -> Any:
+    """Import sentence-transformers (and torch) on first use; it takes seconds."""
+    cls = globals().get("SentenceTransformer")
+    if cls is None:
+        from sentence_transformers import SentenceTransformer as cls
+        globals()["SentenceTransformer"] = cls
+    return cls
+
+
+def __getattr__(name: str) -> Any:
+    if name == "SentenceTransformer":
+        return _sentence_transformer_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class SentenceTransformerEmbedding(EmbeddingProvider):
     """Sentence transformer implementation of EmbeddingProvider."""
@@ -30,16 +48,16 @@ class SentenceTransformerEmbedding(EmbeddingProvider):
             config: Embedding configuration.
         """
         self._config = config
-        self._model: Optional[SentenceTransformer] = None
+        self._model: Optional["SentenceTransformer"] = None
         self._lock = threading.Lock()
 
     @lru_cache(maxsize=1)
-    def _get_model(self) -> SentenceTransformer:
+    def _get_model(self) -> "SentenceTransformer":
         """Get cached model instance."""
         if self._model is None:
             try:
                 log.info(f"Loading embedding model: {self._config.model_name}")
-                self._model = SentenceTransformer(self._config.model_name)
+                self._model = _sentence_transformer_class()(self._config.model_name)
                 log.info("Embedding model loaded successfully")
             except Exception as exc:
                 log.exception("Failed to load embedding model")
@@ -85,6 +103,46 @@ class SentenceTransformerEmbedding(EmbeddingProvider):
             log.exception("Failed to embed text")
             raise EmbeddingError(f"Embedding failed: {exc}") from exc
 
+    @trace_span("rag.embed.batch")
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts with one batched model call.
+
+        Args:
+            texts: Texts to embed. Empty strings map to empty vectors.
+
+        Returns:
+            One vector per input text, in order.
+
+        Raises:
+            EmbeddingError: If embedding generation fails.
+        """
+        for text in texts:
+            if not isinstance(text, str):
+                raise EmbeddingError(f"Expected string input, got {type(text).__name__}")
+
+        vectors: List[List[float]] = [[] for _ in texts]
+        positions = [i for i, text in enumerate(texts) if text]
+        if not positions:
+            return vectors
+
+        try:
+            model = self._get_model()
+            log.debug(f"Embedding batch of {len(positions)} texts")
+
+            with self._lock:
+                encoded = model.encode(
+                    [texts[i] for i in positions],
+                    batch_size=self._config.batch_size,
+                    normalize_embeddings=self._config.normalize_embeddings,
+                ).tolist()
+
+            for i, vec in zip(positions, encoded):
+                vectors[i] = vec
+            return vectors
+        except Exception as exc:
+            log.exception("Failed to embed batch")
+            raise EmbeddingError(f"Batch embedding failed: {exc}") from exc
+
     def get_model_info(self) -> dict:
         """Get information about the embedding model.
 
@@ -95,6 +153,7 @@ class SentenceTransformerEmbedding(EmbeddingProvider):
             "model_name": self._config.model_name,
             "normalize_embeddings": self._config.normalize_embeddings,
             "cache_size": self._config.cache_size,
+            "batch_size": self._config.batch_size,
         }
 
 
@@ -102,13 +161,13 @@ class SentenceTransformerEmbedding(EmbeddingProvider):
 # These will be deprecated in favor of the DI approach
 
 # Global instance for backward compatibility
-_legacy_config = EmbeddingConfig()
+_legacy_config = EmbeddingConfig(batch_size=EmbeddingConfig.from_env().batch_size)
 _legacy_provider = SentenceTransformerEmbedding(_legacy_config)
 _legacy_lock = threading.Lock()
+_legacy_model = LazyService("embedding_model", lambda: _legacy_provider._get_model())
 
 
-@lru_cache(maxsize=1)
-def get_model() -> SentenceTransformer:
+def get_model() -> "SentenceTransformer":
     """Load and cache the sentence transformer model.
 
     DEPRECATED: Use SentenceTransformerEmbedding service instead.
@@ -119,7 +178,7 @@ def get_model() -> SentenceTransformer:
     Raises:
         EmbeddingError: If model loading fails.
     """
-    return _legacy_provider._get_model()
+    return _legacy_model.get()
 
 
 @trace_span("rag.embed.legacy")
@@ -139,3 +198,20 @@ def embed_text(text: str) -> List[float]:
     """
     with _legacy_lock:
         return _legacy_provider.embed(text)
+
+
+@trace_span("rag.embed.legacy.batch")
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embed several texts with one batched model call.
+
+    Args:
+        texts: Texts to embed. Empty strings map to empty vectors.
+
+    Returns:
+        One vector per input text, in order.
+
+    Raises:
+        EmbeddingError: If embedding generation fails.
+    """
+    with _legacy_lock:
+        return _legacy_provider.embed_batch(texts)
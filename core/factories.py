@@ -12,8 +12,9 @@ from core.interfaces import (
     EmbeddingProvider, VectorStore, CacheProvider,
     GraphDatabase, LLMProvider, DocumentProcessor
 )
+from core.embeddings import SentenceTransformerEmbedding
 from core.services import (
-    SentenceTransformerEmbedding, ChromaVectorStore, SemanticCacheProvider,
+    ChromaVectorStore, SemanticCacheProvider,
     Neo4jGraphDatabase, GroqLLMProvider, JSONDocumentProcessor
 )
 from config.settings import GraphRAGConfig
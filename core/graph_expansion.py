@@ -0,0 +1,391 @@
+# graph_expansion.py
+"""Graph expansion of retrieved nodes, in process or through Neo4j.
+
+``GRAPH_BACKEND`` selects how the neighbours of the retrieved nodes are
+found:
+
+- ``local`` (default): breadth-first search over the knowledge graph held in
+  memory as a ``FrozenKG``, loaded from ``GRAPH_KG_PATH`` (or its
+  ``.csr`` directory when that is up to date) and reloaded when the file
+  changes. No network hop and no database to run.
+- ``neo4j``: the same traversal as a Cypher query against Neo4j.
+- ``none``: no expansion.
+
+Both backends follow only ``GRAPH_EDGE_TYPES`` (in either direction), stop
+after ``GRAPH_EXPAND_DEPTH`` hops and return at most ``GRAPH_MAX_NEIGHBORS``
+ids. The local backend also follows at most ``GRAPH_FANOUT`` edges per node,
+the most frequent first, so hub nodes cannot flood the context. It then
+ranks the neighbours it found by personalized PageRank seeded with the
+retrieved nodes, computed over the expanded subgraph (ties broken by the
+global PageRank stored at build time), and keeps the top
+``GRAPH_TOP_NEIGHBORS``.
+
+``hydrate_neighbors`` turns the neighbour ids into compact text for the
+prompt: the node's signature and the start of its docstring, never its
+code. The local graph already holds both; otherwise they come from the
+node collection in a single ``get``. Entries are added in rank order while
+they fit in ``GRAPH_CONTEXT_TOKENS``.
+"""
+
+import os
+import threading
+from itertools import chain, zip_longest
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from config.logger import log
+from config.settings import GraphConfig, Neo4jConfig
+from core.code_exceptions import ChromaError
+from core.startup import LazyService
+from graph_indexing.kgbuild.centrality import personalized_pagerank
+from graph_indexing.kgbuild.frozen import FrozenKG, csr_path_for
+
+
+def load_frozen_graph(kg_path: str) -> FrozenKG:
+    """Load ``kg_path`` as a ``FrozenKG``, from its ``.csr`` directory if that is newer."""
+    meta = os.path.join(csr_path_for(kg_path), "meta.json")
+    if os.path.exists(meta) and os.path.getmtime(meta) >= os.path.getmtime(kg_path):
+        return FrozenKG.load(os.path.dirname(meta))
+    return FrozenKG.from_file(kg_path)
+
+
+class LocalGraphExpander:
+    """k-hop expansion over an in-memory ``FrozenKG``."""
+
+    def __init__(self, graph: FrozenKG, config: GraphConfig, source_mtime: Optional[float] = None) -> None:
+        """Initialize the expander.
+
+        Args:
+            graph: Graph to traverse.
+            config: Edge types, depth, fan-out cap and neighbour budget.
+            source_mtime: Modification time of the file ``graph`` was loaded
+                from, to notice when it changes.
+        """
+        self.graph = graph
+        self.config = config
+        self.source_mtime = source_mtime
+
+    @classmethod
+    def from_path(cls, config: GraphConfig) -> "LocalGraphExpander":
+        """Load the graph at ``config.kg_path``; a missing file expands to nothing."""
+        if not os.path.exists(config.kg_path):
+            log.warning(f"Knowledge graph {config.kg_path} not found, graph expansion returns no neighbours")
+            return cls(FrozenKG.build([], []), config)
+        mtime = os.path.getmtime(config.kg_path)
+        graph = load_frozen_graph(config.kg_path)
+        log.info(f"Loaded knowledge graph {config.kg_path} for expansion ({len(graph)} nodes)")
+        return cls(graph, config, mtime)
+
+    def is_stale(self) -> bool:
+        """Whether the graph file changed (or appeared) since it was loaded."""
+        try:
+            return os.path.getmtime(self.config.kg_path) != self.source_mtime
+        except OSError:
+            return self.source_mtime is not None
+
+    def _next_hops(self, node_id: str) -> List[str]:
+        """Neighbours of ``node_id`` over the configured edge types, capped at the fan-out."""
+        weights: Dict[str, int] = {}
+        for neighbor, _, count in self.graph.neighbors(node_id, self.config.edge_types, direction="both"):
+            # Edge-only endpoints (unresolved calls such as ``print``) have no
+            # content and would connect unrelated code
+            if self.graph.node(neighbor) is not None:
+                weights[neighbor] = weights.get(neighbor, 0) + count
+        ranked = sorted(weights, key=lambda n: (-weights[n], n))
+        return ranked[: self.config.fanout]
+
+    def rank(self, node_ids: Sequence[str], neighbors: List[str]) -> List[Tuple[str, float]]:
+        """Rank ``neighbors`` by personalized PageRank seeded with ``node_ids``.
+
+        The walk runs over the subgraph of seeds and neighbours, edges in
+        both directions weighted by multiplicity.
+
+        Returns:
+            ``(id, score)`` pairs, most relevant first.
+        """
+        nodes = list(dict.fromkeys([n for n in node_ids if n in self.graph] + neighbors))
+        index = {node_id: i for i, node_id in enumerate(nodes)}
+        src: List[int] = []
+        dst: List[int] = []
+        weight: List[float] = []
+        for i, node_id in enumerate(nodes):
+            for neighbor, _, count in self.graph.neighbors(node_id, self.config.edge_types, direction="both"):
+                j = index.get(neighbor)
+                if j is not None:
+                    src.append(i)
+                    dst.append(j)
+                    weight.append(count)
+        teleport = np.zeros(len(nodes))
+        teleport[: len(nodes) - len(neighbors)] = 1.0
+        scores = personalized_pagerank(
+            len(nodes), np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64), np.asarray(weight), teleport
+        )
+        ranked = [(n, float(scores[index[n]])) for n in neighbors]
+        ranked.sort(key=lambda item: (-item[1], -self.graph.score(item[0], "pagerank"), item[0]))
+        return ranked
+
+    def expand(self, node_ids: Sequence[str], depth: Optional[int] = None) -> List[str]:
+        """Return the most relevant ids within ``depth`` hops of ``node_ids``.
+
+        Each hop visits the frontier round-robin, so every seed contributes
+        before the neighbour budget runs out. The neighbours found are then
+        ranked (see ``rank``) and cut to ``top_neighbors``; with
+        ``top_neighbors`` 0 they are returned nearest first. Seeds are never
+        returned.
+        """
+        found = self._breadth_first(node_ids, depth)
+        if not self.config.top_neighbors or not found:
+            return found
+        return [node_id for node_id, _ in self.rank(node_ids, found)[: self.config.top_neighbors]]
+
+    def _breadth_first(self, node_ids: Sequence[str], depth: Optional[int]) -> List[str]:
+        depth = self.config.depth if depth is None else depth
+        seen = set(node_ids)
+        frontier = [n for n in dict.fromkeys(node_ids) if n in self.graph]
+        found: List[str] = []
+        for _ in range(depth):
+            hops = zip_longest(*(self._next_hops(n) for n in frontier))
+            frontier = []
+            for neighbor in chain.from_iterable(hops):
+                if neighbor is None or neighbor in seen:
+                    continue
+                seen.add(neighbor)
+                found.append(neighbor)
+                frontier.append(neighbor)
+                if len(found) >= self.config.max_neighbors:
+                    return found
+            if not frontier:
+                break
+        return found
+
+
+class Neo4jGraphExpander:
+    """k-hop expansion through ``Neo4jGraphDatabase`` (one query per request)."""
+
+    def __init__(self, database: Any, config: GraphConfig) -> None:
+        """Initialize the expander.
+
+        Args:
+            database: Connected ``Neo4jGraphDatabase``.
+            config: Depth used when ``expand`` is not given one.
+        """
+        self.database = database
+        self.config = config
+
+    @classmethod
+    def connect(cls, config: GraphConfig) -> "Neo4jGraphExpander":
+        """Connect to the Neo4j instance named by the ``NEO4J_*`` settings.
+
+        Raises:
+            Neo4jError: If the settings are incomplete or the connection fails.
+        """
+        from core.services import Neo4jGraphDatabase
+
+        database = Neo4jGraphDatabase(Neo4jConfig.from_env(), config)
+        database.connect()
+        return cls(database, config)
+
+    def expand(self, node_ids: Sequence[str], depth: Optional[int] = None) -> List[str]:
+        """Return the ids within ``depth`` hops of ``node_ids``, nearest first.
+
+        Raises:
+            Neo4jError: If the query fails.
+        """
+        return self.database.expand_neighbors(list(node_ids), self.config.depth if depth is None else depth)
+
+    def close(self) -> None:
+        """Release the shared driver."""
+        self.database.close()
+
+
+GraphExpander = Union[LocalGraphExpander, Neo4jGraphExpander]
+
+
+def _create_expander() -> Optional[GraphExpander]:
+    config = GraphConfig.from_env()
+    if config.backend == "local":
+        return LocalGraphExpander.from_path(config)
+    if config.backend == "neo4j":
+        return Neo4jGraphExpander.connect(config)
+    if config.backend != "none":
+        log.warning(f"Unknown GRAPH_BACKEND {config.backend!r}, graph expansion disabled")
+    return None
+
+
+_expander = LazyService("graph", _create_expander)
+_reload_lock = threading.Lock()
+
+
+def get_expander() -> Optional[GraphExpander]:
+    """Return the configured expander, reloading the local graph when its file changed."""
+    expander = _expander.get()
+    if isinstance(expander, LocalGraphExpander) and expander.is_stale():
+        with _reload_lock:
+            expander = _expander.get()
+            if expander.is_stale():
+                log.info(f"Knowledge graph {expander.config.kg_path} changed, reloading")
+                expander = LocalGraphExpander.from_path(expander.config)
+                _expander.set(expander)
+    return expander
+
+
+def expand_graph(node_ids: Sequence[str], depth: Optional[int] = None) -> List[str]:
+    """Expand node ids with the configured backend.
+
+    Args:
+        node_ids: Ids of the retrieved nodes.
+        depth: Hops to follow; defaults to ``GRAPH_EXPAND_DEPTH``.
+
+    Returns:
+        Neighbour ids, nearest first; empty when expansion is disabled.
+
+    Raises:
+        Neo4jError: If the Neo4j backend fails.
+    """
+    expander = get_expander()
+    if expander is None or not node_ids:
+        return []
+    neighbors = expander.expand(node_ids, depth)
+    log.debug(f"Expanded {len(node_ids)} nodes to {len(neighbors)} neighbours")
+    return neighbors
+
+
+# Rough size of a token in source text; no tokenizer is needed for a budget
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of tokens in ``text``."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _first_paragraph(doc: str, limit: int) -> str:
+    """First paragraph of a docstring on one line, cut to ``limit`` characters."""
+    text = " ".join(doc.strip().split("\n\n", 1)[0].split())
+    return text if len(text) <= limit else text[: max(limit - 1, 0)].rstrip() + "…"
+
+
+def compact_text(node_id: str, info: Dict[str, Any], doc_chars: int) -> str:
+    """Render a neighbour as its citation, file, signature and docstring summary.
+
+    Args:
+        node_id: Neighbour id, cited as ``[neighbor:ID]``.
+        info: Any of ``file``, ``signature``, ``type`` and ``doc``.
+        doc_chars: Docstring characters kept; 0 drops the docstring.
+    """
+    header = f"[neighbor:{node_id}]"
+    if info.get("file"):
+        header += f" {info['file']}"
+    lines = [header]
+    if info.get("signature"):
+        lines.append(info["signature"])
+    elif info.get("type"):
+        lines.append(str(info["type"]))
+    if info.get("doc") and doc_chars > 0:
+        lines.append(f"    {_first_paragraph(info['doc'], doc_chars)}")
+    return "\n".join(lines)
+
+
+def _describe_from_graph(graph: FrozenKG, node_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Signature, file and docstring of the nodes ``graph`` knows."""
+    found: Dict[str, Dict[str, Any]] = {}
+    for node_id in node_ids:
+        node = graph.node(node_id)
+        if node is None:
+            continue
+        props = node.get("props") or {}
+        doc = graph.node(f"{node_id}::doc")
+        found[node_id] = {
+            "file": props.get("file"),
+            "signature": props.get("signature"),
+            "type": node.get("type"),
+            "doc": ((doc or {}).get("props") or {}).get("text"),
+        }
+    return found
+
+
+def _describe_from_collection(collection: Any, node_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Signature, file and docstring of ``node_ids`` from the node collection, in one ``get``.
+
+    Docstrings are their own nodes (``<id>::doc``), so they are fetched in
+    the same batch.
+    """
+    res = collection.get(ids=[*node_ids, *(f"{n}::doc" for n in node_ids)], include=["documents", "metadatas"])
+    records = {
+        doc_id: (doc, meta or {})
+        for doc_id, doc, meta in zip(res.get("ids", []), res.get("documents") or [], res.get("metadatas") or [])
+    }
+    found: Dict[str, Dict[str, Any]] = {}
+    for node_id in node_ids:
+        if node_id not in records:
+            continue
+        _, meta = records[node_id]
+        doc = records.get(f"{node_id}::doc")
+        found[node_id] = {
+            "file": meta.get("file"),
+            "signature": meta.get("signature"),
+            "type": meta.get("type"),
+            "doc": doc[0] if doc else None,
+        }
+    return found
+
+
+def hydrate_neighbors(
+    node_ids: Sequence[str],
+    collection: Any = None,
+    config: Optional[GraphConfig] = None,
+) -> List[Dict[str, str]]:
+    """Compact text for neighbours, most relevant first, within the token budget.
+
+    Args:
+        node_ids: Neighbour ids in rank order, as returned by ``expand_graph``.
+        collection: Node collection, read for the ids the local graph does
+            not hold (all of them with the Neo4j backend).
+        config: Token budget and docstring length; defaults to the
+            ``GRAPH_*`` settings.
+
+    Returns:
+        ``{"id", "text"}`` per neighbour that fit in the budget; neighbours
+        with nothing to show are left out.
+
+    Raises:
+        ChromaError: If reading the node collection fails.
+    """
+    if not node_ids:
+        return []
+    config = config or GraphConfig.from_env()
+    expander = get_expander()
+    info: Dict[str, Dict[str, Any]] = {}
+    if isinstance(expander, LocalGraphExpander):
+        info = _describe_from_graph(expander.graph, node_ids)
+    missing = [n for n in node_ids if n not in info]
+    if missing and collection is not None:
+        try:
+            info.update(_describe_from_collection(collection, missing))
+        except Exception as exc:
+            raise ChromaError(f"Neighbour hydration failed: {exc}") from exc
+
+    hydrated: List[Dict[str, str]] = []
+    budget = config.context_tokens
+    for node_id in node_ids:
+        if node_id not in info:
+            continue
+        text = compact_text(node_id, info[node_id], config.doc_chars)
+        cost = estimate_tokens(text)
+        if cost > budget:
+            continue
+        budget -= cost
+        hydrated.append({"id": node_id, "text": text})
+    log.debug(f"Hydrated {len(hydrated)} of {len(node_ids)} neighbours ({config.context_tokens - budget} tokens)")
+    return hydrated
+
+
+def close_expander() -> None:
+    """Release the Neo4j driver, if one was opened."""
+    if _expander.ready and isinstance(_expander.get(), Neo4jGraphExpander):
+        try:
+            _expander.get().close()
+        except Exception:
+            log.warning("Closing the Neo4j connection failed")
+    _expander.reset()
@@ -0,0 +1,656 @@
+# graph_query.py
+"""Structural questions answered straight from the knowledge graph.
+
+``StructuralQueryEngine`` answers questions about the shape of the code
+over a ``FrozenKG``. Its reverse adjacency arrays make every "who points
+at X" lookup as cheap as "what does X point at":
+
+- ``callers`` / ``callees`` (``CALLS``), ``subclasses`` / ``bases``
+  (``INHERITS``), ``children`` / ``parent`` (``CONTAINS``) and
+  ``imports``, each optionally closed transitively;
+- ``importers`` of a module or symbol, counting imports of anything inside
+  it (``from pkg.mod import f`` imports ``pkg.mod``);
+- ``dependencies`` / ``dependents``: the modules a module imports, or that
+  import it, optionally closed transitively.
+
+Transitive closures are memoized per graph, and a closure reuses the
+closures already known for the nodes it reaches.
+
+``StructuralQueryEngine.cypher`` runs a small Cypher subset (enough for
+``graph_indexing/sample.cypher``) over the same graph, and
+``answer_structural`` recognizes questions such as "Which modules depend
+on X?" or "Show me all components that call Y", so the chat answers them
+exactly, without retrieval or the LLM.
+
+The graph is the one graph expansion holds with ``GRAPH_BACKEND=local``;
+with other backends it is loaded from ``GRAPH_KG_PATH`` on first use.
+"""
+
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from config.logger import log
+from config.settings import GraphConfig
+from core.code_exceptions import GraphQueryError
+from core.graph_expansion import LocalGraphExpander, get_expander
+from core.startup import LazyService
+from graph_indexing.kgbuild.frozen import FrozenKG
+
+# Relation -> (edge type, direction)
+EDGE_RELATIONS: Dict[str, Tuple[str, str]] = {
+    "callers": ("CALLS", "in"),
+    "callees": ("CALLS", "out"),
+    "subclasses": ("INHERITS", "in"),
+    "bases": ("INHERITS", "out"),
+    "children": ("CONTAINS", "out"),
+    "parent": ("CONTAINS", "in"),
+    "imports": ("IMPORTS", "out"),
+}
+RELATIONS = tuple(EDGE_RELATIONS) + ("importers", "dependencies", "dependents")
+
+# Node types a short name in a question may refer to
+NAMED_TYPES = ("module", "class", "function")
+
+
+@dataclass
+class CypherResult:
+    """Columns and rows of a Cypher query, rows keyed by column."""
+    columns: List[str]
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class StructuralQueryEngine:
+    """Structural lookups and a Cypher subset over a ``FrozenKG``."""
+
+    def __init__(self, graph: FrozenKG, config: Optional[GraphConfig] = None) -> None:
+        """Initialize the engine; indexes are built on first use.
+
+        Args:
+            graph: Graph to query.
+            config: Row cap for Cypher queries; defaults to the ``GRAPH_*``
+                settings.
+        """
+        self.graph = graph
+        self.config = config or GraphConfig.from_env()
+        self._lock = threading.Lock()
+        self._closures: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        self._indexed = False
+        self._modules: Set[str] = set()
+        self._module_deps: Dict[str, Set[str]] = {}
+        self._module_dependents: Dict[str, Set[str]] = {}
+        self._import_targets: List[str] = []
+        self._names: Dict[str, List[str]] = {}
+
+    # ------------------------------------------------------
+    # Indexes
+    # ------------------------------------------------------
+    def _ensure_indexes(self) -> None:
+        if self._indexed:
+            return
+        with self._lock:
+            if self._indexed:
+                return
+            graph = self.graph
+            for node_id, node_type in zip(graph.ids, graph.types):
+                if node_type == "module":
+                    self._modules.add(node_id)
+                if node_type in NAMED_TYPES:
+                    self._names.setdefault(node_id.rsplit(".", 1)[-1], []).append(node_id)
+
+            targets: Set[str] = set()
+            for node_id in graph.ids:
+                for target, _, _ in graph.neighbors(node_id, ["IMPORTS"]):
+                    targets.add(target)
+                    src, dst = self.owner_module(node_id), self.owner_module(target)
+                    if src and dst and src != dst:
+                        self._module_deps.setdefault(src, set()).add(dst)
+                        self._module_dependents.setdefault(dst, set()).add(src)
+            self._import_targets = sorted(targets)
+            self._indexed = True
+
+    def owner_module(self, node_id: str) -> Optional[str]:
+        """The module defining ``node_id`` (the longest dotted prefix that is a module)."""
+        parts = node_id.split(".")
+        for end in range(len(parts), 0, -1):
+            prefix = ".".join(parts[:end])
+            if prefix in self._modules:
+                return prefix
+        return None
+
+    def _targets_under(self, prefix: str) -> List[str]:
+        """Import targets equal to ``prefix`` or inside it."""
+        targets = self._import_targets
+        found = [prefix] if prefix in self.graph and self.graph.neighbors(prefix, ["IMPORTS"], "in") else []
+        start = prefix + "."
+        i = bisect_left(targets, start)
+        while i < len(targets) and targets[i].startswith(start):
+            found.append(targets[i])
+            i += 1
+        return found
+
+    # ------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------
+    def resolve(self, name: str, prefer: Optional[str] = None) -> Optional[str]:
+        """Return the node id ``name`` refers to.
+
+        Args:
+            name: A node id, or the short (or dotted tail) name of one module,
+                class or function.
+            prefer: Node type to pick when several nodes share the name.
+
+        Returns:
+            The id, or None when nothing or more than one node matches.
+        """
+        if name in self.graph:
+            return name
+        self._ensure_indexes()
+        candidates = [c for c in self._names.get(name.rsplit(".", 1)[-1], []) if c.endswith("." + name)]
+        if prefer and len(candidates) > 1:
+            candidates = [c for c in candidates if (self.graph.node(c) or {}).get("type") == prefer] or candidates
+        return candidates[0] if len(candidates) == 1 else None
+
+    def relation(self, name: str, node_id: str, transitive: bool = False) -> List[str]:
+        """Return the ids related to ``node_id`` by relation ``name``, sorted.
+
+        Raises:
+            GraphQueryError: If ``name`` is not one of ``RELATIONS``.
+        """
+        if name in EDGE_RELATIONS:
+            edge_type, direction = EDGE_RELATIONS[name]
+
+            def step(n: str) -> List[str]:
+                return [m for m, _, _ in self.graph.neighbors(n, [edge_type], direction)]
+
+            if transitive:
+                return sorted(self._closure(name, node_id, step))
+            return sorted(set(step(node_id)))
+        if name == "importers":
+            return self.importers(node_id)
+        if name == "dependencies":
+            return self.dependencies(node_id, transitive)
+        if name == "dependents":
+            return self.dependents(node_id, transitive)
+        raise GraphQueryError(f"Unknown relation {name!r}, expected one of: {', '.join(RELATIONS)}")
+
+    def is_imported(self, name: str) -> bool:
+        """Whether anything imports ``name`` or something inside it (external packages too)."""
+        self._ensure_indexes()
+        return bool(self._targets_under(name))
+
+    def importers(self, target: str) -> List[str]:
+        """Nodes importing ``target`` or anything inside it."""
+        self._ensure_indexes()
+        found: Set[str] = set()
+        for imported in self._targets_under(target):
+            found.update(n for n, _, _ in self.graph.neighbors(imported, ["IMPORTS"], "in"))
+        return sorted(found)
+
+    def dependencies(self, module: str, transitive: bool = False) -> List[str]:
+        """Modules of the graph that ``module`` (or the module owning it) imports."""
+        self._ensure_indexes()
+        module = self.owner_module(module) or module
+        if not transitive:
+            return sorted(self._module_deps.get(module, ()))
+        return sorted(self._closure("dependencies", module, lambda m: self._module_deps.get(m, ())))
+
+    def dependents(self, target: str, transitive: bool = False) -> List[str]:
+        """Modules importing ``target`` (a module, a symbol, or an external package)."""
+        self._ensure_indexes()
+        owner = self.owner_module(target)
+        direct = {self.owner_module(n) or n for n in self.importers(target)} - {owner}
+        if not transitive:
+            return sorted(direct)
+        found = set(direct)
+        for module in direct:
+            found.update(self._closure("dependents", module, lambda m: self._module_dependents.get(m, ())))
+        return sorted(found - {owner, target})
+
+    def _closure(self, key: str, start: str, step: Callable[[str], Iterable[str]]) -> Tuple[str, ...]:
+        """Ids reachable from ``start`` through ``step``, memoized under ``key``.
+
+        A node whose closure is already known contributes it whole instead
+        of being expanded again.
+        """
+        cached = self._closures.get((key, start))
+        if cached is not None:
+            return cached
+        seen = {start}
+        order: List[str] = []
+        queue = deque([start])
+        while queue:
+            for n in step(queue.popleft()):
+                if n in seen:
+                    continue
+                seen.add(n)
+                order.append(n)
+                known = self._closures.get((key, n))
+                if known is None:
+                    queue.append(n)
+                    continue
+                for m in known:
+                    if m not in seen:
+                        seen.add(m)
+                        order.append(m)
+        closure = tuple(order)
+        self._closures[(key, start)] = closure
+        return closure
+
+    # ------------------------------------------------------
+    # Cypher subset
+    # ------------------------------------------------------
+    def cypher(self, query: str, limit: Optional[int] = None) -> CypherResult:
+        """Run one Cypher statement of the supported subset.
+
+        Supported: ``CALL db.relationshipTypes()`` and ``CALL db.labels()``,
+        and ``MATCH`` over one node or one relationship, e.g.
+        ``MATCH (a:Node {type: "class"})-[r:CALLS|IMPORTS]->(b) WHERE b.id
+        STARTS WITH "core." RETURN DISTINCT a.id, type(r) LIMIT 20``.
+        Patterns take property maps; ``WHERE`` takes ``AND``-ed comparisons
+        (``=``, ``<>``, ``STARTS WITH``, ``ENDS WITH``, ``CONTAINS``);
+        ``RETURN`` takes variables, property paths (``n.props.text`` or
+        ``n.text``), ``type(r)`` and a lone ``count(*)``. As in Neo4j after
+        ``core.loadneo``, only nodes with a record match.
+
+        Args:
+            query: The statement (a trailing ``;`` is allowed).
+            limit: Row cap; never above ``GRAPH_QUERY_LIMIT``.
+
+        Raises:
+            GraphQueryError: If the statement is outside the subset.
+        """
+        statement = query.strip().rstrip(";").strip()
+        cap = min(limit or self.config.query_limit, self.config.query_limit)
+        call = _CALL.match(statement)
+        if call:
+            procedure = call.group(1).lower()
+            if procedure == "db.relationshiptypes":
+                return CypherResult(["relationshipType"], [{"relationshipType": t} for t in self.graph.edge_types][:cap])
+            if procedure == "db.labels":
+                return CypherResult(["label"], [{"label": "Node"}])
+            raise GraphQueryError(f"Unsupported procedure {call.group(1)}")
+
+        match = _MATCH.match(statement)
+        if not match:
+            raise GraphQueryError(f"Unsupported query: {statement[:120]}")
+        for var in ("a", "b"):
+            label = match.group(f"{var}_label")
+            if label and label != "Node":
+                raise GraphQueryError(f"Unknown label :{label}; every node is :Node")
+        if match.group("left") and match.group("right"):
+            raise GraphQueryError("A relationship cannot point both ways")
+
+        items = [_parse_item(item) for item in _split_items(match.group("items"))]
+        conditions = _parse_where(match.group("where"))
+        if match.group("limit"):
+            cap = min(cap, int(match.group("limit")))
+        counting = any(expr == "count(*)" for _, expr in items)
+        if counting and len(items) > 1:
+            raise GraphQueryError("count(*) must be the only returned item")
+
+        rows: List[Dict[str, Any]] = []
+        seen: Set[str] = set()
+        total = 0
+        for binding in self._bindings(match):
+            if not all(self._compare(binding, *condition) for condition in conditions):
+                continue
+            if counting:
+                total += 1
+                continue
+            row = {column: self._value(binding, expr) for column, expr in items}
+            if match.group("distinct"):
+                key = json.dumps(row, sort_keys=True, default=str)
+                if key in seen:
+                    continue
+                seen.add(key)
+            rows.append(row)
+            if len(rows) >= cap:
+                break
+        if counting:
+            rows = [{items[0][0]: total}]
+        return CypherResult([column for column, _ in items], rows)
+
+    def _bindings(self, match: "re.Match[str]") -> Iterator[Dict[str, Any]]:
+        """Variable bindings of the pattern, before ``WHERE``."""
+        a_var, a_props = match.group("a") or "_a", _parse_map(match.group("a_props"))
+        if not match.group("rel"):
+            for node_id in self._candidates(a_props):
+                yield {a_var: node_id}
+            return
+
+        b_var, b_props = match.group("b") or "_b", _parse_map(match.group("b_props"))
+        rel_var = match.group("rel_var") or "_r"
+        types = [t.strip().lstrip(":").strip() for t in (match.group("types") or "").split("|") if t.strip()]
+        types = types or self.graph.edge_types
+        direction = "in" if match.group("left") else "out" if match.group("right") else "both"
+        # Start from the side pinned to one id, if any
+        if "id" in b_props and "id" not in a_props:
+            flipped = {"out": "in", "in": "out", "both": "both"}[direction]
+            for b_id in self._candidates(b_props):
+                for a_id, edge_type, count in self.graph.neighbors(b_id, types, flipped):
+                    if self._matches(a_id, a_props):
+                        yield {a_var: a_id, b_var: b_id, rel_var: {"type": edge_type, "count": count}}
+            return
+        for a_id in self._candidates(a_props):
+            for b_id, edge_type, count in self.graph.neighbors(a_id, types, direction):
+                if self._matches(b_id, b_props):
+                    yield {a_var: a_id, b_var: b_id, rel_var: {"type": edge_type, "count": count}}
+
+    def _candidates(self, props: Dict[str, Any]) -> Iterator[str]:
+        if "id" in props:
+            ids: Iterable[str] = [props["id"]] if isinstance(props["id"], str) else []
+        else:
+            ids = (node_id for node_id, node_type in zip(self.graph.ids, self.graph.types) if node_type is not None)
+        return (node_id for node_id in ids if self._matches(node_id, props))
+
+    def _matches(self, node_id: str, props: Dict[str, Any]) -> bool:
+        node = self.graph.node(node_id)
+        return node is not None and all(self._property(node, [key]) == value for key, value in props.items())
+
+    def _property(self, node: Dict[str, Any], path: Sequence[str]) -> Any:
+        key = path[0]
+        if key in ("id", "type", "props"):
+            value = node[key]
+        elif key in node["props"]:
+            value = node["props"][key]
+        else:
+            # Centrality scores, stored as node properties in Neo4j too
+            value = self.graph.score(node["id"], key, None)
+        for part in path[1:]:
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+
+    def _value(self, binding: Dict[str, Any], expr: str) -> Any:
+        type_of = re.fullmatch(r"type\(\s*(\w+)\s*\)", expr, re.IGNORECASE)
+        var, *path = (type_of.group(1), "type") if type_of else expr.split(".")
+        if var not in binding:
+            raise GraphQueryError(f"Unknown variable {var!r}")
+        target = binding[var]
+        if isinstance(target, dict):
+            return target.get(path[0]) if path else target
+        node = self.graph.node(target)
+        return self._property(node, path) if path else node
+
+    def _compare(self, binding: Dict[str, Any], expr: str, op: str, value: Any) -> bool:
+        actual = self._value(binding, expr)
+        if op == "=":
+            return actual == value
+        if op in ("<>", "!="):
+            return actual != value
+        if not isinstance(actual, str) or not isinstance(value, str):
+            return False
+        if op == "STARTS WITH":
+            return actual.startswith(value)
+        if op == "ENDS WITH":
+            return actual.endswith(value)
+        return value in actual
+
+    def run_script(self, text: str, limit: Optional[int] = None) -> List[Tuple[str, CypherResult]]:
+        """Run every ``;``-separated statement of a script (``//`` comment lines skipped)."""
+        lines = [line for line in text.splitlines() if not line.strip().startswith("//")]
+        statements = [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+        return [(statement, self.cypher(statement, limit)) for statement in statements]
+
+
+# Cypher parsing
+_LITERAL = r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?|true|false|null"""
+_NAME = r"[A-Za-z_]\w*"
+
+
+def _node_pattern(var: str) -> str:
+    return (
+        rf"\(\s*(?P<{var}>{_NAME})?\s*(?::\s*(?P<{var}_label>{_NAME}))?\s*"
+        rf"(?P<{var}_props>\{{[^}}]*\}})?\s*\)"
+    )
+
+
+_CALL = re.compile(r"^CALL\s+([\w.]+)\s*\(\s*\)(?:\s+YIELD\s+\w+)?$", re.IGNORECASE)
+_MATCH = re.compile(
+    r"^MATCH\s+" + _node_pattern("a")
+    + r"(?P<rel>\s*(?P<left><)?-\[\s*(?P<rel_var>" + _NAME + r")?\s*"
+    + r"(?::\s*(?P<types>" + _NAME + r"(?:\s*\|\s*:?\s*" + _NAME + r")*))?\s*\]-(?P<right>>)?\s*"
+    + _node_pattern("b") + r")?"
+    + r"(?:\s+WHERE\s+(?P<where>.+?))?"
+    + r"\s+RETURN\s+(?P<distinct>DISTINCT\s+)?(?P<items>.+?)"
+    + r"(?:\s+LIMIT\s+(?P<limit>\d+))?$",
+    re.IGNORECASE | re.DOTALL,
+)
+_PAIR = re.compile(rf"\s*({_NAME})\s*:\s*({_LITERAL})\s*(?:,|$)", re.IGNORECASE)
+_ITEM = re.compile(
+    rf"^(count\(\s*\*\s*\)|type\(\s*{_NAME}\s*\)|{_NAME}(?:\.{_NAME})*)(?:\s+AS\s+({_NAME}))?$",
+    re.IGNORECASE,
+)
+_CONDITION = re.compile(
+    rf"^({_NAME}(?:\.{_NAME})*|type\(\s*{_NAME}\s*\))\s*"
+    rf"(=|<>|!=|STARTS\s+WITH|ENDS\s+WITH|CONTAINS)\s*({_LITERAL})$",
+    re.IGNORECASE,
+)
+
+
+def _literal(text: str) -> Any:
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered == "null":
+        return None
+    if text[0] in "'\"":
+        return re.sub(r"\\(.)", r"\1", text[1:-1])
+    return float(text) if "." in text else int(text)
+
+
+def _parse_map(text: Optional[str]) -> Dict[str, Any]:
+    if not text:
+        return {}
+    body = text.strip()[1:-1].strip()
+    pairs: Dict[str, Any] = {}
+    pos = 0
+    while pos < len(body):
+        pair = _PAIR.match(body, pos)
+        if not pair:
+            raise GraphQueryError(f"Unsupported property map {text}")
+        pairs[pair.group(1)] = _literal(pair.group(2))
+        pos = pair.end()
+    return pairs
+
+
+def _split_items(text: str) -> List[str]:
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+def _parse_item(text: str) -> Tuple[str, str]:
+    """Return ``(column, expression)`` of a ``RETURN`` item."""
+    item = _ITEM.match(text)
+    if not item:
+        raise GraphQueryError(f"Unsupported return item {text!r}")
+    expr = re.sub(r"\s+", "", item.group(1))
+    if expr.lower() == "count(*)":
+        expr = "count(*)"
+    return item.group(2) or expr, expr
+
+
+def _parse_where(text: Optional[str]) -> List[Tuple[str, str, Any]]:
+    conditions = []
+    for part in re.split(r"\s+AND\s+", text or "", flags=re.IGNORECASE):
+        if not part.strip():
+            continue
+        condition = _CONDITION.match(part.strip())
+        if not condition:
+            raise GraphQueryError(f"Unsupported condition {part.strip()!r}")
+        op = " ".join(condition.group(2).upper().split())
+        conditions.append((re.sub(r"\s+", "", condition.group(1)), op, _literal(condition.group(3))))
+    return conditions
+
+
+# Engine over the current graph
+def _create_graph_source() -> LocalGraphExpander:
+    return LocalGraphExpander.from_path(GraphConfig.from_env())
+
+
+_graph_source = LazyService("graph_query", _create_graph_source)
+_engine_lock = threading.Lock()
+_engine: Optional[StructuralQueryEngine] = None
+
+
+def _current_graph() -> FrozenKG:
+    """The local expansion graph, or one loaded for queries when expansion uses another backend."""
+    expander = get_expander()
+    if isinstance(expander, LocalGraphExpander):
+        return expander.graph
+    source = _graph_source.get()
+    if source.is_stale():
+        with _engine_lock:
+            source = _graph_source.get()
+            if source.is_stale():
+                source = LocalGraphExpander.from_path(source.config)
+                _graph_source.set(source)
+    return source.graph
+
+
+def get_query_engine() -> StructuralQueryEngine:
+    """Return the engine over the current graph, rebuilt when the graph is reloaded."""
+    global _engine
+    graph = _current_graph()
+    engine = _engine
+    if engine is None or engine.graph is not graph:
+        with _engine_lock:
+            if _engine is None or _engine.graph is not graph:
+                _engine = StructuralQueryEngine(graph)
+            engine = _engine
+    return engine
+
+
+# Questions the chat answers from the graph: (pattern, relation, transitive, preferred node type).
+# Each pattern must match the whole question (after _POLITE and a trailing
+# "?" are stripped), so a structural phrase inside a longer or compound
+# question never replaces retrieval.
+_TARGET = (
+    r"(?:the\s+)?(?:(?:module|package|class|function|method)\s+)?[`'\"]?"
+    r"(?P<target>[A-Za-z_](?:[\w.]*\w)?)(?:\(\))?[`'\"]?"
+    r"(?:\s+(?:module|package|class|function|method))?"
+)
+_POLITE = re.compile(
+    r"(?:please\s+)?(?:(?:can|could|would)\s+you\s+(?:please\s+)?)?"
+    r"(?:(?:show|tell|give)\s+me\s+|list\s+|find\s+|i\s+(?:want|need)\s+to\s+know\s+)?",
+    re.I,
+)
+_WHO = r"(?:which|what|who)\s+(?:\w+\s+){0,2}?"
+_THE = r"(?:(?:what|who)\s+are\s+)?(?:all\s+)?(?:the\s+)?"
+_QUESTIONS: List[Tuple["re.Pattern[str]", str, bool, Optional[str]]] = [
+    (re.compile(rf"what\s+does\s+{_TARGET}\s+depend\s+on", re.I), "dependencies", True, "module"),
+    (re.compile(rf"{_THE}dependencies\s+of\s+{_TARGET}", re.I), "dependencies", True, "module"),
+    (re.compile(rf"what\s+(?:functions\s+|methods\s+)?does\s+{_TARGET}\s+call", re.I), "callees", False, "function"),
+    (re.compile(rf"{_THE}(?:callees\s+of|(?:functions|methods)\s+called\s+by)\s+{_TARGET}", re.I), "callees", False, "function"),
+    (re.compile(rf"{_WHO}(?:depends?|rel(?:y|ies))\s+on\s+{_TARGET}", re.I), "dependents", False, "module"),
+    (re.compile(rf"{_WHO}imports?\s+{_TARGET}", re.I), "importers", False, "module"),
+    (re.compile(rf"{_THE}importers\s+of\s+{_TARGET}", re.I), "importers", False, "module"),
+    (re.compile(rf"(?:{_WHO})?(?:inherits?|derives?)\s+from\s+{_TARGET}", re.I), "subclasses", False, "class"),
+    (re.compile(rf"{_THE}(?:subclasses\s+of|classes\s+(?:inheriting|deriving)\s+from)\s+{_TARGET}", re.I), "subclasses", False, "class"),
+    (re.compile(rf"{_WHO}calls?\s+{_TARGET}", re.I), "callers", False, "function"),
+    (re.compile(rf"{_THE}(?:components|functions|methods|places|code)\s+(?:that\s+|which\s+)?calls?\s+{_TARGET}", re.I), "callers", False, "function"),
+    (re.compile(rf"{_THE}callers\s+of\s+{_TARGET}", re.I), "callers", False, "function"),
+    (re.compile(rf"{_THE}(?:contents|members)\s+of\s+{_TARGET}", re.I), "children", False, "class"),
+]
+_TITLES = {
+    "dependencies": "Modules that `{}` depends on, directly or transitively",
+    "callees": "Calls made by `{}`",
+    "dependents": "Modules that depend on `{}`",
+    "importers": "Importers of `{}`",
+    "subclasses": "Subclasses of `{}`",
+    "callers": "Callers of `{}`",
+    "children": "Members of `{}`",
+}
+# Results listed in a chat answer; the API returns them all
+_ANSWER_ITEMS = 50
+
+
+def match_structural(question: str) -> Optional[Tuple[str, str, bool, Optional[str]]]:
+    """Return ``(relation, target, transitive, preferred type)`` if ``question`` is structural.
+
+    Only a question that is, as a whole, one structural question matches:
+    "Which modules import X?" does, "How does X work, and what calls it?"
+    does not.
+    """
+    text = " ".join(question.split()).rstrip("?.! ")
+    text = text[_POLITE.match(text).end():]
+    for pattern, relation, transitive, prefer in _QUESTIONS:
+        found = pattern.fullmatch(text)
+        if found and found.group("target").lower() not in ("the", "a", "an", "this", "that", "it"):
+            return relation, found.group("target"), transitive, prefer
+    return None
+
+
+def answer_structural(question: str) -> Optional[Dict[str, Any]]:
+    """Answer a structural question from the knowledge graph, without the LLM.
+
+    Returns:
+        ``{"answer", "references"}`` like the RAG pipeline, or None when the
+        question is not structural, structural answers are disabled, the
+        name in it does not identify one node, or the graph has no results
+        (unresolved calls and imports are missing from it, so "none" would
+        not be a reliable answer). The caller then falls back to retrieval.
+    """
+    if not GraphConfig.from_env().structural_answers:
+        return None
+    matched = match_structural(question)
+    if matched is None:
+        return None
+    relation, name, transitive, prefer = matched
+    t0 = time.perf_counter()
+    try:
+        engine = get_query_engine()
+        node_id = engine.resolve(name, prefer)
+        if node_id is None and relation in ("importers", "dependents") and engine.is_imported(name):
+            node_id = name
+        if node_id is None:
+            log.info(f"Structural question about {name!r}, but no single graph node matches; using retrieval")
+            return None
+        results = engine.relation(relation, node_id, transitive)
+    except Exception:
+        log.exception("Structural answer failed, using retrieval")
+        return None
+    if not results:
+        log.info(f"No {relation} of {node_id} in the graph; using retrieval")
+        return None
+
+    title = _TITLES[relation].format(node_id)
+    lines = [
+        f"- `{result}` [node:{result}]" if engine.graph.node(result) else f"- `{result}`"
+        for result in results[:_ANSWER_ITEMS]
+    ]
+    if len(results) > _ANSWER_ITEMS:
+        lines.append(f"- ... and {len(results) - _ANSWER_ITEMS} more (GET /api/graph/{relation}?id={node_id})")
+    answer = f"{title} ({len(results)}):\n" + "\n".join(lines)
+    references = [f"[node:{r}]" for r in results[:_ANSWER_ITEMS] if engine.graph.node(r)]
+    log.info(f"Answered {relation} of {node_id} from the graph in {(time.perf_counter() - t0) * 1000:.1f}ms")
+    return {"answer": answer, "references": references}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run Cypher-subset queries against the local knowledge graph")
+    parser.add_argument("script", nargs="?", help="File of ;-separated statements, e.g. graph_indexing/sample.cypher")
+    parser.add_argument("-e", "--execute", help="Run a single statement instead of a file")
+    parser.add_argument("--limit", type=int, default=None, help="Row cap per statement")
+    args = parser.parse_args()
+    if not args.script and not args.execute:
+        parser.error("give a script file or -e STATEMENT")
+
+    query_engine = get_query_engine()
+    if args.execute:
+        script = args.execute
+    else:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = f.read()
+    for text, result in query_engine.run_script(script, args.limit):
+        print(f"// {' '.join(text.split())}")
+        print(" | ".join(result.columns))
+        for row in result.rows:
+            print(" | ".join(json.dumps(row[c], default=str) for c in result.columns))
+        print(f"({len(result.rows)} rows)\n")
@@ -6,11 +6,15 @@ reduce redundant LLM calls and provides citation-rich responses with references.
 
 Main Components:
     - Semantic retrieval from ChromaDB (code chunks and nodes)
-    - Graph expansion via Neo4j (optional)
+    - Graph expansion over the in-memory KG or Neo4j (``GRAPH_BACKEND``)
     - LLM-powered answer generation via Groq
     - Semantic caching for similar questions
     - Response formatting with citations and references
 
+The LLM client, the Chroma collections and the semantic cache are created
+on first use (see ``core.startup``), so importing this module is cheap; the
+API warms them explicitly at startup.
+
 Usage:
     python graphrag.py
 """
@@ -22,16 +26,19 @@ import time
 from typing import Dict, List, Any, Optional, Tuple, Sequence, Mapping, TypedDict, cast
 
 import chromadb
-from config.myapikeys import (
-    NEO4J_URI,
-    NEO4J_USERNAME,
-    NEO4J_PASSWORD
-)
-from core.code_exceptions import ChromaError, EmbeddingError, LLMError, Neo4jError
+from core.code_exceptions import ChromaError, EmbeddingError, LLMError
 from config.logger import log
-from core.embeddings import embed_text, get_model
-from core.semantic_cache import SemanticCache
+from config.settings import CacheConfig, IndexConfig
+from core.embeddings import embed_text
+from core.graph_expansion import close_expander, expand_graph, hydrate_neighbors
+from core.graph_query import answer_structural
+from core.semantic_cache import SemanticCache, get_cache_collection
+from core.collection_alias import resolve_collection
+from core.index_manifest import ChunkLocations, IndexManifest
 from core.retrieval import retrieve_similar_nodes
+from core.singleflight import SingleFlight, coalesce_key
+from core.startup import LazyService
+from core.write_behind import get_write_behind
 from observability.rag.rag_events import log_rag_event
 from observability.rag.rag_metrics import record_retrieval_metrics, record_generation_metrics
 
@@ -53,109 +60,77 @@ MODEL_NAME = os.getenv("LLM_MODEL_NAME", "openai/gpt-oss-120b")
 TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.2"))
 MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "800"))
 
-try:
-    log.info("Initializing LLM")
-    llm = ChatGroq(
-        model=MODEL_NAME,
-        temperature=TEMPERATURE,
-        max_tokens=MAX_TOKENS,
-    )
-    log.info("LLM initialized successfully")
-except Exception as exc:
-    log.exception("Failed to initialize LLM")
-    raise LLMError(f"LLM initialization failed: {exc}") from exc
 
-# Preload embedding model at startup to avoid first-request latency
-try:
-    _ = get_model()
-    log.info("Embedding model preloaded")
-except Exception:
-    log.warning("Embedding model preload failed")
+def _make_llm(llm_overrides: Optional[Dict[str, Any]] = None) -> ChatGroq:
+    """Create a Groq chat model, with optional per-request parameter overrides."""
+    overrides = llm_overrides or {}
+    try:
+        return ChatGroq(
+            model=overrides.get("model_name", MODEL_NAME),
+            temperature=overrides.get("temperature", TEMPERATURE),
+            max_tokens=overrides.get("max_tokens", MAX_TOKENS),
+        )
+    except Exception as exc:
+        log.exception("Failed to initialize LLM")
+        raise LLMError(f"LLM initialization failed: {exc}") from exc
 
 
-# chromadb (code chunks + node embeddings)
-try:
-    log.info("Connecting to ChromaDB")
-    client = chromadb.PersistentClient(path=os.getenv("CHROMA_PATH", "vectorstore/chroma_db"))
+_llm = LazyService("llm", _make_llm)
 
-    code_collection = client.get_or_create_collection(
-        name="code_chunks",
-        metadata={"hnsw:space": "cosine"},
-    )
 
-    node_collection = client.get_or_create_collection(
-        name="node_embeddings",
-        metadata={"hnsw:space": "cosine"},
-    )
-    log.info("ChromaDB collections ready")
-except Exception as exc:
-    log.exception("Failed to initialize ChromaDB")
-    raise ChromaError(f"ChromaDB initialization failed: {exc}") from exc
+def get_llm() -> ChatGroq:
+    """Return the default LLM client, creating it on first use."""
+    return _llm.get()
 
-# Neo4j graph neighbors
-USE_NEO4J = False
-driver = None
 
-if USE_NEO4J:
+# chromadb (code chunks + node embeddings)
+def _open_collections() -> Tuple[chromadb.ClientAPI, chromadb.Collection, chromadb.Collection]:
     try:
-        log.info(f"Connecting to Neo4j at {NEO4J_URI}")
-        from neo4j import GraphDatabase
-        if NEO4J_URI is None:
-            raise Neo4jError("NEO4J_URI is not set")
-        if NEO4J_USERNAME is None:
-            raise Neo4jError("NEO4J_USERNAME is not set")
-        if NEO4J_PASSWORD is None:
-            raise Neo4jError("NEO4J_PASSWORD is not set")
-        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
-        driver.verify_connectivity()
-        log.info("Neo4j connection established")
+        log.info("Connecting to ChromaDB")
+        client = chromadb.PersistentClient(path=os.getenv("CHROMA_PATH", "vectorstore/chroma_db"))
+
+        # Logical names resolve to the collection version currently serving
+        code_collection = client.get_or_create_collection(
+            name=resolve_collection("code_chunks"),
+            metadata={"hnsw:space": "cosine"},
+        )
+
+        node_collection = client.get_or_create_collection(
+            name=resolve_collection("node_embeddings"),
+            metadata={"hnsw:space": "cosine"},
+        )
+        log.info("ChromaDB collections ready")
+        return client, code_collection, node_collection
     except Exception as exc:
-        log.exception("Failed to connect to Neo4j")
-        raise Neo4jError(f"Neo4j connection failed: {exc}") from exc
+        log.exception("Failed to initialize ChromaDB")
+        raise ChromaError(f"ChromaDB initialization failed: {exc}") from exc
 
 
-def expand_graph(node_ids: List[str], depth: int = 1) -> List[str]:
-    """Expand a set of node IDs by retrieving their neighbors from Neo4j.
-    
-    Performs a graph traversal to find all nodes connected to the given node IDs
-    up to a specified depth. Only executes if USE_NEO4J is True.
-    
-    Args:
-        node_ids: List of node identifiers to expand.
-        depth: Maximum depth of the graph traversal. Defaults to 1.
-    
-    Returns:
-        List of neighbor node IDs found in the graph. Returns empty list if
-        USE_NEO4J is False or if no neighbors are found.
-    
-    Raises:
-        Neo4jError: If Neo4j query execution fails.
-    """
-    if not USE_NEO4J:
-        log.debug("Neo4j expansion disabled")
-        return []
-    
-    if not driver:
-        raise Neo4jError("Neo4j driver not initialized")
+_collections = LazyService("chroma", _open_collections)
 
-    try:
-        log.debug(f"Expanding graph for {len(node_ids)} nodes (depth={depth})")
-        query = """
-        UNWIND $ids AS id
-        MATCH (n {id: id})-[*1..$depth]-(m)
-        RETURN DISTINCT m.id AS id
-        """
-        with driver.session() as s:
-            result = s.run(query, ids=node_ids, depth=depth)
-            neighbors = [r["id"] for r in result]
-            log.debug(f"Found {len(neighbors)} neighbor nodes")
-            return neighbors
-    except Exception as exc:
-        log.exception("Graph expansion failed")
-        raise Neo4jError(f"Graph expansion failed: {exc}") from exc
+
+def get_collections() -> Tuple[chromadb.Collection, chromadb.Collection]:
+    """Return the (code chunk, node) collections, opening them on first use."""
+    _, code_collection, node_collection = _collections.get()
+    return code_collection, node_collection
 
 
 # Retrieve code chunks with citations
+_chunk_locations: Dict[str, ChunkLocations] = {}
+
+
+def chunk_locations(chunk_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Return every (file, line span) location of the given stored chunks.
+
+    Identical code in several files is stored as a single chunk; the index
+    manifest of the serving collection records where each copy lives.
+    """
+    path = IndexManifest.for_collection(IndexConfig.from_env().manifest_dir, get_collections()[0].name).path
+    if path not in _chunk_locations:
+        _chunk_locations[path] = ChunkLocations(path)
+    return _chunk_locations[path].get(chunk_ids)
+
+
 def retrieve_code_chunks(q: str, top_k: int = 8) -> List[Dict[str, Any]]:
     """Retrieve the most similar code chunks from ChromaDB based on a query.
     
@@ -172,6 +147,7 @@ def retrieve_code_chunks(q: str, top_k: int = 8) -> List[Dict[str, Any]]:
             - text: The actual code chunk content
             - similarity: Similarity score (0-1, higher is better)
             - metadata: Additional metadata about the chunk
+            - locations: Every file and line span containing the chunk
     
     Raises:
         ChromaError: If ChromaDB query fails.
@@ -185,15 +161,18 @@ def retrieve_code_chunks(q: str, top_k: int = 8) -> List[Dict[str, Any]]:
         log.debug(f"Retrieving code chunks (query: {q[:50]}..., top_k={top_k})")
         t0 = time.perf_counter()
         vec: Sequence[float] = embed_text(q)
+        refresh_collections_if_flipped()
 
         class RetrievedItem(TypedDict):
             id: str
             text: str
             similarity: float
             metadata: Mapping[str, Any]
+            locations: List[Dict[str, Any]]
 
         out: List[RetrievedItem] = []
 
+        code_collection, _ = get_collections()
         res = code_collection.query(query_embeddings=[vec], n_results=top_k)
         ids = cast(List[List[str]], res.get("ids", [[]]) if hasattr(res, "get") else [[]])[0]
         docs = cast(List[List[str]], res.get("documents", [[]]) if hasattr(res, "get") else [[]])[0]
@@ -205,6 +184,7 @@ def retrieve_code_chunks(q: str, top_k: int = 8) -> List[Dict[str, Any]]:
             log.info(f"Code chunk retrieval took {(time.perf_counter() - t0) * 1000:.3f}ms")
             return []
 
+        locations = chunk_locations(ids)
         for doc_id, doc, dist, meta in zip(ids, docs, dists, metas):
             out.append(
                 {
@@ -212,6 +192,7 @@ def retrieve_code_chunks(q: str, top_k: int = 8) -> List[Dict[str, Any]]:
                     "text": doc,
                     "similarity": 1 - dist,
                     "metadata": meta,
+                    "locations": locations.get(doc_id, []),
                 }
             )
         log.info(f"Retrieved {len(out)} code chunks")
@@ -238,7 +219,7 @@ def retrieve_code_chunks(q: str, top_k: int = 8) -> List[Dict[str, Any]]:
 
 # Build citation-rich context
 def build_context(nodes: List[Dict[str, Any]], chunks: List[Dict[str, Any]], 
-                   neighbors: List[str]) -> str:
+                   neighbors: List[Dict[str, str]]) -> str:
     """Build a formatted context string from retrieved nodes, chunks, and neighbors.
     
     Combines retrieved nodes, code chunks, and graph neighbors into a single
@@ -248,7 +229,8 @@ def build_context(nodes: List[Dict[str, Any]], chunks: List[Dict[str, Any]],
     Args:
         nodes: List of retrieved node dictionaries with 'id', 'text', and 'similarity'.
         chunks: List of retrieved code chunk dictionaries with 'id', 'text', and 'similarity'.
-        neighbors: List of neighbor node IDs from graph expansion.
+        neighbors: Hydrated graph neighbors (``id`` and compact ``text``),
+            most relevant first.
     
     Returns:
         Formatted context string with sections for nodes, chunks, and neighbors,
@@ -265,12 +247,15 @@ def build_context(nodes: List[Dict[str, Any]], chunks: List[Dict[str, Any]],
     parts.append("=== Code Chunks ===")
     for c in chunks[:8]:
         parts.append(f"[chunk:{c['id']}] score={c['similarity']:.3f}")
+        if c.get("locations"):
+            spans = ", ".join(f"{loc['file']}:{loc['start_line']}-{loc['end_line']}" for loc in c["locations"])
+            parts.append(f"locations: {spans}")
         parts.append(c["text"])
         parts.append("")
 
     if neighbors:
         parts.append("=== Neighbor Nodes ===")
-        parts.append("\n".join([f"[neighbor:{nid}]" for nid in neighbors]))
+        parts.append("\n".join(n["text"] for n in neighbors))
 
     return "\n".join(parts)
 
@@ -310,9 +295,29 @@ parallel_retrieval = RunnableParallel(
     chunks=chunks_retriever,
 )
 
-neighbors_step = RunnableLambda(
-    lambda d: expand_graph([n["id"] for n in d["nodes"]], depth=1)
-)
+def expansion_seeds(data: Dict[str, Any]) -> List[str]:
+    """Graph nodes to expand: retrieved nodes plus the nodes owning retrieved chunks.
+
+    Chunks carry the id of their class or function KG node (``kg_node``
+    metadata), so a chunk hit also pulls in its graph neighbourhood.
+    """
+    seeds = [n["id"] for n in data["nodes"]]
+    for c in data["chunks"]:
+        kg_node = (c.get("metadata") or {}).get("kg_node")
+        if kg_node and kg_node not in seeds:
+            seeds.append(kg_node)
+    return seeds
+
+
+def neighbors_for(data: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Expand the retrieved nodes and hydrate the neighbours within the token budget."""
+    neighbor_ids = expand_graph(expansion_seeds(data))
+    if not neighbor_ids:
+        return []
+    return hydrate_neighbors(neighbor_ids, get_collections()[1])
+
+
+neighbors_step = RunnableLambda(neighbors_for)
 
 with_neighbors = RunnablePassthrough.assign(neighbors=neighbors_step)
 
@@ -336,22 +341,56 @@ def ctx_builder(data: Dict[str, Any]) -> Dict[str, str]:
 
 context_builder = RunnableLambda(ctx_builder)
 
-rag_chain = (
-    parallel_retrieval
-    | with_neighbors
-    | context_builder
-    | PROMPT
-    | llm
-    | StrOutputParser()
-)
+
+def build_rag_chain(model: Any):
+    """Compose the retrieval -> context -> prompt -> ``model`` chain."""
+    return (
+        parallel_retrieval
+        | with_neighbors
+        | context_builder
+        | PROMPT
+        | model
+        | StrOutputParser()
+    )
+
+
+# Cache upserts are applied in batches off the response path
+write_behind = get_write_behind()
+
 
 # Semantic Cache (previous implementation)
-try:
-    cache = SemanticCache(threshold=0.9)
-    log.info("Semantic cache initialized")
-except Exception as exc:
-    log.exception("Failed to initialize semantic cache")
-    raise ChromaError(f"Cache initialization failed: {exc}") from exc
+def _create_cache() -> SemanticCache:
+    try:
+        config = CacheConfig.from_env()
+        semantic_cache = SemanticCache(threshold=config.threshold, min_overlap=config.min_overlap)
+        write_behind.register("cache.store", semantic_cache.store_many)
+        log.info("Semantic cache initialized")
+        return semantic_cache
+    except Exception as exc:
+        log.exception("Failed to initialize semantic cache")
+        raise ChromaError(f"Cache initialization failed: {exc}") from exc
+
+
+_cache = LazyService("semantic_cache", _create_cache)
+
+
+def get_cache() -> SemanticCache:
+    """Return the semantic cache, creating it on first use."""
+    return _cache.get()
+
+
+# Identical concurrent cache misses share one retrieval + generation
+inflight = SingleFlight("rag.singleflight")
+
+
+def store_in_background(question: str, answer: str, references: List[str]) -> None:
+    """Queue a cache store on the write-behind queue.
+
+    Re-embedding the question and upserting into Chroma happens on the
+    background writer, so it adds no latency to the user-visible response.
+    """
+    get_cache()  # registers the "cache.store" handler
+    write_behind.submit("cache.store", (question, answer, references))
 
 
 def format_response(answer: str) -> Tuple[str, List[str]]:
@@ -426,7 +465,7 @@ def summarize_question(question: str) -> str:
             ("system", "You are a helpful assistant. Summarize the following question into a short, concise title of 3-5 words. Do not use quotes."),
             ("human", "{question}")
         ])
-        chain = prompt | llm | StrOutputParser()
+        chain = prompt | get_llm() | StrOutputParser()
         summary = chain.invoke({"question": question})
         return summary.strip().strip('"')
     except Exception as e:
@@ -446,13 +485,7 @@ def direct_llm_answer(question: str, llm_overrides: Optional[Dict[str, Any]] = N
         ])
         
         # Use either override LLM or default LLM
-        current_llm = llm
-        if llm_overrides:
-            current_llm = ChatGroq(
-                model=llm_overrides.get("model_name", MODEL_NAME),
-                temperature=llm_overrides.get("temperature", TEMPERATURE),
-                max_tokens=llm_overrides.get("max_tokens", MAX_TOKENS),
-            )
+        current_llm = _make_llm(llm_overrides) if llm_overrides else get_llm()
         
         chain = prompt | current_llm | StrOutputParser()
         answer = chain.invoke({"question": question})
@@ -464,6 +497,23 @@ def direct_llm_answer(question: str, llm_overrides: Optional[Dict[str, Any]] = N
 
 
 def answer_question(question: str, bypass_cache: bool = False, llm_overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Answer a question, coalescing identical concurrent requests.
+
+    Concurrent callers with the same normalized question and LLM parameters
+    share a single run of :func:`_answer_question` instead of each missing
+    the cache and paying for their own retrieval and generation.
+    """
+    key = coalesce_key(question, bypass_cache=bypass_cache, llm=llm_overrides or {})
+    result, shared = inflight.do(
+        key, lambda: _answer_question(question, bypass_cache=bypass_cache, llm_overrides=llm_overrides)
+    )
+    if shared and isinstance(result, dict):
+        # Followers get their own dict so callers can't mutate each other's result
+        return dict(result)
+    return result
+
+
+def _answer_question(question: str, bypass_cache: bool = False, llm_overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     print("*** ENTERED answer_question FUNCTION ***")
     log.debug("DEBUG: Inside answer_question function.")
     log.info("Entering answer_question")
@@ -492,7 +542,12 @@ def answer_question(question: str, bypass_cache: bool = False, llm_overrides: Op
     
     try:
         log.info(f"Processing question: {question[:50]}...")
-        
+
+        # Structural questions ("what calls X") are answered exactly from the graph
+        structural = answer_structural(question)
+        if structural is not None:
+            return structural
+
         # Check if it's a greeting - use direct LLM response
         if is_greeting(question):
             log.info("Detected greeting, using direct LLM response")
@@ -500,7 +555,7 @@ def answer_question(question: str, bypass_cache: bool = False, llm_overrides: Op
         
         # Check cache first (unless bypassed)
         if not bypass_cache:
-            cached = cache.lookup(question)
+            cached = get_cache().lookup(question)
             if cached:
                 log.info("Returning cached answer")
                 return {"answer": cached["answer"], "references": cached["references"]}
@@ -534,15 +589,8 @@ def answer_question(question: str, bypass_cache: bool = False, llm_overrides: Op
         context_text = final_context["context"]
         
         # Generate answer
-        if llm_overrides:
-            override_llm = ChatGroq(
-                model=llm_overrides.get("model_name", MODEL_NAME),
-                temperature=llm_overrides.get("temperature", TEMPERATURE),
-                max_tokens=llm_overrides.get("max_tokens", MAX_TOKENS),
-            )
-            chain = PROMPT | override_llm | StrOutputParser()
-        else:
-            chain = PROMPT | llm | StrOutputParser()
+        model = _make_llm(llm_overrides) if llm_overrides else get_llm()
+        chain = PROMPT | model | StrOutputParser()
             
         t_gen_start = time.perf_counter()
         answer = chain.invoke(final_context)
@@ -575,8 +623,9 @@ def answer_question(question: str, bypass_cache: bool = False, llm_overrides: Op
         
         # Cache the result unless bypassed
         if not bypass_cache:
-            cache.store(question, formatted_answer, references)
-        log.info("Answer generated and cached successfully")
+            get_cache().stats.record_generation(retrieval_ms + gen_ms)
+            store_in_background(question, formatted_answer, references)
+        log.info("Answer generated and queued for caching")
         return {
             "answer": formatted_answer, 
             "references": references, 
@@ -601,15 +650,97 @@ def answer_question(question: str, bypass_cache: bool = False, llm_overrides: Op
             raise LLMError(f"Both RAG and direct LLM failed: {exc}") from fallback_exc
 
 
+def reload_collections() -> None:
+    """Reopen the Chroma collections used for retrieval.
+
+    Chroma handles keep serving the vectors they loaded, so writes made by
+    another process (background indexing jobs) only become visible through
+    a fresh client.
+    """
+    from chromadb.api.client import SharedSystemClient
+
+    try:
+        SharedSystemClient.clear_system_cache()
+        fresh = chromadb.PersistentClient(path=os.getenv("CHROMA_PATH", "vectorstore/chroma_db"))
+        code_collection = fresh.get_or_create_collection(
+            name=resolve_collection("code_chunks"), metadata={"hnsw:space": "cosine"}
+        )
+        node_collection = fresh.get_or_create_collection(
+            name=resolve_collection("node_embeddings"), metadata={"hnsw:space": "cosine"}
+        )
+        _collections.set((fresh, code_collection, node_collection))
+        # Move the cache onto the new client too, so one view of the store is in use
+        if _cache.ready:
+            get_cache().collection = get_cache_collection()
+        log.info("ChromaDB collections reloaded")
+    except Exception as exc:
+        log.exception("Failed to reload ChromaDB collections")
+        raise ChromaError(f"ChromaDB reload failed: {exc}") from exc
+
+
+def refresh_collections_if_flipped() -> None:
+    """Reload the collections if a rebuild flipped an alias since they were opened.
+
+    Resolving is a stat of the alias manifest, so this is cheap enough to run
+    on every retrieval; it covers rebuilds run outside the API's job manager.
+    """
+    if not _collections.ready:
+        return
+    code_collection, node_collection = get_collections()
+    if (
+        code_collection.name != resolve_collection("code_chunks")
+        or node_collection.name != resolve_collection("node_embeddings")
+    ):
+        log.info("Collection alias changed, switching to the new version")
+        reload_collections()
+
+
+def preload_cache() -> int:
+    """Load existing semantic cache entries into memory.
+
+    Returns:
+        Number of entries loaded.
+    """
+    return get_cache().preload()
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Return semantic cache counters, including writes still queued."""
+    stats = get_cache().get_stats()
+    stats["pending_writes"] = write_behind.pending()
+    stats["dropped_writes"] = write_behind.dropped
+    return stats
+
+
 def clear_cache() -> None:
-    cache.clear()
+    # Apply queued stores first so they don't repopulate the cleared cache
+    write_behind.flush(timeout=5.0)
+    get_cache().clear()
 
 
 def stream_answer(question: str, bypass_cache: bool = False, llm_overrides: Optional[Dict[str, Any]] = None):
+    """Stream an answer, subscribing to an identical in-flight stream if any.
+
+    The first caller for a key starts the RAG stream; concurrent callers with
+    the same normalized question and LLM parameters replay and follow its
+    tokens instead of starting their own generation.
+    """
+    key = coalesce_key(question, bypass_cache=bypass_cache, llm=llm_overrides or {})
+    yield from inflight.stream(
+        key, lambda: _stream_answer(question, bypass_cache=bypass_cache, llm_overrides=llm_overrides)
+    )
+
+
+def _stream_answer(question: str, bypass_cache: bool = False, llm_overrides: Optional[Dict[str, Any]] = None):
     if not question:
         yield "Please provide a valid question."
         return
     try:
+        structural = answer_structural(question)
+        if structural is not None:
+            yield structural["answer"]
+            return
+
         # Check if it's a greeting - use direct LLM response
         if is_greeting(question):
             log.info("Detected greeting, using direct LLM response (streaming)")
@@ -618,27 +749,13 @@ def stream_answer(question: str, bypass_cache: bool = False, llm_overrides: Opti
             return
             
         if not bypass_cache:
-            cached = cache.lookup(question)
+            cached = get_cache().lookup(question)
             if cached:
                 yield cached["answer"]
                 return
         
         # Try RAG pipeline first
-        chain = rag_chain
-        if llm_overrides:
-            override_llm = ChatGroq(
-                model=llm_overrides.get("model_name", MODEL_NAME),
-                temperature=llm_overrides.get("temperature", TEMPERATURE),
-                max_tokens=llm_overrides.get("max_tokens", MAX_TOKENS),
-            )
-            chain = (
-                parallel_retrieval
-                | with_neighbors
-                | context_builder
-                | PROMPT
-                | override_llm
-                | StrOutputParser()
-            )
+        chain = build_rag_chain(_make_llm(llm_overrides) if llm_overrides else get_llm())
         
         buf = []
         for chunk in chain.stream(question):
@@ -665,7 +782,7 @@ def stream_answer(question: str, bypass_cache: bool = False, llm_overrides: Opti
         
         if not bypass_cache:
             formatted_final, references = format_response(final)
-            cache.store(question, formatted_final, references)
+            store_in_background(question, formatted_final, references)
     except (ChromaError, EmbeddingError):
         # For Chroma/Embedding errors, fallback to direct LLM
         log.info("RAG system error, falling back to direct LLM (streaming)")
@@ -682,6 +799,23 @@ def stream_answer(question: str, bypass_cache: bool = False, llm_overrides: Opti
             yield f"Error: Both RAG and direct LLM failed: {exc}"
 
 
+# Names that used to be created at import, now resolved on first access
+_LAZY_ATTRIBUTES = {
+    "llm": get_llm,
+    "cache": get_cache,
+    "client": lambda: _collections.get()[0],
+    "code_collection": lambda: get_collections()[0],
+    "node_collection": lambda: get_collections()[1],
+    "rag_chain": lambda: build_rag_chain(get_llm()),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # CLI
 if __name__ == "__main__":
     print("Initializing GraphRAG...")
@@ -728,9 +862,4 @@ if __name__ == "__main__":
         print(f"\nUnexpected error: {exc}")
         sys.exit(1)
     finally:
-        if driver:
-            try:
-                driver.close()
-                log.info("Neo4j connection closed")
-            except Exception:
-                pass
+        close_expander()
@@ -122,7 +122,7 @@ class GraphRAGSystem:
         neighbors = []
         if self._config.neo4j.use_neo4j:
             node_ids = [n["id"] for n in nodes]
-            neighbors = self._graph_database.expand_neighbors(node_ids, depth=1)
+            neighbors = self._graph_database.expand_neighbors(node_ids, depth=self._config.graph.depth)
         
         # Build context
         context = self._build_context(nodes, chunks, neighbors)
@@ -0,0 +1,406 @@
+# index_jobs.py
+"""Background indexing jobs.
+
+``POST /api/index`` enqueues a job instead of indexing inside the request.
+Each job runs ``run_ingest`` in a separate, lower-priority process, so
+parsing and embedding never compete with chat requests for the API
+process's GIL or event loop. The job reports progress over a queue,
+can be cancelled, and only one job per collection may be active at a time.
+
+Rebuild jobs write a new collection version and flip the ``code_chunks``
+alias once it validates (``core.collection_alias``), so retrieval never
+reads a half-written collection. Jobs given a ``kg_path`` (those submitted by
+the file watcher, ``core.index_watcher``) also patch the knowledge graph and
+node embeddings for the files they re-index.
+
+When a job succeeds, the API process reopens its Chroma handles (the child's
+writes are invisible to handles opened before them, and a rebuild changes
+which collection serves) and evicts cached answers citing the chunks the
+job rewrote.
+"""
+
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+import weakref
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from config.logger import log
+from config.settings import IndexConfig
+from core.code_exceptions import IndexingCancelled, IndexJobConflict
+
+ACTIVE_STATES = ("queued", "running", "cancelling")
+# Seconds an abandoned job gets to stop when the interpreter exits
+EXIT_TIMEOUT_S = 5.0
+
+_managers: "weakref.WeakSet[IndexJobManager]" = weakref.WeakSet()
+_exit_hook_registered = False
+
+
+def _stop_abandoned_jobs() -> None:
+    """Stop jobs still running at interpreter exit.
+
+    Job processes are not daemons, and multiprocessing joins those at exit,
+    so a process that submitted a job and exits without ``shutdown()``
+    would otherwise wait for the whole job.
+    """
+    for manager in list(_managers):
+        manager.shutdown(timeout=EXIT_TIMEOUT_S)
+
+
+def _register_exit_hook() -> None:
+    # Registered once a job process exists: atexit runs hooks in reverse
+    # order, so this runs before multiprocessing's own hook joins children.
+    global _exit_hook_registered
+    if not _exit_hook_registered:
+        _exit_hook_registered = True
+        atexit.register(_stop_abandoned_jobs)
+
+
+@dataclass
+class IndexJob:
+    """State of one indexing job as seen by the API process."""
+    id: str
+    collection: str
+    path: str
+    rebuild: bool = False
+    kg_path: Optional[str] = None
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    progress: Dict[str, int] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATES
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the job as a dict with derived rates and ETA."""
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        files_total = self.progress.get("files_total", 0)
+        files_done = self.progress.get("files_done", 0)
+        chunks = self.progress.get("chunks_written", 0)
+        eta = None
+        if self.active and files_done and files_total:
+            eta = elapsed / files_done * (files_total - files_done)
+        result = self.result or {}
+        return {
+            "job_id": self.id,
+            "collection": self.collection,
+            "path": self.path,
+            "rebuild": self.rebuild,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_s": round(elapsed, 2),
+            "files_total": files_total,
+            "files_done": files_done,
+            "chunks_written": chunks,
+            "files_per_s": round(files_done / elapsed, 2) if elapsed > 0 else 0.0,
+            "embeds_per_s": round(self.progress.get("chunks_embedded", 0) / elapsed, 2) if elapsed > 0 else 0.0,
+            "eta_s": round(eta, 1) if eta is not None else None,
+            "indexed_files": result.get("indexed_files", []),
+            "chunks_processed": result.get("stored", 0),
+        }
+
+
+def _lower_priority(niceness: int, threads: int) -> None:
+    """Make the job process yield CPU to the API process."""
+    if niceness and hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+        except OSError:
+            pass
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except Exception:
+        pass
+
+
+def _job_main(
+    path: str, rebuild: bool, events: Any, cancel: Any, niceness: int, threads: int, kg_path: Optional[str] = None
+) -> None:
+    """Entry point of the job process."""
+    _lower_priority(niceness, threads)
+    from core.chunker import rebuild_code_chunks, run_ingest
+    from core.index_watcher import update_index
+
+    last_sent = [0.0]
+
+    def progress(counts: Dict[str, int]) -> None:
+        now = time.monotonic()
+        if now - last_sent[0] >= 0.25:
+            last_sent[0] = now
+            events.put(("progress", counts))
+
+    try:
+        if rebuild:
+            # Build a new collection version; searches keep using the old one
+            report = rebuild_code_chunks([path], progress=progress, cancelled=cancel.is_set)
+        elif kg_path:
+            report = update_index(path, kg_path, progress=progress, cancelled=cancel.is_set)
+        else:
+            report = run_ingest(path, progress=progress, cancelled=cancel.is_set)
+        events.put(("done", asdict(report)))
+    except IndexingCancelled:
+        events.put(("cancelled", None))
+    except Exception as exc:
+        events.put(("error", f"{type(exc).__name__}: {exc}"))
+
+
+class IndexJobManager:
+    """Starts, tracks and cancels indexing jobs."""
+
+    def __init__(
+        self,
+        config: Optional[IndexConfig] = None,
+        on_success: Optional[Callable[[IndexJob], None]] = None,
+        max_history: int = 50,
+        target: Callable[..., None] = _job_main,
+    ) -> None:
+        """Initialize the manager.
+
+        Args:
+            config: Job priority, thread and cancellation settings.
+            on_success: Called in the API process after a job succeeds.
+            max_history: Finished jobs kept for status queries.
+            target: Job process entry point (a module-level function, as the
+                process is spawned).
+        """
+        self._config = config or IndexConfig.from_env()
+        self._target = target
+        self._on_success = on_success
+        self._max_history = max_history
+        self._jobs: Dict[str, IndexJob] = {}
+        self._cancel_events: Dict[str, Any] = {}
+        self._processes: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._ctx = multiprocessing.get_context("spawn")
+        _managers.add(self)
+
+    def _job_threads(self) -> int:
+        if self._config.job_threads > 0:
+            return self._config.job_threads
+        return max(1, (os.cpu_count() or 2) // 2)
+
+    def submit(
+        self, path: str, rebuild: bool = False, collection: str = "code_chunks", kg_path: Optional[str] = None
+    ) -> IndexJob:
+        """Start an indexing job.
+
+        Args:
+            path: Folder to index.
+            rebuild: Re-index every file instead of only changed ones.
+            collection: Collection the job writes to.
+            kg_path: Knowledge-graph JSON to patch for the re-indexed files.
+
+        Returns:
+            The new job.
+
+        Raises:
+            IndexJobConflict: If a job is already active for ``collection``.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.collection == collection and job.active:
+                    raise IndexJobConflict(f"Indexing job {job.id} is already {job.status} for {collection}")
+            job = IndexJob(
+                id=uuid.uuid4().hex[:12], collection=collection, path=path, rebuild=rebuild, kg_path=kg_path
+            )
+            self._jobs[job.id] = job
+            self._trim_history()
+
+            events = self._ctx.Queue()
+            cancel = self._ctx.Event()
+            self._cancel_events[job.id] = cancel
+            process = self._ctx.Process(
+                target=self._target,
+                args=(path, rebuild, events, cancel, self._config.job_niceness, self._job_threads(), kg_path),
+                name=f"index-job-{job.id}",
+                # Not a daemon: the ingest pipeline parses in a process pool,
+                # and daemonic processes may not have children. shutdown()
+                # stops running jobs instead.
+                daemon=False,
+            )
+            try:
+                process.start()
+            except Exception as exc:
+                job.status = "failed"
+                job.error = f"Could not start job process: {exc}"
+                job.finished_at = time.time()
+                raise
+            job.status = "running"
+            job.started_at = time.time()
+            self._processes[job.id] = process
+            _register_exit_hook()
+
+        threading.Thread(
+            target=self._monitor, args=(job, process, events, cancel), name=f"index-job-{job.id}-monitor", daemon=True
+        ).start()
+        log.info(f"Started indexing job {job.id} for {path} (pid={process.pid})")
+        return job
+
+    def get(self, job_id: str) -> Optional[IndexJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[IndexJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[IndexJob]:
+        """Request cancellation; the job stops after its current file.
+
+        Returns:
+            The job, or None if it does not exist.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            cancel = self._cancel_events.get(job_id)
+            if job is None:
+                return None
+            if job.active and cancel is not None:
+                cancel.set()
+                job.status = "cancelling"
+        return job
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Cancel running jobs and wait for their processes to exit.
+
+        Jobs that have not stopped after ``timeout`` seconds (default
+        ``job_cancel_grace_s``) are terminated. Their manifests are not
+        updated, so the next run redoes the unfinished files.
+        """
+        with self._lock:
+            running = [(self._cancel_events.get(job_id), process) for job_id, process in self._processes.items()]
+        for cancel, _ in running:
+            if cancel is not None:
+                cancel.set()
+        deadline = time.monotonic() + (self._config.job_cancel_grace_s if timeout is None else timeout)
+        for _, process in running:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                log.warning(f"Indexing process {process.name} did not stop in time, terminating")
+                process.terminate()
+                process.join(5.0)
+
+    def _trim_history(self) -> None:
+        finished = [j for j in self._jobs.values() if not j.active]
+        for job in sorted(finished, key=lambda j: j.created_at)[: max(0, len(finished) - self._max_history)]:
+            self._jobs.pop(job.id, None)
+            self._cancel_events.pop(job.id, None)
+
+    def _monitor(self, job: IndexJob, process: Any, events: Any, cancel: Any) -> None:
+        final: Optional[tuple] = None
+        cancel_seen: Optional[float] = None
+        while final is None:
+            try:
+                kind, payload = events.get(timeout=0.5)
+            except queue.Empty:
+                if cancel.is_set():
+                    cancel_seen = cancel_seen or time.monotonic()
+                    if time.monotonic() - cancel_seen > self._config.job_cancel_grace_s and process.is_alive():
+                        log.warning(f"Indexing job {job.id} did not stop in time, terminating")
+                        process.terminate()
+                        process.join(5.0)
+                if not process.is_alive():
+                    # Events may still be in flight from the exited process;
+                    # drain them up to the final one
+                    try:
+                        while True:
+                            kind, payload = events.get(timeout=1.0)
+                            if kind != "progress":
+                                final = (kind, payload)
+                                break
+                            with self._lock:
+                                job.progress = dict(payload)
+                    except queue.Empty:
+                        pass
+                    if final is not None:
+                        continue
+                    if cancel.is_set():
+                        final = ("cancelled", None)
+                    else:
+                        final = ("error", f"Job process exited with code {process.exitcode}")
+                continue
+            if kind == "progress":
+                with self._lock:
+                    job.progress = dict(payload)
+            else:
+                final = (kind, payload)
+
+        process.join(timeout=5.0)
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout=5.0)
+        kind, payload = final
+        with self._lock:
+            self._processes.pop(job.id, None)
+            job.finished_at = time.time()
+            if kind == "done":
+                job.status = "succeeded"
+                job.result = payload
+                job.progress["files_done"] = job.progress.get("files_total", len(payload.get("indexed_files", [])))
+                job.progress["chunks_written"] = payload.get("stored", 0)
+            elif kind == "cancelled":
+                job.status = "cancelled"
+            else:
+                job.status = "failed"
+                job.error = payload
+        log.info(f"Indexing job {job.id} {job.status}")
+
+        if job.status == "succeeded" and self._on_success is not None:
+            try:
+                self._on_success(job)
+            except Exception:
+                log.exception(f"Post-processing of indexing job {job.id} failed")
+
+
+def apply_job_result(job: IndexJob) -> None:
+    """Make a finished job's writes visible and evict stale cached answers."""
+    from core.graphrag import reload_collections
+    from core.semantic_cache import invalidate_cached_references
+
+    result = job.result or {}
+    reload_collections()
+    invalidate_cached_references(
+        chunk_ids=result.get("affected_chunk_ids", []), node_ids=result.get("affected_node_ids", [])
+    )
+
+
+# Global manager instance
+_index_jobs: Optional[IndexJobManager] = None
+_index_jobs_lock = threading.Lock()
+
+
+def get_index_jobs() -> IndexJobManager:
+    """Get the process-wide indexing job manager.
+
+    Returns:
+        Global manager configured from the environment.
+    """
+    global _index_jobs
+    if _index_jobs is None:
+        with _index_jobs_lock:
+            if _index_jobs is None:
+                _index_jobs = IndexJobManager(IndexConfig.from_env(), on_success=apply_job_result)
+    return _index_jobs
+
+
+def shutdown_index_jobs() -> None:
+    """Stop the jobs of the process-wide manager, if one was ever created."""
+    if _index_jobs is not None:
+        _index_jobs.shutdown()
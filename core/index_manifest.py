@@ -0,0 +1,305 @@
+# index_manifest.py
+"""Persisted manifest of indexed files for incremental re-indexing.
+
+For every indexed root the manifest records each file's mtime, size,
+sha256 and the chunk ids it produced. Comparing the manifest with the
+files on disk tells the indexer which files were added, changed or deleted,
+so a re-index only re-chunks and re-embeds those and deletes the chunks the
+old versions left behind. Each entry also records the chunking scheme that
+produced its chunks, so changing the scheme re-chunks files on the next run.
+
+Chunk ids are content hashes shared by every file containing the same text,
+so identical chunks are embedded and stored once. The line spans recorded
+per file are the side mapping from a chunk to all of its locations
+(``ChunkLocations``), and a chunk is only deleted once no file references it.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from config.logger import log
+
+MANIFEST_VERSION = 1
+
+
+def sha256_bytes(data: bytes) -> str:
+    """Return the hex sha256 digest of ``data``."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def content_chunk_id(chunk: str) -> str:
+    """Derive a stable chunk id from the chunk content alone.
+
+    Unchanged chunks keep their id across re-indexes, so only edited chunks
+    are re-embedded and cached answers citing untouched chunks stay valid.
+    Identical chunks in different files share one id and one vector.
+    """
+    return sha256_bytes(chunk.encode("utf-8"))[:16]
+
+
+@dataclass
+class FileEntry:
+    """Manifest record for one indexed file."""
+    mtime: float
+    size: int
+    sha256: str
+    chunk_ids: List[str] = field(default_factory=list)
+    # Version of the chunking scheme that produced ``chunk_ids``
+    chunking: int = 1
+    # Line spans ([start, end], 1-based) of each chunk's occurrences in the file
+    spans: Dict[str, List[List[int]]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mtime": self.mtime,
+            "size": self.size,
+            "sha256": self.sha256,
+            "chunk_ids": self.chunk_ids,
+            "chunking": self.chunking,
+            "spans": self.spans,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FileEntry":
+        return cls(
+            mtime=float(data.get("mtime", 0.0)),
+            size=int(data.get("size", -1)),
+            sha256=str(data.get("sha256", "")),
+            chunk_ids=list(data.get("chunk_ids", [])),
+            chunking=int(data.get("chunking", 1)),
+            spans={cid: [list(span) for span in spans] for cid, spans in data.get("spans", {}).items()},
+        )
+
+
+@dataclass
+class ManifestDiff:
+    """Files of one root grouped by what a re-index has to do with them."""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    # sha256 of files whose content was read while diffing
+    hashes: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def to_index(self) -> List[str]:
+        return self.added + self.changed
+
+
+class IndexManifest:
+    """JSON manifest of indexed files, one section per indexed root.
+
+    The manifest lives inside the vector store (one file per collection) and
+    is rewritten atomically, so an interrupted index run leaves the previous
+    manifest intact and the next run simply redoes the unfinished files.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Load the manifest from ``path`` (a missing or unreadable file is empty).
+
+        Args:
+            path: Location of the manifest JSON file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._roots: Dict[str, Dict[str, FileEntry]] = {}
+        self._load()
+
+    @classmethod
+    def for_collection(cls, manifest_dir: str, collection_name: str) -> "IndexManifest":
+        """Open the manifest belonging to a Chroma collection."""
+        return cls(os.path.join(manifest_dir, f"{collection_name}.json"))
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            log.warning(f"Ignoring unreadable index manifest at {self.path}")
+            return
+        if data.get("version") != MANIFEST_VERSION:
+            log.info(f"Index manifest {self.path} has an old format, starting fresh")
+            return
+        for root, files in data.get("roots", {}).items():
+            self._roots[root] = {rel: FileEntry.from_dict(entry) for rel, entry in files.items()}
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        with self._lock:
+            data = {
+                "version": MANIFEST_VERSION,
+                "roots": {
+                    root: {rel: entry.to_dict() for rel, entry in sorted(files.items())}
+                    for root, files in self._roots.items()
+                },
+            }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def files(self, root: str) -> Dict[str, FileEntry]:
+        """Return the recorded files of ``root`` (relative path -> entry)."""
+        with self._lock:
+            return dict(self._roots.get(root, {}))
+
+    def has_root(self, root: str) -> bool:
+        with self._lock:
+            return root in self._roots
+
+    def roots(self) -> List[str]:
+        with self._lock:
+            return list(self._roots)
+
+    def chunk_ids(self) -> Set[str]:
+        """Return every chunk id recorded under any root."""
+        with self._lock:
+            return {cid for files in self._roots.values() for entry in files.values() for cid in entry.chunk_ids}
+
+    def record(self, root: str, rel_path: str, entry: FileEntry) -> None:
+        with self._lock:
+            self._roots.setdefault(root, {})[rel_path] = entry
+
+    def remove(self, root: str, rel_paths: Iterable[str]) -> None:
+        with self._lock:
+            files = self._roots.get(root, {})
+            for rel in rel_paths:
+                files.pop(rel, None)
+
+    def clear(self) -> None:
+        """Forget every root."""
+        with self._lock:
+            self._roots.clear()
+
+    def reset(self, root: str) -> List[str]:
+        """Forget ``root`` and return every chunk id it had recorded."""
+        with self._lock:
+            files = self._roots.pop(root, {})
+        return [cid for entry in files.values() for cid in entry.chunk_ids]
+
+    def diff(self, root: str, paths: Iterable[Path], chunking: Optional[int] = None) -> ManifestDiff:
+        """Compare files on disk with the manifest.
+
+        Files whose mtime and size match the manifest are treated as
+        unchanged without being read. Otherwise the content hash decides, so
+        a touched but unmodified file is not re-indexed.
+
+        Args:
+            root: Indexed root directory (as recorded).
+            paths: Files currently under the root.
+            chunking: Current chunking scheme version; files recorded under
+                another version count as changed.
+
+        Returns:
+            The added, changed, deleted and unchanged relative paths.
+        """
+        recorded = self.files(root)
+        result = ManifestDiff()
+        seen = set()
+        base = Path(root)
+        for path in paths:
+            rel = path.relative_to(base).as_posix()
+            seen.add(rel)
+            entry = recorded.get(rel)
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            rechunk = entry is not None and chunking is not None and entry.chunking != chunking
+            if entry is not None and not rechunk and entry.mtime == stat.st_mtime and entry.size == stat.st_size:
+                result.unchanged.append(rel)
+                continue
+            digest = sha256_bytes(path.read_bytes())
+            result.hashes[rel] = digest
+            if entry is None:
+                result.added.append(rel)
+            elif rechunk or entry.sha256 != digest:
+                result.changed.append(rel)
+            else:
+                # Touched but identical: refresh the stat so it is not re-hashed next time
+                self.record(root, rel, FileEntry(
+                    stat.st_mtime, stat.st_size, digest, entry.chunk_ids, entry.chunking, entry.spans
+                ))
+                result.unchanged.append(rel)
+        result.deleted = sorted(rel for rel in recorded if rel not in seen)
+        return result
+
+
+def stat_entry(
+    path: Path,
+    digest: Optional[str],
+    chunk_ids: List[str],
+    chunking: int = 1,
+    spans: Optional[Dict[str, List[List[int]]]] = None,
+) -> FileEntry:
+    """Build a manifest entry for ``path`` after it has been indexed."""
+    stat = path.stat()
+    return FileEntry(
+        mtime=stat.st_mtime,
+        size=stat.st_size,
+        sha256=digest or sha256_bytes(path.read_bytes()),
+        chunk_ids=chunk_ids,
+        chunking=chunking,
+        spans=spans or {},
+    )
+
+
+def _display_path(path: Path) -> str:
+    try:
+        return path.relative_to(Path.cwd()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+class ChunkLocations:
+    """Every (file, line span) location of each stored chunk.
+
+    Built from an index manifest and rebuilt whenever the manifest file
+    changes, so the API process sees what indexing jobs in other processes
+    recorded. Lookups cost a ``stat`` plus dict accesses.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the lookup.
+
+        Args:
+            path: Location of the index manifest JSON file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _refresh(self) -> None:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            self._index, self._mtime = {}, None
+            return
+        if mtime == self._mtime:
+            return
+        manifest = IndexManifest(self.path)
+        index: Dict[str, List[Dict[str, Any]]] = {}
+        for root in manifest.roots():
+            for rel, entry in sorted(manifest.files(root).items()):
+                file_path = _display_path(Path(root) / rel)
+                for chunk_id in entry.chunk_ids:
+                    for start, end in entry.spans.get(chunk_id, []):
+                        index.setdefault(chunk_id, []).append(
+                            {"file": file_path, "start_line": start, "end_line": end}
+                        )
+        self._index, self._mtime = index, mtime
+
+    def get(self, chunk_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Return the locations of each of ``chunk_ids`` (unknown ids are omitted)."""
+        with self._lock:
+            self._refresh()
+            return {cid: list(self._index[cid]) for cid in chunk_ids if cid in self._index}
@@ -0,0 +1,290 @@
+# index_watcher.py
+"""Live incremental indexing of watched source trees.
+
+``IndexWatcher`` watches one or more roots for changes to ``.py`` files,
+through native filesystem events (inotify, FSEvents or ReadDirectoryChangesW
+via the optional ``watchfiles`` package) or, when that is unavailable, by
+polling file stats. Bursts of saves are debounced into one batch per root: a
+batch fires once no change arrived for ``watch_debounce_ms``, or
+``watch_max_delay_ms`` after its first change if saves keep coming.
+
+A batch runs ``update_index``: the incremental re-index of
+``core.chunker.run_ingest`` (only changed chunks are re-embedded), then a
+patch of the knowledge-graph JSON and of the node embeddings covering
+exactly the changed and deleted files. Inside the API the watcher submits
+batches as indexing jobs (``core.index_jobs``), so updates run out of
+process and the API reloads its collections and evicts stale cached answers
+when a job finishes. ``python -m core.index_watcher`` runs the same loop as a
+standalone daemon.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from config.logger import log
+from config.settings import IndexConfig
+from core.code_exceptions import IndexJobConflict
+from graph_indexing.kgbuild.centrality import annotate_centrality
+from graph_indexing.kgbuild.graph import KG
+from graph_indexing.kgbuild.kgio import read_graph, write_graph
+
+# Directories never worth watching or indexing
+IGNORED_DIRS = frozenset({
+    ".git", ".hg", ".svn", ".venv", "venv", "__pycache__", "node_modules",
+    ".mypy_cache", ".pytest_cache", ".tox", ".idea",
+})
+
+
+def patch_knowledge_graph(kg_path: str, fragments: Dict[str, KG], deleted: Iterable[str]) -> List[str]:
+    """Replace the graph of changed files in ``kg_path`` and update node embeddings.
+
+    Args:
+        kg_path: ``knowledge_graph.json`` built from the same root the
+            fragments were extracted from.
+        fragments: Fresh KG fragment per changed file (relative path).
+        deleted: Deleted files (relative paths).
+
+    Returns:
+        Ids of the nodes written or removed, for cache invalidation.
+    """
+    from core.embed_nodes import update_node_embeddings
+
+    if not os.path.exists(kg_path):
+        log.warning(f"Knowledge graph {kg_path} not found, skipping graph patch (build it with kgbuild/runner.py)")
+        return []
+    kg = KG.from_dict(read_graph(kg_path))
+
+    removed = kg.remove_files([*fragments, *deleted])
+    nodes = []
+    for rel in sorted(fragments):
+        kg.merge(fragments[rel])
+        nodes.extend(kg.nodes[node_id] for node_id in fragments[rel].nodes)
+
+    # Centrality is global, so every patch rescores the whole graph
+    write_graph(kg_path, annotate_centrality(kg.to_dict()))
+    log.info(f"Patched {kg_path}: {len(fragments)} files re-extracted, {len(removed)} nodes replaced")
+    return update_node_embeddings(nodes, removed)
+
+
+def update_index(
+    root: str,
+    kg_path: Optional[str] = None,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+):
+    """Incrementally re-index ``root`` and patch the knowledge graph to match.
+
+    Args:
+        root: Indexed root directory.
+        kg_path: Knowledge-graph JSON to patch, or None to only update chunks.
+        progress: Optional callback receiving running counts.
+        cancelled: Optional predicate polled between files.
+
+    Returns:
+        The ``IngestReport``, with ``affected_node_ids`` set by the patch.
+    """
+    from core.chunker import run_ingest
+
+    fragments: Dict[str, KG] = {}
+    report = run_ingest(root, progress=progress, cancelled=cancelled, fragments=fragments if kg_path else None)
+    if kg_path and (fragments or report.deleted_files):
+        report.affected_node_ids = patch_knowledge_graph(kg_path, fragments, report.deleted_files)
+    return report
+
+
+class IndexWatcher:
+    """Watches roots for ``.py`` changes and hands debounced batches to a callback.
+
+    ``on_batch(root)`` is called from the watcher thread with a root that
+    has pending changes. It returns False when the update cannot start yet
+    (e.g. an indexing job is still running); the root stays pending and is
+    retried on the next tick. Every root starts out pending, so edits made
+    while nothing was watching are picked up.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[str],
+        on_batch: Callable[[str], bool],
+        config: Optional[IndexConfig] = None,
+    ) -> None:
+        """Initialize the watcher.
+
+        Args:
+            roots: Directories to watch.
+            on_batch: Called with each root that has pending changes.
+            config: Backend, debounce and polling settings.
+        """
+        self.roots = [str(Path(root).resolve()) for root in roots]
+        self._on_batch = on_batch
+        self._config = config or IndexConfig.from_env()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Set[str] = set(self.roots)
+        self.backend = self._select_backend()
+
+    def _select_backend(self) -> str:
+        backend = self._config.watch_backend
+        if backend == "poll":
+            return "poll"
+        try:
+            import watchfiles  # noqa: F401
+        except ImportError:
+            if backend == "native":
+                log.warning("watchfiles is not installed, falling back to polling")
+            return "poll"
+        return "native"
+
+    def start(self) -> None:
+        """Run the watcher in a daemon thread."""
+        self._thread = threading.Thread(target=self.run, name="index-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop watching and wait for the watcher thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def run(self) -> None:
+        """Watch until ``stop`` is called."""
+        log.info(f"Watching {', '.join(self.roots)} for changes ({self.backend})")
+        self._flush()
+        for changed in self._native_batches() if self.backend == "native" else self._poll_batches():
+            self._pending.update(self._roots_of(changed))
+            self._flush()
+
+    def _flush(self) -> None:
+        for root in sorted(self._pending):
+            if self._stop.is_set():
+                return
+            try:
+                done = self._on_batch(root)
+            except Exception:
+                # The manifest diff of the next batch catches up on what was missed
+                log.exception(f"Incremental update of {root} failed")
+                done = True
+            if done:
+                self._pending.discard(root)
+
+    def _roots_of(self, paths: Iterable[str]) -> Set[str]:
+        roots = set()
+        for path in paths:
+            owners = [root for root in self.roots if path == root or path.startswith(root + os.sep)]
+            if owners:
+                roots.add(max(owners, key=len))
+        return roots
+
+    def _native_batches(self) -> Iterator[Set[str]]:
+        import watchfiles
+
+        changes = watchfiles.watch(
+            *self.roots,
+            watch_filter=watchfiles.PythonFilter(),
+            step=self._config.watch_debounce_ms,
+            debounce=self._config.watch_max_delay_ms,
+            stop_event=self._stop,
+            # Wake up periodically so pending roots are retried
+            rust_timeout=int(self._config.watch_poll_interval_s * 1000),
+            yield_on_timeout=True,
+            raise_interrupt=False,
+        )
+        for batch in changes:
+            yield {str(Path(path)) for _, path in batch}
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        stats: Dict[str, Tuple[int, int]] = {}
+        for root in self.roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+                for name in filenames:
+                    if not name.endswith(".py"):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def _poll_batches(self) -> Iterator[Set[str]]:
+        debounce_s = self._config.watch_debounce_ms / 1000
+        max_delay_s = self._config.watch_max_delay_ms / 1000
+        snapshot = self._snapshot()
+        pending: Set[str] = set()
+        first = last = 0.0
+        while not self._stop.wait(self._config.watch_poll_interval_s):
+            current = self._snapshot()
+            changed = {path for path in current.keys() | snapshot.keys() if current.get(path) != snapshot.get(path)}
+            snapshot = current
+            now = time.monotonic()
+            if changed:
+                pending |= changed
+                first = first or now
+                last = now
+            if pending and (now - last >= debounce_s or now - first >= max_delay_s):
+                yield pending
+                pending, first = set(), 0.0
+            else:
+                yield set()
+
+
+def submit_watch_job(root: str) -> bool:
+    """``on_batch`` for the API: run the update as a background indexing job."""
+    from core.index_jobs import get_index_jobs
+
+    try:
+        get_index_jobs().submit(root, kg_path=IndexConfig.from_env().kg_path)
+    except IndexJobConflict:
+        return False
+    return True
+
+
+def start_index_watcher(config: Optional[IndexConfig] = None) -> Optional[IndexWatcher]:
+    """Start watching ``INDEX_WATCH_PATHS`` in the API process, if any are set."""
+    config = config or IndexConfig.from_env()
+    if not config.watch_paths:
+        return None
+    watcher = IndexWatcher(config.watch_paths, submit_watch_job, config)
+    watcher.start()
+    return watcher
+
+
+def watch_forever(roots: Iterable[str], kg_path: Optional[str] = None, config: Optional[IndexConfig] = None) -> None:
+    """Run the watcher in the foreground, updating the index in this process.
+
+    Args:
+        roots: Directories to watch.
+        kg_path: Knowledge-graph JSON to patch, or None to only update chunks.
+        config: Watcher settings.
+    """
+    from core.semantic_cache import invalidate_cached_references
+
+    def on_batch(root: str) -> bool:
+        report = update_index(root, kg_path)
+        invalidate_cached_references(chunk_ids=report.affected_chunk_ids, node_ids=report.affected_node_ids)
+        return True
+
+    watcher = IndexWatcher(roots, on_batch, config)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    settings = IndexConfig.from_env()
+    parser = argparse.ArgumentParser(description="Keep code chunks and the knowledge graph in sync with a source tree")
+    parser.add_argument("roots", nargs="*", default=list(settings.watch_paths), help="Directories to watch")
+    parser.add_argument("--kg", default=settings.kg_path, help="Knowledge-graph JSON to patch")
+    parser.add_argument("--no-kg", action="store_true", help="Only update code chunks")
+    args = parser.parse_args()
+    if not args.roots:
+        parser.error("no roots given and INDEX_WATCH_PATHS is empty")
+    watch_forever(args.roots, None if args.no_kg else args.kg, settings)
@@ -0,0 +1,388 @@
+# ingest_pipeline.py
+"""Staged producer/consumer pipeline for code ingestion.
+
+Files flow through three stages connected by bounded queues:
+
+1. parse  - read, parse (one Tree-sitter pass, see ``core.code_splitter``) and
+            split files in a process pool
+2. embed  - assign content-hash chunk ids, skip chunks already stored (by
+            any file: identical chunks share one id and one vector), and
+            embed new chunks in batches; each chunk's metadata carries
+            the id of the KG node it belongs to (``kg_node``) and, for
+            methods, of the enclosing class (``parent``)
+3. write  - upsert each embedded batch into Chroma
+
+The bounded queues apply backpressure, so memory stays flat however many
+files are queued, and CPU-bound parsing overlaps with embedding and with the
+IO-bound Chroma writes.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import chromadb
+
+from config.logger import log
+from config.settings import IndexConfig
+from core.batch_writer import embed_documents, upsert_embedded
+from core.code_exceptions import IndexingCancelled
+from core.code_splitter import FileChunks, parse_file
+from core.index_manifest import content_chunk_id
+from graph_indexing.kgbuild.graph import KG
+
+_DONE = object()
+
+
+@dataclass
+class FileTask:
+    """A file to (re-)index."""
+    rel: str
+    path: str
+    metadata: Dict[str, Any]
+    old_ids: Set[str] = field(default_factory=set)
+    # Project root KG node ids are relative to
+    root: str = ""
+
+
+@dataclass
+class StageStats:
+    """Throughput of one pipeline stage."""
+    name: str
+    items: int = 0
+    busy_s: float = 0.0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def wall_s(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    def span_attributes(self) -> Dict[str, Any]:
+        wall = self.wall_s
+        prefix = f"rag.index.stage.{self.name}"
+        return {
+            f"{prefix}.items": self.items,
+            f"{prefix}.busy_s": round(self.busy_s, 4),
+            f"{prefix}.wall_s": round(wall, 4),
+            f"{prefix}.items_per_s": round(self.items / wall, 2) if wall > 0 else 0.0,
+        }
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of a pipeline run."""
+    chunk_ids: Dict[str, List[str]] = field(default_factory=dict)
+    # Line spans of each chunk's occurrences, per relative path
+    spans: Dict[str, Dict[str, List[List[int]]]] = field(default_factory=dict)
+    written: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    stages: List[StageStats] = field(default_factory=list)
+    # KG fragment per relative path, when the pipeline collects them
+    graphs: Dict[str, KG] = field(default_factory=dict)
+
+    def span_attributes(self) -> Dict[str, Any]:
+        attrs: Dict[str, Any] = {}
+        for stage in self.stages:
+            attrs.update(stage.span_attributes())
+        return attrs
+
+
+class _Aborted(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class IngestPipeline:
+    """Runs file tasks through the parse -> embed -> write stages.
+
+    Small jobs (fewer than ``pool_min_files`` files) are parsed in-process;
+    the process pool only pays off once its start-up cost is amortised.
+
+    ``progress`` is called (from stage threads) with running counts after
+    every parsed file and every written batch; ``cancelled`` is polled
+    between files and stops the run with ``IndexingCancelled``.
+
+    With ``collect_graph`` the parse stage also returns each file's
+    knowledge-graph fragment from the same parse.
+    """
+
+    pool_min_files = 8
+
+    def __init__(
+        self,
+        collection: chromadb.Collection,
+        config: Optional[IndexConfig] = None,
+        progress: Optional[Callable[[Dict[str, int]], None]] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+        collect_graph: bool = False,
+    ) -> None:
+        """Initialize the pipeline.
+
+        Args:
+            collection: Chroma collection receiving the chunks.
+            config: Batch, queue and worker settings.
+            progress: Optional callback receiving running counts.
+            cancelled: Optional predicate; when it returns True the run stops.
+            collect_graph: Collect each file's KG fragment in the result.
+        """
+        self._collection = collection
+        self._config = config or IndexConfig.from_env()
+        self._progress = progress
+        self._cancelled = cancelled
+        self._collect_graph = collect_graph
+        self._stats: List[StageStats] = []
+        self._abort = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def _workers(self) -> int:
+        if self._config.parse_workers > 0:
+            return self._config.parse_workers
+        return max(1, (os.cpu_count() or 2) - 1)
+
+    def run(self, tasks: Sequence[FileTask]) -> PipelineResult:
+        """Index ``tasks`` and return the chunk ids per file.
+
+        Args:
+            tasks: Files to parse, embed and write.
+
+        Returns:
+            Chunk ids per relative path, written and skipped ids, and stage stats.
+
+        Raises:
+            Exception: The first error raised by any stage.
+        """
+        result = PipelineResult()
+        parse_stats, embed_stats, write_stats = StageStats("parse"), StageStats("embed"), StageStats("write")
+        result.stages = [parse_stats, embed_stats, write_stats]
+        self._stats = result.stages
+        if not tasks:
+            return result
+
+        chunk_q: "queue.Queue[Any]" = queue.Queue(maxsize=self._config.queue_size)
+        write_q: "queue.Queue[Any]" = queue.Queue(maxsize=self._config.queue_size)
+
+        threads = [
+            threading.Thread(target=self._guard, args=(self._parse_stage, tasks, chunk_q, parse_stats, result),
+                             name="ingest-parse", daemon=True),
+            threading.Thread(target=self._guard, args=(self._embed_stage, chunk_q, write_q, embed_stats, result),
+                             name="ingest-embed", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        # The writer runs on the calling thread
+        self._guard(self._write_stage, write_q, write_stats, result)
+        for thread in threads:
+            thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+        log.info(
+            "Ingest pipeline: "
+            + ", ".join(f"{s.name}={s.items} in {s.wall_s:.2f}s" for s in result.stages)
+        )
+        return result
+
+    def _report(self) -> None:
+        if self._progress is None:
+            return
+        parse, embed, write = self._stats
+        self._progress({
+            "files_done": parse.items,
+            "chunks_embedded": embed.items,
+            "chunks_written": write.items,
+        })
+
+    def _check_cancelled(self) -> None:
+        if self._cancelled is not None and self._cancelled():
+            raise IndexingCancelled("Indexing cancelled")
+
+    def _guard(self, stage: Any, *args: Any) -> None:
+        try:
+            stage(*args)
+        except _Aborted:
+            pass
+        except IndexingCancelled as exc:
+            log.info("Ingest pipeline cancelled")
+            self._errors.append(exc)
+            self._abort.set()
+        except BaseException as exc:  # noqa: BLE001 - re-raised by run()
+            log.exception(f"Ingest stage {stage.__name__} failed")
+            self._errors.append(exc)
+            self._abort.set()
+
+    def _put(self, q: "queue.Queue[Any]", item: Any) -> None:
+        while True:
+            if self._abort.is_set():
+                raise _Aborted()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: "queue.Queue[Any]") -> Any:
+        while True:
+            if self._abort.is_set():
+                raise _Aborted()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _parsed(self, task: FileTask, parsed: FileChunks, out: "queue.Queue[Any]", stats: StageStats,
+                result: PipelineResult) -> None:
+        stats.items += 1
+        stats.busy_s += parsed.parse_s + parsed.split_s
+        if parsed.graph is not None:
+            result.graphs[task.rel] = parsed.graph
+        self._put(out, (task, parsed))
+        self._report()
+
+    def _parse_stage(
+        self,
+        tasks: Sequence[FileTask],
+        out: "queue.Queue[Any]",
+        stats: StageStats,
+        result: PipelineResult,
+    ) -> None:
+        stats.started = time.perf_counter()
+        completed = False
+        try:
+            workers = self._workers()
+            if workers <= 1 or len(tasks) < self.pool_min_files:
+                for task in tasks:
+                    self._check_cancelled()
+                    parsed = parse_file(task.path, task.root or None, self._collect_graph)
+                    self._parsed(task, parsed, out, stats, result)
+                completed = True
+                return
+
+            # At most 2 files per worker in flight: parsed files wait in the
+            # bounded queue, so a slow embedder throttles parsing.
+            max_inflight = workers * 2
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending: Dict[Future, FileTask] = {}
+                remaining = iter(tasks)
+                exhausted = False
+                while pending or not exhausted:
+                    while not exhausted and len(pending) < max_inflight:
+                        task = next(remaining, None)
+                        if task is None:
+                            exhausted = True
+                            break
+                        pending[pool.submit(parse_file, task.path, task.root or None, self._collect_graph)] = task
+                    if not pending:
+                        break
+                    done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task = pending.pop(future)
+                        self._parsed(task, future.result(), out, stats, result)
+                    if self._abort.is_set() or (self._cancelled is not None and self._cancelled()):
+                        for future in pending:
+                            future.cancel()
+                        self._check_cancelled()
+                        raise _Aborted()
+            completed = True
+        finally:
+            stats.finished = time.perf_counter()
+            # Only a complete stage lets the next one flush; after an error
+            # or a cancel, _guard aborts the run instead
+            if completed and not self._abort.is_set():
+                self._put(out, _DONE)
+
+    def _embed_stage(
+        self,
+        inbound: "queue.Queue[Any]",
+        out: "queue.Queue[Any]",
+        stats: StageStats,
+        result: PipelineResult,
+    ) -> None:
+        stats.started = time.perf_counter()
+        batch_size = max(1, self._config.write_batch_size)
+        ids: List[str] = []
+        docs: List[str] = []
+        metas: List[Dict[str, Any]] = []
+        # Ids stored or queued during this run
+        seen: Set[str] = set()
+
+        def flush() -> None:
+            if not ids:
+                return
+            t0 = time.perf_counter()
+            vectors = embed_documents(ids, docs)
+            stats.busy_s += time.perf_counter() - t0
+            stats.items += len(ids)
+            self._put(out, (list(ids), list(docs), list(metas), vectors))
+            ids.clear()
+            docs.clear()
+            metas.clear()
+
+        completed = False
+        try:
+            while True:
+                item = self._get(inbound)
+                if item is _DONE:
+                    break
+                task, parsed = item
+                spans: Dict[str, List[List[int]]] = {}
+                fresh: List[Tuple[str, str, Dict[str, Any]]] = []
+                for chunk, kg_node, parent, (start, end) in zip(
+                    parsed.chunks, parsed.kg_nodes, parsed.parents, parsed.spans
+                ):
+                    # Skip empty chunks to prevent Chroma errors
+                    if not chunk.strip():
+                        continue
+                    chunk_id = content_chunk_id(chunk)
+                    if chunk_id not in spans:
+                        spans[chunk_id] = []
+                        meta = {**task.metadata, "kg_node": kg_node}
+                        if parent:
+                            meta["parent"] = parent
+                        fresh.append((chunk_id, chunk, meta))
+                    spans[chunk_id].append([start, end])
+                result.chunk_ids[task.rel] = list(spans)
+                result.spans[task.rel] = spans
+
+                # Unchanged chunks, and copies of chunks stored for other files,
+                # keep their id and embedding
+                candidates = [cid for cid, _, _ in fresh if cid not in seen]
+                if candidates:
+                    seen.update(self._collection.get(ids=candidates, include=[])["ids"])
+                missing = [(cid, chunk, meta) for cid, chunk, meta in fresh if cid not in seen]
+                seen.update(cid for cid, _, _ in missing)
+                for chunk_id, chunk, meta in missing:
+                    ids.append(chunk_id)
+                    docs.append(chunk)
+                    metas.append(meta)
+                    if len(ids) >= batch_size:
+                        flush()
+            flush()
+            completed = True
+        finally:
+            stats.finished = time.perf_counter()
+            if completed and not self._abort.is_set():
+                self._put(out, _DONE)
+
+    def _write_stage(self, inbound: "queue.Queue[Any]", stats: StageStats, result: PipelineResult) -> None:
+        stats.started = time.perf_counter()
+        try:
+            while True:
+                item = self._get(inbound)
+                if item is _DONE:
+                    break
+                ids, docs, metas, vectors = item
+                t0 = time.perf_counter()
+                written = upsert_embedded(self._collection, ids, docs, metas, vectors)
+                stats.busy_s += time.perf_counter() - t0
+                stats.items += len(written)
+                result.written.extend(written)
+                result.skipped.extend(doc_id for doc_id, vec in zip(ids, vectors) if not vec)
+                self._report()
+        finally:
+            stats.finished = time.perf_counter()
@@ -29,6 +29,23 @@ class EmbeddingProvider(ABC):
         """
         pass
     
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts at once.
+        
+        Providers that can batch should override this; the default embeds
+        one text at a time.
+        
+        Args:
+            texts: Texts to embed.
+            
+        Returns:
+            One vector per input text, in order.
+            
+        Raises:
+            EmbeddingError: If embedding fails.
+        """
+        return [self.embed(text) for text in texts]
+    
     @abstractmethod
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the embedding model.
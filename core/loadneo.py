@@ -3,29 +3,77 @@
 Bulk importer that ingests a `knowledge_graph.json` file into Neo4j.
 
 The script creates a uniqueness constraint on node IDs, then inserts nodes and
-edges in batches to avoid overloading the database. Refactored to use dependency
-injection following SOLID principles.
+edges in batches to avoid overloading the database. Edges are streamed in batches
+grouped by type, duplicates collapse into one relationship whose ``count``
+property each batch increments, and each type is written with a native typed
+``MERGE``. Batches run in parallel sessions; deadlocks and other transient
+errors are retried by the driver's managed transactions. Refactored to use
+dependency injection following SOLID principles.
+
+``export_admin_import`` instead writes CSV files for ``neo4j-admin database
+import``, the fastest way to load a large graph into an empty database.
 """
 
+import csv
+import heapq
 import json
-from typing import List, Dict, Any
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import groupby, islice
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple
 
 from config.settings import Neo4jConfig
 from core.code_exceptions import Neo4jError
 from core.interfaces import GraphDatabase
 from config.logger import log
+from graph_indexing.kgbuild.kgio import is_ndjson, iter_edges, iter_nodes
+
+_REL_TYPE = re.compile(r"^[A-Z_][A-Z0-9_]*$")
+# Centrality scores stored on every node (see graph_indexing/kgbuild/centrality.py)
+SCORE_COLUMNS = (("pagerank", ":double"), ("degree", ":long"), ("betweenness", ":double"))
+# Edges sorted in memory at once per spill file of export_admin_import
+EXPORT_RUN_SIZE = 500_000
+
+
+def group_edges(edges: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group a batch of edges by type, collapsing duplicates into one row with a ``count``.
+
+    Rows of each type are sorted by source so that a batch touches few
+    source nodes, which keeps parallel batches from locking the same nodes.
+    The whole input is held in memory; callers stream large edge lists
+    through it one batch at a time.
+
+    Raises:
+        Neo4jError: If an edge type is not a valid relationship type name.
+    """
+    counts = Counter((edge["type"], edge["src"], edge["dst"]) for edge in edges)
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for (edge_type, src, dst), count in sorted(counts.items()):
+        if not _REL_TYPE.match(edge_type):
+            raise Neo4jError(f"Invalid relationship type: {edge_type!r}")
+        grouped.setdefault(edge_type, []).append({"src": src, "dst": dst, "count": count})
+    return grouped
 
 
 class Neo4jImporter:
     """Neo4j bulk importer following Single Responsibility Principle."""
     
-    def __init__(self, graph_db: GraphDatabase) -> None:
+    def __init__(self, graph_db: GraphDatabase, config: Optional[Neo4jConfig] = None) -> None:
         """Initialize with graph database service.
         
         Args:
             graph_db: Graph database service implementation.
+            config: Batch size, parallel sessions and retries; defaults to
+                ``Neo4jConfig.from_env()``.
         """
         self._graph_db = graph_db
+        config = config or Neo4jConfig.from_env()
+        self._batch_size = max(1, config.import_batch_size)
+        self._workers = max(1, config.import_workers)
         self._create_constraint_query = """
         CREATE CONSTRAINT IF NOT EXISTS
         FOR (n:Node) REQUIRE n.id IS UNIQUE;
@@ -34,22 +82,28 @@ class Neo4jImporter:
         UNWIND $batch AS row
         MERGE (n:Node {id: row.id})
         SET n.type = row.type,
-            n += row.props;
+            n += row.props,
+            n += coalesce(row.scores, {});
         """
-        self._edge_insert_query = """
+        # Diff application: changed nodes are replaced so dropped properties go away
+        self._node_replace_query = """
         UNWIND $batch AS row
-        MATCH (src:Node {id: row.src})
-        MATCH (dst:Node {id: row.dst})
-        CALL apoc.create.relationship(src, row.type, row.props, dst)
-        YIELD rel
-        RETURN count(rel);
+        MERGE (n:Node {id: row.id})
+        SET n = row.props
+        SET n.id = row.id, n.type = row.type, n += coalesce(row.scores, {});
+        """
+        self._node_delete_query = """
+        UNWIND $batch AS id
+        MATCH (n:Node {id: id})
+        DETACH DELETE n;
         """
     
     def import_knowledge_graph(self, json_path: str = "graph_indexing/knowledge_graph.json") -> None:
         """Import the knowledge graph into Neo4j using batched Cypher queries.
         
         Args:
-            json_path: Path to the JSON knowledge graph file.
+            json_path: Path to the knowledge graph file. NDJSON graphs are
+                streamed in batches instead of being loaded whole.
         
         Raises:
             Neo4jError: If any Neo4j operation fails.
@@ -57,22 +111,26 @@ class Neo4jImporter:
             json.JSONDecodeError: If the JSON file is malformed.
         """
         try:
-            log.info(f"Loading JSON: {json_path}")
-            kg = self._load_json(json_path)
-
-            nodes = kg.get("nodes", [])
-            edges = kg.get("edges", [])
-
-            log.info(f"Nodes: {len(nodes)}, Edges: {len(edges)}")
+            nodes: Iterable[Dict[str, Any]]
+            edges: Iterable[Dict[str, Any]]
+            if is_ndjson(json_path):
+                if not os.path.exists(json_path):
+                    raise FileNotFoundError(json_path)
+                log.info(f"Streaming NDJSON: {json_path}")
+                nodes, edges = iter_nodes(json_path), iter_edges(json_path)
+            else:
+                log.info(f"Loading JSON: {json_path}")
+                kg = self._load_json(json_path)
+                nodes = kg.get("nodes", [])
+                edges = kg.get("edges", [])
+                log.info(f"Nodes: {len(nodes)}, Edges: {len(edges)}")
 
             self._graph_db.connect()
             
             try:
                 self._create_constraint()
-                if nodes:
-                    self._import_nodes(nodes)
-                if edges:
-                    self._import_edges(edges)
+                self._import_nodes(nodes)
+                self._import_edges(edges)
             finally:
                 self._graph_db.close()
 
@@ -86,6 +144,50 @@ class Neo4jImporter:
             log.exception("Unexpected error during graph import")
             raise Neo4jError(f"Import failed: {exc}") from exc
     
+    def apply_diff(self, diff_path: str) -> None:
+        """Apply a ``knowledge_graph.diff.json`` from an incremental KG build.
+
+        Removed edges and nodes are deleted first, then added and changed
+        nodes are written and added edges merged. A diff lists distinct
+        edges only, so the ``count`` of an edge whose multiplicity changed is
+        not updated; re-import the graph to refresh counts.
+
+        Args:
+            diff_path: Diff written next to the knowledge graph by ``runner.py``.
+
+        Raises:
+            Neo4jError: If any Neo4j operation fails.
+        """
+        from graph_indexing.kgbuild.incremental import load_diff
+
+        try:
+            diff = load_diff(diff_path)
+            log.info(f"Applying knowledge-graph diff {diff_path}: {diff.summary()}")
+            self._graph_db.connect()
+            try:
+                self._create_constraint()
+                steps = (
+                    ("removed edges", self._edge_jobs(self._edge_delete_query, diff.removed_edges)),
+                    ("removed nodes", self._jobs(self._node_delete_query, diff.removed_nodes)),
+                    ("added and changed nodes", self._jobs(self._node_replace_query, diff.added_nodes + diff.changed_nodes)),
+                    ("added edges", self._edge_jobs(self._edge_merge_query, diff.added_edges)),
+                )
+                # Steps run in order; the batches of one step run in parallel
+                for label, jobs in steps:
+                    applied = self._run_batches(jobs)
+                    if applied:
+                        log.info(f"Applied {applied} {label}")
+            finally:
+                self._graph_db.close()
+        except (FileNotFoundError, json.JSONDecodeError):
+            log.exception("Failed to load knowledge graph diff")
+            raise
+        except Neo4jError:
+            raise
+        except Exception as exc:
+            log.exception("Unexpected error while applying graph diff")
+            raise Neo4jError(f"Diff import failed: {exc}") from exc
+
     def _load_json(self, path: str) -> dict:
         """Load JSON file.
         
@@ -109,80 +211,303 @@ class Neo4jImporter:
         except Exception as exc:
             log.warning(f"Constraint creation failed (may already exist): {exc}")
     
-    def _import_nodes(self, nodes: List[Dict[str, Any]]) -> None:
-        """Import nodes in batches.
+    def _import_nodes(self, nodes: Iterable[Dict[str, Any]]) -> None:
+        """Import nodes in parallel batches.
         
         Args:
-            nodes: List of node dictionaries.
+            nodes: Node dictionaries.
         """
         log.info("Inserting nodes in batches...")
-        node_count = 0
-        for i, chunk in enumerate(self._batch_chunks(nodes)):
-            try:
-                self._graph_db.execute_query(self._node_insert_query, batch=chunk)
-                node_count += len(chunk)
-                log.debug(f"Inserted node batch {i+1} ({len(chunk)} nodes)")
-            except Exception as exc:
-                log.exception(f"Failed to insert node batch {i+1}")
-                raise Neo4jError(f"Node insertion failed: {exc}") from exc
-        log.info(f"Inserted {node_count} nodes")
+        t0 = time.perf_counter()
+        try:
+            node_count = self._run_batches(self._jobs(self._node_insert_query, nodes))
+        except Exception as exc:
+            log.exception("Failed to insert nodes")
+            raise Neo4jError(f"Node insertion failed: {exc}") from exc
+        log.info(f"Inserted {node_count} nodes in {time.perf_counter() - t0:.1f}s")
     
-    def _import_edges(self, edges: List[Dict[str, Any]]) -> None:
-        """Import edges in batches.
+    def _import_edges(self, edges: Iterable[Dict[str, Any]]) -> None:
+        """Import edges grouped by type, in parallel batches of typed MERGEs.
+
+        Edges are read one batch at a time, so duplicates spread over several
+        batches each add their share to the relationship ``count``. Counts
+        therefore accumulate: import into a database that does not hold the
+        graph's relationships yet, and use ``apply_diff`` for updates.
         
         Args:
-            edges: List of edge dictionaries.
+            edges: Edge dictionaries; duplicates become one relationship
+                whose ``count`` is their number.
         """
         log.info("Inserting edges in batches...")
-        edge_count = 0
-        for i, chunk in enumerate(self._batch_chunks(edges)):
-            try:
-                self._graph_db.execute_query(self._edge_insert_query, batch=chunk)
-                edge_count += len(chunk)
-                log.debug(f"Inserted edge batch {i+1} ({len(chunk)} edges)")
-            except Exception as exc:
-                log.exception(f"Failed to insert edge batch {i+1}")
-                raise Neo4jError(f"Edge insertion failed: {exc}") from exc
-        log.info(f"Inserted {edge_count} edges")
+        t0 = time.perf_counter()
+        types: Counter = Counter()
+        try:
+            edge_count = self._run_batches(self._edge_jobs(self._edge_merge_query, edges, types))
+        except Exception as exc:
+            log.exception("Failed to insert edges")
+            raise Neo4jError(f"Edge insertion failed: {exc}") from exc
+        summary = ", ".join(f"{edge_type}={rows}" for edge_type, rows in sorted(types.items()))
+        log.info(f"Merged {edge_count} relationship rows ({summary}) in {time.perf_counter() - t0:.1f}s")
+
+    @staticmethod
+    def _edge_merge_query(edge_type: str) -> str:
+        """Return the batch MERGE query for relationships of ``edge_type``."""
+        return f"""
+        UNWIND $batch AS row
+        MATCH (src:Node {{id: row.src}})
+        MATCH (dst:Node {{id: row.dst}})
+        MERGE (src)-[rel:{edge_type}]->(dst)
+        SET rel.count = coalesce(rel.count, 0) + row.count;
+        """
+
+    @staticmethod
+    def _edge_delete_query(edge_type: str) -> str:
+        """Return the batch delete query for relationships of ``edge_type``."""
+        return f"""
+        UNWIND $batch AS row
+        MATCH (:Node {{id: row.src}})-[rel:{edge_type}]->(:Node {{id: row.dst}})
+        DELETE rel;
+        """
+
+    def _jobs(self, query: str, rows: Iterable[Any]) -> Iterator[Tuple[str, List[Any]]]:
+        return ((query, chunk) for chunk in self._batch_chunks(rows))
+
+    def _edge_jobs(
+        self, make_query: Any, edges: Iterable[Dict[str, Any]], types: Optional[Counter] = None
+    ) -> Iterator[Tuple[str, List[Any]]]:
+        """Yield one typed job per edge type of each batch of *edges*.
+
+        Only one batch of edges is grouped at a time; *types* counts the
+        rows yielded per edge type.
+        """
+        for chunk in self._batch_chunks(edges):
+            for edge_type, rows in group_edges(chunk).items():
+                if types is not None:
+                    types[edge_type] += len(rows)
+                yield make_query(edge_type), rows
+
+    def _execute(self, query: str, batch: List[Any]) -> int:
+        """Run one batch; the driver's managed transaction retries transient errors."""
+        self._graph_db.execute_query(query, batch=batch)
+        return len(batch)
+
+    def _run_batches(self, jobs: Iterable[Tuple[str, List[Any]]]) -> int:
+        """Run ``(query, batch)`` jobs on up to ``workers`` sessions at once.
+
+        Returns:
+            Number of rows written.
+        """
+        if self._workers == 1:
+            return sum(self._execute(query, batch) for query, batch in jobs)
+
+        written = 0
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="neo4j-import") as pool:
+            pending: Set[Future] = set()
+            for query, batch in jobs:
+                # Bound the batches in flight so streamed input stays streamed
+                if len(pending) >= 2 * self._workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    written += sum(future.result() for future in done)
+                pending.add(pool.submit(self._execute, query, batch))
+            written += sum(future.result() for future in wait(pending)[0])
+        return written
     
-    def _batch_chunks(self, data: List[Dict], size: int = 500):
+    def _batch_chunks(self, data: Iterable[Dict], size: Optional[int] = None):
         """Yield successive *size*-length chunks from *data*.
 
         Args:
-            data: List of dictionaries representing nodes or edges.
-            size: Maximum number of items per chunk. Defaults to 500.
+            data: Dictionaries representing nodes or edges; any iterable, so
+                streamed graphs are never held in memory whole.
+            size: Maximum number of items per chunk. Defaults to
+                ``NEO4J_IMPORT_BATCH_SIZE``.
 
         Yields:
-            List[Dict]: A slice of the input list of length ``<= size``.
+            List[Dict]: The next ``<= size`` items of the input.
         """
-        for i in range(0, len(data), size):
-            yield data[i:i + size]
+        items = iter(data)
+        while chunk := list(islice(items, size or self._batch_size)):
+            yield chunk
+
+
+def _csv_column(values: List[Any]) -> str:
+    """Return the ``neo4j-admin`` type suffix fitting every value of a property."""
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, bool) for v in present):
+        return ":boolean"
+    if present and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return ":long"
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return ":double"
+    return ""
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def _sorted_edges(edges: Iterable[Dict[str, Any]], spill_dir: str) -> Iterator[Tuple[str, str, str]]:
+    """Yield ``(type, src, dst)`` of every edge in sorted order, duplicates included.
+
+    Runs of ``EXPORT_RUN_SIZE`` edges are sorted in memory and spilled to
+    CSV files in *spill_dir*, which are then merged lazily.
+
+    Raises:
+        Neo4jError: If an edge type is not a valid relationship type name.
+    """
+    runs: List[str] = []
+    items = iter(edges)
+    while chunk := list(islice(items, EXPORT_RUN_SIZE)):
+        keys = sorted((edge["type"], edge["src"], edge["dst"]) for edge in chunk)
+        for edge_type in {key[0] for key in keys}:
+            if not _REL_TYPE.match(edge_type):
+                raise Neo4jError(f"Invalid relationship type: {edge_type!r}")
+        run = os.path.join(spill_dir, f"run{len(runs)}.csv")
+        with open(run, "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows(keys)
+        runs.append(run)
+
+    files = [open(run, encoding="utf-8", newline="") for run in runs]
+    try:
+        yield from heapq.merge(*(map(tuple, csv.reader(f)) for f in files))
+    finally:
+        for f in files:
+            f.close()
+
+
+def export_admin_import(kg_path: str, output_dir: str, database: str = "neo4j") -> List[str]:
+    """Write CSV files for ``neo4j-admin database import`` from a graph file.
+
+    Nodes go to ``nodes.csv`` (label ``Node``), with their centrality
+    ``scores`` as typed columns, as the online import sets them; relationships to one
+    ``rels_<TYPE>.csv`` per type with duplicates collapsed into ``count``.
+    Edges are grouped with an external merge sort over spill files of
+    ``EXPORT_RUN_SIZE`` edges, so only node ids are held in memory.
+    Relationships to ids that are not nodes (unresolved calls) are dropped,
+    as the online import drops them. Property columns are typed when all
+    values of a property are booleans or numbers; lists and dicts are
+    stored as JSON strings.
+
+    Args:
+        kg_path: Knowledge graph file (JSON or NDJSON).
+        output_dir: Directory receiving the CSV files.
+        database: Database name used in the returned command.
+
+    Returns:
+        The ``neo4j-admin`` command line importing the files into an empty
+        database.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    # First pass: property columns and their types
+    values: Dict[str, List[Any]] = {}
+    node_ids: Set[str] = set()
+    for node in iter_nodes(kg_path):
+        node_ids.add(node["id"])
+        for key, value in node.get("props", {}).items():
+            if key not in ("id", "type") and key not in dict(SCORE_COLUMNS):
+                values.setdefault(key, []).append(value)
+    keys = sorted(values)
+    header = (
+        ["id:ID", "type"]
+        + [f"{key}{_csv_column(values[key])}" for key in keys]
+        + [f"{name}{suffix}" for name, suffix in SCORE_COLUMNS]
+        + [":LABEL"]
+    )
+    del values
+
+    nodes_file = os.path.join(output_dir, "nodes.csv")
+    with open(nodes_file, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for node in iter_nodes(kg_path):
+            props, scores = node.get("props", {}), node.get("scores") or {}
+            writer.writerow(
+                [node["id"], node.get("type") or ""]
+                + [_csv_value(props.get(key)) for key in keys]
+                + [_csv_value(scores.get(name)) for name, _ in SCORE_COLUMNS]
+                + ["Node"]
+            )
+
+    command = ["neo4j-admin", "database", "import", "full", f"--nodes={nodes_file}"]
+    dropped = 0
+    with tempfile.TemporaryDirectory(dir=output_dir) as spill_dir:
+        edges = _sorted_edges(iter_edges(kg_path), spill_dir)
+        for edge_type, keys in groupby(edges, key=lambda key: key[0]):
+            rels_file = os.path.join(output_dir, f"rels_{edge_type}.csv")
+            with open(rels_file, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow([":START_ID", ":END_ID", "count:long", ":TYPE"])
+                for (_, src, dst), duplicates in groupby(keys):
+                    if src in node_ids and dst in node_ids:
+                        writer.writerow([src, dst, sum(1 for _ in duplicates), edge_type])
+                    else:
+                        dropped += 1
+            command.append(f"--relationships={rels_file}")
+    command.append(database)
+
+    log.info(f"Wrote {len(node_ids)} nodes to {output_dir} (dropped {dropped} relationships to unknown nodes)")
+    return command
 
 
 # Legacy function for backward compatibility
-def importkg() -> None:
+def importkg(diff_path: Optional[str] = None, kg_path: Optional[str] = None, workers: Optional[int] = None) -> None:
     """Legacy function for backward compatibility.
     
     DEPRECATED: Use Neo4jImporter with dependency injection instead.
+
+    Args:
+        diff_path: Apply only this graph diff instead of importing the
+            whole graph.
+        kg_path: Graph file to import (JSON or NDJSON); defaults to
+            ``graph_indexing/knowledge_graph.json``.
+        workers: Parallel sessions; defaults to ``NEO4J_IMPORT_WORKERS``.
     """
+    from dataclasses import replace
+
     from core.services import Neo4jGraphDatabase
     from config.myapikeys import NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD
     
-    config = Neo4jConfig(
+    config = replace(
+        Neo4jConfig.from_env(),
         uri=NEO4J_URI,
         username=NEO4J_USERNAME,
         password=NEO4J_PASSWORD,
         use_neo4j=True
     )
+    if workers:
+        config = replace(config, import_workers=workers)
     
     graph_db = Neo4jGraphDatabase(config)
-    importer = Neo4jImporter(graph_db)
-    importer.import_knowledge_graph()
+    importer = Neo4jImporter(graph_db, config)
+    if diff_path:
+        importer.apply_diff(diff_path)
+    elif kg_path:
+        importer.import_knowledge_graph(kg_path)
+    else:
+        importer.import_knowledge_graph()
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import the knowledge graph into Neo4j")
+    parser.add_argument("--diff", help="Apply only this knowledge_graph.diff.json")
+    parser.add_argument("--kg", help="Graph file to import (.json or .ndjson[.gz])")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel sessions (default: NEO4J_IMPORT_WORKERS)")
+    parser.add_argument("--csv", metavar="DIR",
+                        help="Write neo4j-admin import CSVs to DIR instead of loading a running database")
+    args = parser.parse_args()
     try:
-        importkg()
+        if args.csv:
+            print(" ".join(export_admin_import(args.kg or "graph_indexing/knowledge_graph.json", args.csv)))
+        else:
+            importkg(args.diff, args.kg, args.workers)
     except Neo4jError:
         log.error("Graph import failed due to Neo4j error")
         raise SystemExit(1)
@@ -12,6 +12,7 @@ import time
 
 import chromadb
 from core.code_exceptions import ChromaError
+from core.collection_alias import resolve_collection
 from config.logger import log
 from core.embeddings import embed_text
 
@@ -26,7 +27,7 @@ def get_node_collection() -> chromadb.Collection:
         log.debug("Connecting to ChromaDB for node retrieval")
         client = chromadb.PersistentClient(path=os.getenv("CHROMA_PATH", "vectorstore/chroma_db"))
         collection = client.get_or_create_collection(
-            name="node_embeddings",
+            name=resolve_collection("node_embeddings"),
             metadata={"hnsw:space": "cosine"},
         )
         log.debug("Node collection ready")
@@ -7,13 +7,169 @@ semantic similarity of questions, using ChromaDB and embeddings.
 
 import os
 import json
-from typing import Optional, Dict, Any, List, Sequence, cast
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Sequence, Set, Tuple, cast
 import re
 
 import chromadb
 from core.code_exceptions import ChromaError
 from config.logger import log
-from core.embeddings import embed_text
+from core.embeddings import embed_text, embed_texts
+from core.singleflight import normalize_question
+from core.write_behind import get_write_behind
+
+
+_REFERENCE_PATTERN = re.compile(r"\[(node|chunk):([^\]]+)\]")
+
+
+def reference_keys(references: Iterable[str]) -> Set[str]:
+    """Normalize citations into reverse-index keys.
+
+    Args:
+        references: Citations as produced by ``format_response``, e.g.
+            ``[chunk:routing.py::3]`` or ``[node:applications.FastAPI]``.
+
+    Returns:
+        Set of keys of the form ``chunk:<id>`` / ``node:<id>``.
+    """
+    keys: Set[str] = set()
+    for ref in references:
+        if not isinstance(ref, str):
+            continue
+        for kind, ref_id in _REFERENCE_PATTERN.findall(ref):
+            keys.add(f"{kind}:{ref_id.strip()}")
+    return keys
+
+
+def _metadata_references(meta: Any) -> List[str]:
+    """Extract the stored reference list from a cache entry's metadata."""
+    if not hasattr(meta, "get"):
+        return []
+    # SemanticCache writes ``references_json``; SemanticCacheProvider writes ``references``.
+    raw = meta.get("references_json") or meta.get("references")
+    if not isinstance(raw, str):
+        return []
+    try:
+        refs = json.loads(raw)
+    except Exception:
+        return []
+    return refs if isinstance(refs, list) else []
+
+
+class CacheStats:
+    """Thread-safe counters describing how the semantic cache performs.
+
+    Misses record the best similarity seen so the threshold can be tuned
+    from real traffic; generation latency of misses is averaged to estimate
+    how much LLM time the hits saved.
+
+    Recording can be paused for the current thread (see :meth:`paused`) so
+    that cache warm-up does not count as traffic.
+    """
+
+    def __init__(self, bucket_width: float = 0.05) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._bucket_width = bucket_width
+        self.exact_hits = 0
+        self.exact_misses = 0
+        self.vector_hits = 0
+        self.vector_misses = 0
+        self.empty_misses = 0
+        self.lexical_rejections = 0
+        self.evictions = 0
+        self.clears = 0
+        self.miss_similarity: Dict[str, int] = {}
+        self._generation_ms_total = 0.0
+        self._generation_samples = 0
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Skip recording for lookups and generations made by this thread."""
+        previous = getattr(self._local, "paused", False)
+        self._local.paused = True
+        try:
+            yield
+        finally:
+            self._local.paused = previous
+
+    def _recording(self) -> bool:
+        return not getattr(self._local, "paused", False)
+
+    def _bucket(self, similarity: float) -> str:
+        width = self._bucket_width
+        low = min(max(similarity, 0.0), 1.0 - 1e-9) // width * width
+        return f"{low:.2f}-{low + width:.2f}"
+
+    def record_exact(self, hit: bool) -> None:
+        if not self._recording():
+            return
+        with self._lock:
+            if hit:
+                self.exact_hits += 1
+            else:
+                self.exact_misses += 1
+
+    def record_vector_hit(self) -> None:
+        if not self._recording():
+            return
+        with self._lock:
+            self.vector_hits += 1
+
+    def record_vector_miss(self, similarity: Optional[float], lexical_rejection: bool = False) -> None:
+        if not self._recording():
+            return
+        with self._lock:
+            self.vector_misses += 1
+            if similarity is None:
+                self.empty_misses += 1
+                return
+            if lexical_rejection:
+                self.lexical_rejections += 1
+            bucket = self._bucket(similarity)
+            self.miss_similarity[bucket] = self.miss_similarity.get(bucket, 0) + 1
+
+    def record_generation(self, latency_ms: float) -> None:
+        """Record the retrieval + generation latency of an uncached answer."""
+        if not self._recording():
+            return
+        with self._lock:
+            self._generation_ms_total += latency_ms
+            self._generation_samples += 1
+
+    def record_evictions(self, count: int) -> None:
+        with self._lock:
+            self.evictions += count
+
+    def record_clear(self, count: int) -> None:
+        with self._lock:
+            self.clears += 1
+            self.evictions += count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a consistent copy of all counters and derived figures."""
+        with self._lock:
+            hits = self.exact_hits + self.vector_hits
+            lookups = hits + self.vector_misses
+            avg_generation_ms = (
+                self._generation_ms_total / self._generation_samples if self._generation_samples else 0.0
+            )
+            return {
+                "exact_hits": self.exact_hits,
+                "exact_misses": self.exact_misses,
+                "vector_hits": self.vector_hits,
+                "vector_misses": self.vector_misses,
+                "empty_misses": self.empty_misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "lexical_rejections": self.lexical_rejections,
+                "miss_similarity_histogram": dict(sorted(self.miss_similarity.items())),
+                "avg_generation_ms": avg_generation_ms,
+                "llm_ms_saved_estimate": hits * avg_generation_ms,
+                "evictions": self.evictions,
+                "clears": self.clears,
+            }
 
 
 def get_cache_collection() -> chromadb.Collection:
@@ -39,6 +195,10 @@ def get_cache_collection() -> chromadb.Collection:
         raise ChromaError(f"Cache collection error: {exc}") from exc
 
 
+# Instances in this process, so invalidation reaches their in-memory tiers
+_live_caches: "weakref.WeakSet[SemanticCache]" = weakref.WeakSet()
+
+
 class SemanticCache:
     """Semantic cache for storing and retrieving RAG answers.
     
@@ -48,22 +208,43 @@ class SemanticCache:
     Attributes:
         collection: ChromaDB collection for storing cached entries.
         threshold: Minimum similarity score (0-1) for cache hits.
+        min_overlap: Minimum lexical overlap (0-1) for vector hits.
+        stats: Hit/miss counters exposed via ``/api/cache/stats``.
+
+    A reverse index from cited ``chunk:``/``node:`` ids to cache entry ids
+    is built lazily from the collection so that re-indexing can evict only
+    the answers whose sources changed (see :meth:`invalidate`).
+
+    An in-memory exact tier, keyed by the normalized question, answers
+    repeated questions without embedding them. It is filled by
+    :meth:`preload` at startup and kept current by stores and evictions.
     """
 
-    def __init__(self, threshold: float = 0.9) -> None:
+    def __init__(self, threshold: float = 0.9, min_overlap: float = 0.3) -> None:
         """Initialize the semantic cache.
         
         Args:
             threshold: Minimum similarity score for considering a cache hit.
                       Defaults to 0.9 (90% similarity).
+            min_overlap: Minimum lexical (Jaccard) overlap between the
+                      question and the cached question for a vector hit.
         
         Raises:
             ChromaError: If cache collection cannot be initialized.
         """
         if not 0.0 <= threshold <= 1.0:
             raise ValueError("Threshold must be between 0.0 and 1.0")
+        if not 0.0 <= min_overlap <= 1.0:
+            raise ValueError("min_overlap must be between 0.0 and 1.0")
         
         self.threshold = threshold
+        self.min_overlap = min_overlap
+        self.stats = CacheStats()
+        _live_caches.add(self)
+        self._ref_index: Optional[Dict[str, Set[str]]] = None
+        self._entry_refs: Dict[str, Set[str]] = {}
+        self._exact: Dict[str, Dict[str, Any]] = {}
+        self._exact_keys: Dict[str, str] = {}
         try:
             self.collection = get_cache_collection()
             log.info(f"SemanticCache initialized (threshold={threshold})")
@@ -73,18 +254,122 @@ class SemanticCache:
             log.exception("Failed to initialize SemanticCache")
             raise ChromaError(f"Cache initialization failed: {exc}") from exc
 
-    def _tokens(self, text: str) -> set:
+    @staticmethod
+    def _tokens(text: str) -> set:
         s = re.sub(r"[^a-z0-9 ]+", " ", text.lower())
         words = [w for w in s.split() if w and w not in {
             "the","a","an","and","or","of","to","in","on","for","with","by","how","does","is","are","be","from","this","that","it","as","about"
         }]
         return set(words)
 
+    @staticmethod
+    def lexical_overlap(question: str, cached_question: str) -> float:
+        """Jaccard overlap of the content words of two questions (0-1)."""
+        question_tokens = SemanticCache._tokens(question)
+        cached_tokens = SemanticCache._tokens(cached_question)
+        if not question_tokens or not cached_tokens:
+            return 0.0
+        return len(question_tokens & cached_tokens) / len(question_tokens | cached_tokens)
+
+    def _ensure_ref_index(self) -> Dict[str, Set[str]]:
+        """Build the reference -> entry-id index from the collection once."""
+        if self._ref_index is not None:
+            return self._ref_index
+
+        index: Dict[str, Set[str]] = {}
+        entry_refs: Dict[str, Set[str]] = {}
+        data = self.collection.get(include=["metadatas"])
+        ids = cast(List[str], data.get("ids") or [])
+        metas = cast(List[Any], data.get("metadatas") or [])
+        for entry_id, meta in zip(ids, metas):
+            keys = reference_keys(_metadata_references(meta))
+            entry_refs[entry_id] = keys
+            for key in keys:
+                index.setdefault(key, set()).add(entry_id)
+
+        self._ref_index = index
+        self._entry_refs = entry_refs
+        log.debug(f"Built cache reference index ({len(entry_refs)} entries, {len(index)} references)")
+        return index
+
+    def _index_entry(self, entry_id: str, references: Iterable[str]) -> None:
+        """Record (or replace) the references of one entry in the reverse index."""
+        if self._ref_index is None:
+            return
+        self._unindex_entry(entry_id)
+        keys = reference_keys(references)
+        self._entry_refs[entry_id] = keys
+        for key in keys:
+            self._ref_index.setdefault(key, set()).add(entry_id)
+
+    def _unindex_entry(self, entry_id: str) -> None:
+        if self._ref_index is None:
+            return
+        for key in self._entry_refs.pop(entry_id, set()):
+            holders = self._ref_index.get(key)
+            if holders is None:
+                continue
+            holders.discard(entry_id)
+            if not holders:
+                del self._ref_index[key]
+
+    def _remember_exact(self, entry_id: str, question: str, answer: Any, references: List[str]) -> None:
+        key = normalize_question(question)
+        if not key or not answer:
+            return
+        self._forget_exact(entry_id)
+        self._exact[key] = {"id": entry_id, "question": question, "answer": answer, "references": references}
+        self._exact_keys[entry_id] = key
+
+    def _forget_exact(self, entry_id: str) -> None:
+        key = self._exact_keys.pop(entry_id, None)
+        # Another entry may have since claimed the same normalized question
+        if key is not None and self._exact.get(key, {}).get("id") == entry_id:
+            del self._exact[key]
+
+    def preload(self) -> int:
+        """Load every cached entry into memory.
+
+        Fills the exact-match tier and the reference index in one pass over
+        the collection, so the first requests after a deploy don't pay for
+        embedding a question that is already cached.
+
+        Returns:
+            Number of entries loaded.
+
+        Raises:
+            ChromaError: If reading the collection fails.
+        """
+        try:
+            data = self.collection.get(include=["documents", "metadatas"])
+            ids = cast(List[str], data.get("ids") or [])
+            docs = cast(List[str], data.get("documents") or [])
+            metas = cast(List[Any], data.get("metadatas") or [])
+
+            index: Dict[str, Set[str]] = {}
+            self._entry_refs = {}
+            for entry_id, doc, meta in zip(ids, docs, metas):
+                references = _metadata_references(meta)
+                answer = meta.get("answer") if hasattr(meta, "get") else None
+                self._remember_exact(entry_id, doc or entry_id, answer, references)
+                keys = reference_keys(references)
+                self._entry_refs[entry_id] = keys
+                for key in keys:
+                    index.setdefault(key, set()).add(entry_id)
+            self._ref_index = index
+
+            log.info(f"Preloaded {len(self._exact)} semantic cache entries into memory")
+            return len(ids)
+        except Exception as exc:
+            log.exception("Cache preload failed")
+            raise ChromaError(f"Cache preload error: {exc}") from exc
+
     def lookup(self, question: str) -> Optional[Dict[str, Any]]:
         """Look up a cached answer for a similar question.
         
-        Embeds the question and searches for semantically similar cached
-        questions. Returns the cached answer if similarity exceeds threshold.
+        Checks the in-memory exact tier first, then embeds the question and
+        searches for semantically similar cached questions. Returns the
+        cached answer if similarity exceeds threshold.
         
         Args:
             question: The question to look up.
@@ -99,62 +384,87 @@ class SemanticCache:
         if not question:
             log.debug("Skipping cache lookup for empty question")
             return None
+
+        exact = self._exact.get(normalize_question(question))
+        if exact is not None:
+            self.stats.record_exact(hit=True)
+            log.info("[CACHE HIT] exact match")
+            return {
+                "question": exact["question"],
+                "answer": exact["answer"],
+                "references": exact["references"],
+                "similarity": 1.0,
+            }
+        self.stats.record_exact(hit=False)
         
         try:
             log.debug(f"Cache lookup for question: {question[:50]}...")
-            embedding_vector = embed_text(question)
-            from typing import Sequence, cast
-            results = self.collection.query(
-                query_embeddings=[cast(Sequence[float], embedding_vector)],
-                n_results=1,
-            )
-
-            from typing import List, Mapping
-            ids: List[List[str]] = cast(List[List[str]], results.get("ids", [[]]) if hasattr(results, "get") else [[]])
-            dists: List[List[float]] = cast(List[List[float]], results.get("distances", [[]]) if hasattr(results, "get") else [[]])
-            docs: List[List[str]] = cast(List[List[str]], results.get("documents", [[]]) if hasattr(results, "get") else [[]])
-            metas: List[List[Mapping[str, Any]]] = cast(List[List[Mapping[str, Any]]], results.get("metadatas", [[]]) if hasattr(results, "get") else [[]])
-
-            if not ids or not ids[0] or not dists or not dists[0]:
+            match = self.best_match(question)
+            if match is None:
                 log.debug("No results found in cache")
+                self.stats.record_vector_miss(None)
                 return None
 
-            distance = dists[0][0]
-            similarity = 1 - distance
-            doc = docs[0][0]
-            meta: Mapping[str, Any] = metas[0][0]
-            answer = meta.get("answer") if hasattr(meta, "get") else None
-            refs_json = meta.get("references_json") if hasattr(meta, "get") else None
-            cached_references: List[str] = []
-            if isinstance(refs_json, str):
-                try:
-                    cached_references = json.loads(refs_json)
-                except Exception:
-                    cached_references = []
-
-            question_tokens = self._tokens(question)
-            doc_tokens = self._tokens(doc)
-            overlap = 0.0
-            if question_tokens and doc_tokens:
-                intersection = len(question_tokens & doc_tokens)
-                union = len(question_tokens | doc_tokens)
-                overlap = intersection / union
-
-            if similarity >= self.threshold and overlap >= 0.3:
+            similarity = match["similarity"]
+            overlap = match["overlap"]
+            if similarity >= self.threshold and overlap >= self.min_overlap:
+                self.stats.record_vector_hit()
                 log.info(f"[CACHE HIT] similarity={similarity:.3f}")
                 return {
-                    "question": doc,
-                    "answer": answer,
-                    "references": cached_references,
+                    "question": match["question"],
+                    "answer": match["answer"],
+                    "references": match["references"],
                     "similarity": similarity,
                 }
 
+            self.stats.record_vector_miss(similarity, lexical_rejection=similarity >= self.threshold)
             log.info(f"[CACHE MISS] best similarity={similarity:.3f}, lexical_overlap={overlap:.3f}")
             return None
         except Exception as exc:
             log.exception("Cache lookup failed")
             raise ChromaError(f"Cache lookup error: {exc}") from exc
 
+    def best_match(self, question: str) -> Optional[Dict[str, Any]]:
+        """Find the nearest cached question, without applying any thresholds.
+
+        Args:
+            question: The question to score.
+
+        Returns:
+            Dictionary with 'question', 'answer', 'references', 'similarity'
+            and 'overlap' (lexical Jaccard overlap) for the nearest entry, or
+            None if the cache is empty.
+        """
+        embedding_vector = embed_text(question)
+        results = self.collection.query(
+            query_embeddings=[cast(Sequence[float], embedding_vector)],
+            n_results=1,
+        )
+
+        from typing import Mapping
+        ids: List[List[str]] = cast(List[List[str]], results.get("ids", [[]]) if hasattr(results, "get") else [[]])
+        dists: List[List[float]] = cast(List[List[float]], results.get("distances", [[]]) if hasattr(results, "get") else [[]])
+        docs: List[List[str]] = cast(List[List[str]], results.get("documents", [[]]) if hasattr(results, "get") else [[]])
+        metas: List[List[Mapping[str, Any]]] = cast(List[List[Mapping[str, Any]]], results.get("metadatas", [[]]) if hasattr(results, "get") else [[]])
+
+        if not ids or not ids[0] or not dists or not dists[0]:
+            return None
+
+        similarity = 1 - dists[0][0]
+        doc = docs[0][0]
+        meta: Mapping[str, Any] = metas[0][0]
+        answer = meta.get("answer") if hasattr(meta, "get") else None
+
+        overlap = self.lexical_overlap(question, doc)
+
+        return {
+            "question": doc,
+            "answer": answer,
+            "references": _metadata_references(meta),
+            "similarity": similarity,
+            "overlap": overlap,
+        }
+
     def store(self, question: str, answer: str, references: List[str]) -> None:
         """Store a question-answer pair in the cache.
         
@@ -164,6 +474,8 @@ class SemanticCache:
         Args:
             question: The question to cache.
             answer: The answer to cache.
+            references: Citations the answer was built from; used for
+                dependency-tracked invalidation.
         
         Raises:
             ChromaError: If storage operation fails.
@@ -183,11 +495,120 @@ class SemanticCache:
                 documents=[question],
                 metadatas=[metadata],
             )
+            self._index_entry(question, references)
+            self._remember_exact(question, question, answer, references)
             log.info("[CACHE STORE] saved.")
         except Exception as exc:
             log.exception("Cache store failed")
             raise ChromaError(f"Cache store error: {exc}") from exc
 
+    def store_many(self, entries: Sequence[Tuple[str, str, List[str]]]) -> None:
+        """Store several question-answer pairs with a single upsert.
+
+        Used by the write-behind queue to batch cache writes. Later entries
+        for the same question win.
+
+        Args:
+            entries: Sequence of (question, answer, references) tuples.
+
+        Raises:
+            ChromaError: If storage operation fails.
+        """
+        latest: Dict[str, Tuple[str, List[str]]] = {}
+        for question, answer, references in entries:
+            if not question or not answer:
+                continue
+            latest[question] = (answer, references)
+        if not latest:
+            return
+
+        try:
+            questions = list(latest)
+            embeddings: List[Sequence[float]] = [cast(Sequence[float], vec) for vec in embed_texts(questions)]
+            metadatas: List[Dict[str, Any]] = [
+                {"answer": latest[q][0], "references_json": json.dumps(latest[q][1])} for q in questions
+            ]
+            self.collection.upsert(
+                ids=questions,
+                embeddings=embeddings,
+                documents=questions,
+                metadatas=metadatas,
+            )
+            for q in questions:
+                self._index_entry(q, latest[q][1])
+                self._remember_exact(q, q, latest[q][0], latest[q][1])
+            log.info(f"[CACHE STORE] saved {len(questions)} entries.")
+        except Exception as exc:
+            log.exception("Batched cache store failed")
+            raise ChromaError(f"Cache store error: {exc}") from exc
+
+    def invalidate(self, chunk_ids: Iterable[str] = (), node_ids: Iterable[str] = ()) -> int:
+        """Evict cached answers that cite any of the given chunks or nodes.
+
+        Args:
+            chunk_ids: Ids of code chunks that were added, changed or deleted.
+            node_ids: Ids of knowledge-graph nodes that were re-embedded.
+
+        Returns:
+            Number of cache entries evicted.
+
+        Raises:
+            ChromaError: If reading or deleting cache entries fails.
+        """
+        keys = {f"chunk:{c}" for c in chunk_ids} | {f"node:{n}" for n in node_ids}
+        if not keys:
+            return 0
+
+        try:
+            index = self._ensure_ref_index()
+            stale: Set[str] = set()
+            for key in keys:
+                stale |= index.get(key, set())
+            if not stale:
+                log.debug(f"No cached answers cite the {len(keys)} changed references")
+                return 0
+
+            self.collection.delete(ids=sorted(stale))
+            self.stats.record_evictions(len(stale))
+            for entry_id in stale:
+                self._unindex_entry(entry_id)
+                self._forget_exact(entry_id)
+            log.info(f"[CACHE INVALIDATE] evicted {len(stale)} entries citing {len(keys)} changed references")
+            return len(stale)
+        except Exception as exc:
+            log.exception("Cache invalidation failed")
+            raise ChromaError(f"Cache invalidation error: {exc}") from exc
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Report cache counters together with the current size of the cache.
+
+        Returns:
+            Counter snapshot plus 'entries', 'payload_bytes' (stored question,
+            answer and reference text), 'threshold' and 'min_overlap'.
+
+        Raises:
+            ChromaError: If reading the collection fails.
+        """
+        try:
+            data = self.collection.get(include=["documents", "metadatas"])
+            docs = cast(List[str], data.get("documents") or [])
+            metas = cast(List[Any], data.get("metadatas") or [])
+            payload = sum(len((d or "").encode("utf-8")) for d in docs)
+            for meta in metas:
+                if hasattr(meta, "values"):
+                    payload += sum(len(str(v).encode("utf-8")) for v in meta.values())
+            stats = self.stats.snapshot()
+            stats.update({
+                "entries": len(cast(List[str], data.get("ids") or [])),
+                "payload_bytes": payload,
+                "threshold": self.threshold,
+                "min_overlap": self.min_overlap,
+            })
+            return stats
+        except Exception as exc:
+            log.exception("Cache stats failed")
+            raise ChromaError(f"Cache stats error: {exc}") from exc
+
     def clear(self) -> None:
         """Clear all entries from the semantic cache.
         
@@ -198,6 +619,10 @@ class SemanticCache:
             ChromaError: If the clear operation fails.
         """
         try:
+            try:
+                cleared = self.collection.count()
+            except Exception:
+                cleared = 0
             # Drop and recreate the collection to ensure full clear
             client = chromadb.PersistentClient(path=os.getenv("CHROMA_PATH", "vectorstore/chroma_db"))
             try:
@@ -209,12 +634,50 @@ class SemanticCache:
                 name="semantic_cache",
                 metadata={"hnsw:space": "cosine"},
             )
+            self._ref_index = {}
+            self._entry_refs = {}
+            self._exact = {}
+            self._exact_keys = {}
+            self.stats.record_clear(cleared)
             log.info("Semantic cache cleared")
         except Exception as exc:
             log.exception("Cache clear failed")
             raise ChromaError(f"Cache clear error: {exc}") from exc
 
 
+def invalidate_cached_references(chunk_ids: Iterable[str] = (), node_ids: Iterable[str] = ()) -> int:
+    """Evict cached answers that cite changed chunks or nodes.
+
+    Called by the indexers after they write to ``code_chunks`` or
+    ``node_embeddings``. Failures are logged rather than raised so that a
+    cache problem never fails an ingest.
+
+    Args:
+        chunk_ids: Ids of code chunks touched by the ingest.
+        node_ids: Ids of knowledge-graph nodes touched by the ingest.
+
+    Returns:
+        Number of cache entries evicted.
+    """
+    chunk_ids = list(chunk_ids)
+    node_ids = list(node_ids)
+    if not chunk_ids and not node_ids:
+        return 0
+    # Let queued cache writes land first so they can't resurrect stale answers
+    get_write_behind().flush(timeout=5.0)
+    try:
+        # Every live instance must drop the entries from its in-memory tiers;
+        # the first one also deletes them from the collection.
+        caches = list(_live_caches) or [SemanticCache()]
+        evicted = 0
+        for cache in caches:
+            evicted = max(evicted, cache.invalidate(chunk_ids=chunk_ids, node_ids=node_ids))
+        return evicted
+    except ChromaError:
+        log.warning("Skipping cache invalidation after ingest")
+        return 0
+
+
 if __name__ == "__main__":
     cache = SemanticCache(threshold=0.9)
     print("Semantic cache ready. Type 'exit' to quit.")
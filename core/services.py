@@ -6,8 +6,10 @@ depends on abstractions rather than concrete implementations.
 """
 
 import json
+import re
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from functools import lru_cache
 
 import chromadb
@@ -18,15 +20,111 @@ from core.interfaces import (
     GraphDatabase, LLMProvider, DocumentProcessor
 )
 from config.settings import (
-    EmbeddingConfig, ChromaConfig, Neo4jConfig, LLMConfig, CacheConfig
+    EmbeddingConfig, ChromaConfig, Neo4jConfig, LLMConfig, CacheConfig, GraphConfig
 )
+from core.code_exceptions import ChromaError, Neo4jError
+from core.collection_alias import resolve_collection
 from config.logger import log
 from observability.tracing import trace_span
+from graph_indexing.kgbuild.kgio import is_ndjson, iter_nodes
 
 # Import embeddings module to allow patching in tests
 import core.embeddings
 
 
+class ChromaVectorCollection(VectorCollection):
+    """VectorCollection over a ChromaDB collection."""
+
+    def __init__(self, collection: chromadb.Collection) -> None:
+        self._collection = collection
+
+    @property
+    def name(self) -> str:
+        """Name of the underlying Chroma collection."""
+        return self._collection.name
+
+    def add(self, ids: List[str], embeddings: List[List[float]],
+            documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Add items to collection."""
+        self._collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def query(self, query_embeddings: List[List[float]], n_results: int) -> Dict[str, Any]:
+        """Query the collection."""
+        return self._collection.query(query_embeddings=query_embeddings, n_results=n_results)
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]],
+               documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Update or insert items in collection."""
+        self._collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB implementation of VectorStore.
+
+    Logical collection names (``code_chunks``, ``node_embeddings``) are
+    resolved through the collection aliases, like the LCEL pipeline does.
+    """
+
+    def __init__(self, config: ChromaConfig) -> None:
+        self._config = config
+        self._client: Optional[chromadb.ClientAPI] = None
+        self._lock = threading.Lock()
+
+    def _get_client(self) -> chromadb.ClientAPI:
+        with self._lock:
+            if self._client is None:
+                try:
+                    log.info(f"Opening ChromaDB at {self._config.path}")
+                    self._client = chromadb.PersistentClient(path=self._config.path)
+                except Exception as exc:
+                    log.exception("Failed to open ChromaDB")
+                    raise ChromaError(f"ChromaDB initialization failed: {exc}") from exc
+            return self._client
+
+    def get_collection(self, name: str) -> ChromaVectorCollection:
+        """Get or create a collection."""
+        collection = self._get_client().get_or_create_collection(
+            name=resolve_collection(name), metadata={"hnsw:space": self._config.similarity_space}
+        )
+        return ChromaVectorCollection(collection)
+
+    def add_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """Upsert documents (``id``, ``embedding``, ``text``, ``metadata``) into the node collection."""
+        if not documents:
+            return []
+        ids = [doc["id"] for doc in documents]
+        self.get_collection(self._config.node_collection).upsert(
+            ids=ids,
+            embeddings=[doc["embedding"] for doc in documents],
+            documents=[doc.get("text", "") for doc in documents],
+            metadatas=[doc.get("metadata") or {"type": "unknown"} for doc in documents],
+        )
+        return ids
+
+    @trace_span("rag.vector.search")
+    def similarity_search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 8,
+        filter_dict: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Search the node collection for similar documents."""
+        collection = self.get_collection(self._config.node_collection)._collection
+        try:
+            results = collection.query(query_embeddings=[query_embedding], n_results=top_k, where=filter_dict)
+        except Exception as exc:
+            log.exception("Similarity search failed")
+            raise ChromaError(f"Similarity search failed: {exc}") from exc
+        if not results["ids"]:
+            return []
+        return [
+            {"id": doc_id, "text": text, "metadata": metadata or {}, "similarity": 1 - distance}
+            for doc_id, text, metadata, distance in zip(
+                results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+            )
+        ]
+
+
 class SemanticCacheProvider(CacheProvider):
     """ChromaDB-based implementation of CacheProvider."""
     
@@ -139,6 +237,177 @@ class GroqLLMProvider(LLMProvider):
         }
 
 
+_EDGE_TYPE = re.compile(r"^[A-Z_][A-Z0-9_]*$")
+
+# One pooled driver per Neo4j instance, shared by every Neo4jGraphDatabase
+# and closed when the last one disconnects
+_neo4j_drivers: Dict[Tuple[str, str], Any] = {}
+_neo4j_users: Dict[Tuple[str, str], int] = {}
+_neo4j_lock = threading.Lock()
+
+
+def _open_neo4j_driver(config: Neo4jConfig) -> Any:
+    from neo4j import GraphDatabase as Neo4jDriver
+
+    driver = Neo4jDriver.driver(
+        config.uri, auth=(config.username, config.password), max_connection_pool_size=config.max_pool_size
+    )
+    driver.verify_connectivity()
+    return driver
+
+
+@lru_cache(maxsize=64)
+def expansion_query(edge_types: Tuple[str, ...], depth: int) -> str:
+    """Return the neighbour expansion query for ``depth`` hops over ``edge_types``.
+
+    Seeds are looked up through the ``:Node(id)`` uniqueness constraint, and
+    the graph is expanded one hop at a time, keeping each hop's distinct new
+    nodes only. A variable-length path match would enumerate every path
+    around hub nodes before collapsing them.
+
+    The hops are written into the query text (one subquery per hop) with the
+    validated edge types; the seed ids and the result limit stay parameters.
+
+    Raises:
+        Neo4jError: If an edge type is not a valid relationship type name.
+    """
+    invalid = [t for t in edge_types if not _EDGE_TYPE.match(t)]
+    if invalid:
+        raise Neo4jError(f"Invalid edge types for Cypher: {invalid}")
+    rel = f"[:{'|'.join(edge_types)}]" if edge_types else "[]"
+    hops = "".join(
+        f"""
+    CALL {{
+        WITH seen, frontier
+        UNWIND frontier AS f
+        MATCH (f)-{rel}-(m:Node)
+        WHERE NOT m.id IN seen
+        RETURN collect(DISTINCT m) AS next
+    }}
+    WITH seen + [m IN next | m.id] AS seen, next AS frontier, found + [m IN next | [{hop}, m.id]] AS found"""
+        for hop in range(1, int(depth) + 1)
+    )
+    return f"""
+    UNWIND $ids AS id
+    MATCH (n:Node {{id: id}})
+    WITH collect(n) AS frontier, $ids AS seen, [] AS found{hops}
+    UNWIND found AS hit
+    RETURN hit[1] AS id
+    ORDER BY hit[0], id
+    LIMIT $limit
+    """
+
+
+class Neo4jGraphDatabase(GraphDatabase):
+    """Neo4j implementation of GraphDatabase.
+
+    Instances for the same server share one driver and its connection pool.
+    Queries run in managed transactions, which the driver retries on
+    transient errors.
+    """
+
+    def __init__(self, config: Neo4jConfig, graph: Optional[GraphConfig] = None) -> None:
+        """Initialize with configuration; nothing is opened until ``connect``.
+
+        Args:
+            config: Connection settings.
+            graph: Edge types and neighbour limit for ``expand_neighbors``;
+                defaults to ``GraphConfig.from_env()``.
+        """
+        self._config = config
+        self._graph = graph or GraphConfig.from_env()
+        self._key = (config.uri or "", config.username or "")
+        self._driver: Optional[Any] = None
+
+    def connect(self) -> None:
+        """Attach to the shared driver, opening it if needed.
+
+        Raises:
+            Neo4jError: If the settings are incomplete or the server is unreachable.
+        """
+        if self._driver is not None:
+            return
+        for name in ("uri", "username", "password"):
+            if not getattr(self._config, name):
+                raise Neo4jError(f"NEO4J_{name.upper()} is not set")
+        with _neo4j_lock:
+            driver = _neo4j_drivers.get(self._key)
+            if driver is None:
+                try:
+                    log.info(f"Connecting to Neo4j at {self._config.uri}")
+                    driver = _open_neo4j_driver(self._config)
+                except Exception as exc:
+                    log.exception("Failed to connect to Neo4j")
+                    raise Neo4jError(f"Neo4j connection failed: {exc}") from exc
+                _neo4j_drivers[self._key] = driver
+                log.info("Neo4j connection established")
+            _neo4j_users[self._key] = _neo4j_users.get(self._key, 0) + 1
+        self._driver = driver
+
+    def close(self) -> None:
+        """Detach from the shared driver, closing it when no instance uses it."""
+        if self._driver is None:
+            return
+        with _neo4j_lock:
+            users = _neo4j_users.get(self._key, 1) - 1
+            if users <= 0:
+                _neo4j_users.pop(self._key, None)
+                driver = _neo4j_drivers.pop(self._key, None)
+                if driver is not None:
+                    driver.close()
+                    log.info("Neo4j connection closed")
+            else:
+                _neo4j_users[self._key] = users
+        self._driver = None
+
+    def _session(self) -> Any:
+        if self._driver is None:
+            raise Neo4jError("Neo4j is not connected; call connect() first")
+        if self._config.database:
+            return self._driver.session(database=self._config.database)
+        return self._driver.session()
+
+    @trace_span("rag.graph.expand")
+    def expand_neighbors(self, node_ids: List[str], depth: int = 1) -> List[str]:
+        """Return the nodes within ``depth`` hops of ``node_ids``, nearest first.
+
+        All seeds are expanded by one query in one read transaction.
+
+        Raises:
+            Neo4jError: If the query fails.
+        """
+        if not node_ids or depth < 1:
+            return []
+        query = expansion_query(tuple(self._graph.edge_types), depth)
+        params = {"ids": list(dict.fromkeys(node_ids)), "limit": self._graph.max_neighbors}
+
+        def _read(tx: Any) -> List[str]:
+            return [record["id"] for record in tx.run(query, **params)]
+
+        try:
+            with self._session() as session:
+                neighbors = session.execute_read(_read)
+        except Neo4jError:
+            raise
+        except Exception as exc:
+            log.exception("Graph expansion failed")
+            raise Neo4jError(f"Graph expansion failed: {exc}") from exc
+        log.debug(f"Found {len(neighbors)} neighbor nodes")
+        return neighbors
+
+    def execute_query(self, query: str, **kwargs) -> List[Dict[str, Any]]:
+        """Run a query in a managed write transaction and return its records as dicts.
+
+        Raises:
+            Neo4jError: If not connected.
+        """
+        def _write(tx: Any) -> List[Dict[str, Any]]:
+            return [record.data() for record in tx.run(query, **kwargs)]
+
+        with self._session() as session:
+            return session.execute_write(_write)
+
+
 class JSONDocumentProcessor(DocumentProcessor):
     """JSON file implementation of DocumentProcessor."""
 
@@ -147,6 +416,10 @@ class JSONDocumentProcessor(DocumentProcessor):
         """Load documents from JSON file."""
         try:
             log.info(f"Loading documents from {path}")
+            if is_ndjson(path):
+                documents = list(iter_nodes(path))
+                log.info(f"Loaded {len(documents)} documents")
+                return documents
             with open(path, "r", encoding="utf-8") as f:
                 data = json.load(f)
 
@@ -0,0 +1,205 @@
+# singleflight.py
+"""Single-flight coalescing of identical concurrent requests.
+
+When several callers ask for the same key at the same time, only the first
+(the leader) executes the work; the others (followers) wait for and share the
+leader's result. Streaming calls are coalesced the same way: one background
+producer drives the underlying generator and every subscriber replays the
+tokens produced so far, then follows the live stream.
+"""
+
+import re
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config.logger import log
+
+
+def normalize_question(question: str) -> str:
+    """Normalize case, whitespace and trailing punctuation of a question."""
+    normalized = re.sub(r"\s+", " ", (question or "").strip().lower())
+    return normalized.rstrip(" ?!.")
+
+
+def coalesce_key(question: str, **params: Any) -> str:
+    """Build a single-flight key from a question and its generation parameters.
+
+    The question is normalized (case, whitespace and trailing punctuation) so
+    that near-identical phrasings share one in-flight call.
+
+    Args:
+        question: The user's question.
+        **params: Parameters that change the answer (LLM overrides, cache mode).
+
+    Returns:
+        Stable string key.
+    """
+    parts = [normalize_question(question)]
+    for name in sorted(params):
+        value = params[name]
+        if isinstance(value, dict):
+            value = ",".join(f"{k}={value[k]}" for k in sorted(value))
+        parts.append(f"{name}={value}")
+    return "|".join(parts)
+
+
+class _Call:
+    """State shared between the leader and followers of one key."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class _Broadcast:
+    """Append-only token buffer that many subscribers can replay and follow."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._tokens: List[str] = []
+        self._finished = False
+        self._error: Optional[BaseException] = None
+        self.followers = 0
+
+    def publish(self, token: str) -> None:
+        with self._cond:
+            self._tokens.append(token)
+            self._cond.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self._finished = True
+            self._error = error
+            self._cond.notify_all()
+
+    def subscribe(self) -> Iterator[str]:
+        position = 0
+        while True:
+            with self._cond:
+                while position >= len(self._tokens) and not self._finished:
+                    self._cond.wait()
+                pending = self._tokens[position:]
+                position = len(self._tokens)
+                finished = self._finished
+                error = self._error
+            for token in pending:
+                yield token
+            if finished and position >= len(self._tokens):
+                if error is not None:
+                    raise error
+                return
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key.
+
+    Thread-safe; intended for the synchronous RAG entry points which FastAPI
+    runs in its worker thread pool.
+    """
+
+    def __init__(self, name: str = "singleflight") -> None:
+        self._name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run ``fn`` once for all concurrent callers of ``key``.
+
+        Args:
+            key: Coalescing key (see :func:`coalesce_key`).
+            fn: Zero-argument callable producing the result.
+
+        Returns:
+            Tuple of (result, shared) where ``shared`` is True for followers
+            that received the leader's result.
+
+        Raises:
+            Exception: Whatever ``fn`` raised, re-raised in every caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            log.info(f"[{self._name}] joining in-flight call")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.followers:
+                log.info(f"[{self._name}] shared result with {call.followers} waiting callers")
+        return call.result, False
+
+    def stream(self, key: str, factory: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """Coalesce concurrent streams of ``key`` onto one producer.
+
+        The first caller starts a background thread that drains
+        ``factory()`` into a broadcast buffer; every caller, including the
+        first, iterates that buffer. Because the producer is detached from
+        the subscribers, a leader whose client disconnects does not cut off
+        its followers, and the stream still runs to completion (so side
+        effects such as caching happen exactly once).
+
+        Args:
+            key: Coalescing key (see :func:`coalesce_key`).
+            factory: Zero-argument callable returning the token iterator.
+
+        Returns:
+            Iterator over the shared token stream.
+        """
+        with self._lock:
+            broadcast = self._streams.get(key)
+            if broadcast is not None:
+                broadcast.followers += 1
+                start = False
+            else:
+                broadcast = _Broadcast()
+                self._streams[key] = broadcast
+                start = True
+
+        if start:
+            thread = threading.Thread(
+                target=self._produce,
+                args=(key, broadcast, factory),
+                name=f"{self._name}-producer",
+                daemon=True,
+            )
+            thread.start()
+        else:
+            log.info(f"[{self._name}] subscribing to in-flight stream")
+
+        return broadcast.subscribe()
+
+    def _produce(self, key: str, broadcast: _Broadcast, factory: Callable[[], Iterator[str]]) -> None:
+        error: Optional[BaseException] = None
+        try:
+            for token in factory():
+                broadcast.publish(token)
+        except BaseException as exc:  # noqa: BLE001 - re-raised in subscribers
+            log.exception(f"[{self._name}] stream producer failed")
+            error = exc
+        finally:
+            with self._lock:
+                self._streams.pop(key, None)
+            broadcast.finish(error)
+            if broadcast.followers:
+                log.info(f"[{self._name}] shared stream with {broadcast.followers} subscribers")
@@ -0,0 +1,179 @@
+# startup.py
+"""Lazily initialized services and the explicit warm-up that primes them.
+
+Process-wide resources that are slow to create (the embedding model, the
+Chroma clients and collections, the semantic cache, the LLM client) are
+wrapped in ``LazyService`` and created on first use instead of at import, so
+importing the API, the tests and the CLI tools does no I/O and loads no
+model. ``warm_up`` creates the services named in ``STARTUP_WARMUP`` up front,
+times each one and reports the total against ``STARTUP_BUDGET_MS``.
+"""
+
+import importlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, Iterable, Optional, TypeVar
+
+from config.logger import log
+from config.settings import StartupConfig
+
+T = TypeVar("T")
+
+# Warm-up name -> "module:function" creating the service; modules are only
+# imported when their service is warmed
+WARMERS: Dict[str, str] = {
+    "embedding_model": "core.embeddings:get_model",
+    "chroma": "core.graphrag:get_collections",
+    "semantic_cache": "core.graphrag:get_cache",
+    "llm": "core.graphrag:get_llm",
+    "code_chunks": "core.chunker:get_collection",
+    "graph": "core.graph_expansion:get_expander",
+}
+
+_services: Dict[str, "LazyService[Any]"] = {}
+
+
+class LazyService(Generic[T]):
+    """A value created by ``factory`` on first ``get``, once per process."""
+
+    def __init__(self, name: str, factory: Callable[[], T]) -> None:
+        """Initialize the holder; nothing is created yet.
+
+        Args:
+            name: Service name shown in startup reports and health checks.
+            factory: Creates the value; called at most once unless ``reset``.
+        """
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._ready = False
+        self.init_ms: Optional[float] = None
+        _services[name] = self
+
+    @property
+    def ready(self) -> bool:
+        """Whether the value has been created."""
+        return self._ready
+
+    def get(self) -> T:
+        """Return the value, creating it on first call."""
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    t0 = time.perf_counter()
+                    self._value = self._factory()
+                    self.init_ms = (time.perf_counter() - t0) * 1000
+                    self._ready = True
+                    log.info(f"Initialized {self.name} in {self.init_ms:.0f}ms")
+        return self._value  # type: ignore[return-value]
+
+    def set(self, value: T) -> None:
+        """Replace the value, e.g. after reopening a client."""
+        with self._lock:
+            self._value, self._ready = value, True
+
+    def reset(self) -> None:
+        """Drop the value so the next ``get`` creates it again."""
+        with self._lock:
+            self._value, self._ready, self.init_ms = None, False, None
+
+
+@dataclass
+class StartupReport:
+    """Outcome of a warm-up: time spent per service against the budget."""
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    total_ms: float = 0.0
+    budget_ms: float = 0.0
+
+    @property
+    def over_budget(self) -> bool:
+        """Whether warming took longer than the budget."""
+        return self.total_ms > self.budget_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view."""
+        return {
+            "timings_ms": {name: round(ms, 1) for name, ms in self.timings_ms.items()},
+            "errors": dict(self.errors),
+            "total_ms": round(self.total_ms, 1),
+            "budget_ms": self.budget_ms,
+            "over_budget": self.over_budget,
+        }
+
+    def format(self) -> str:
+        """Return a human-readable table of the report."""
+        lines = [f"{name:<16} {ms:>9.0f}ms" for name, ms in self.timings_ms.items()]
+        lines += [f"{name:<16} {'failed':>11}: {error}" for name, error in self.errors.items()]
+        lines.append(f"{'total':<16} {self.total_ms:>9.0f}ms (budget {self.budget_ms:.0f}ms)")
+        return "\n".join(lines)
+
+
+_last_report: Optional[StartupReport] = None
+
+
+def warm_up(names: Optional[Iterable[str]] = None, budget_ms: Optional[float] = None) -> StartupReport:
+    """Create the named services now rather than on first request.
+
+    Args:
+        names: Keys of ``WARMERS`` in the order to warm them; defaults to
+            ``STARTUP_WARMUP``.
+        budget_ms: Budget for the whole warm-up; defaults to
+            ``STARTUP_BUDGET_MS``. Exceeding it is logged, not an error.
+
+    Returns:
+        Time spent per service (including importing its module) and the
+        errors of services that failed to start.
+    """
+    global _last_report
+    config = StartupConfig.from_env()
+    report = StartupReport(budget_ms=config.budget_ms if budget_ms is None else budget_ms)
+    t_start = time.perf_counter()
+    for name in config.warmup if names is None else names:
+        target = WARMERS.get(name)
+        if target is None:
+            log.warning(f"Unknown warm-up service {name!r} (known: {', '.join(WARMERS)})")
+            continue
+        module_name, func_name = target.split(":")
+        t0 = time.perf_counter()
+        try:
+            getattr(importlib.import_module(module_name), func_name)()
+        except Exception as exc:
+            # The service is created (or fails again) on first use instead
+            log.exception(f"Warming {name} failed")
+            report.errors[name] = str(exc)
+            continue
+        report.timings_ms[name] = (time.perf_counter() - t0) * 1000
+    report.total_ms = (time.perf_counter() - t_start) * 1000
+
+    if report.over_budget:
+        log.warning(f"Startup warm-up exceeded its budget:\n{report.format()}")
+    else:
+        log.info(f"Startup warm-up finished:\n{report.format()}")
+    _last_report = report
+    return report
+
+
+def startup_status() -> Dict[str, Any]:
+    """Return the last warm-up report and which services are initialized."""
+    return {
+        "warmup": _last_report.to_dict() if _last_report else None,
+        "services": {
+            name: {"ready": service.ready, "init_ms": None if service.init_ms is None else round(service.init_ms, 1)}
+            for name, service in sorted(_services.items())
+        },
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Warm services and print the startup budget report")
+    parser.add_argument("services", nargs="*", help=f"Services to warm (default: STARTUP_WARMUP); any of {', '.join(WARMERS)}")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Override STARTUP_BUDGET_MS")
+    args = parser.parse_args()
+    result = warm_up(args.services or None, args.budget_ms)
+    print(result.format())
+    raise SystemExit(1 if result.errors or result.over_budget else 0)
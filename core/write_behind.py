@@ -0,0 +1,178 @@
+# write_behind.py
+"""Write-behind queue for work that must not delay user-visible responses.
+
+Cache upserts (re-embedding the question plus a Chroma write) and chat
+history writes are submitted here and applied by a single background thread
+in batches. The queue is bounded so memory stays flat under load; when it is
+full new writes are dropped (they are best-effort) rather than blocking the
+request. Pending writes are flushed on shutdown.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.logger import log
+from config.settings import WriteBehindConfig
+
+_SHUTDOWN = object()
+
+
+class WriteBehindQueue:
+    """Bounded, batching background writer.
+
+    Handlers are registered per kind and always receive a list of payloads,
+    so they can turn N queued writes into one backend call.
+    """
+
+    def __init__(self, config: Optional[WriteBehindConfig] = None, name: str = "write-behind") -> None:
+        """Initialize the queue; the worker thread starts on first submit.
+
+        Args:
+            config: Queue bounds and batching settings.
+            name: Thread name, also used as the log prefix.
+        """
+        self._config = config or WriteBehindConfig()
+        self._name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=self._config.max_pending)
+        self._handlers: Dict[str, Callable[[List[Any]], None]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.dropped = 0
+
+    def register(self, kind: str, handler: Callable[[List[Any]], None]) -> None:
+        """Register the batch handler for a kind of write."""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload: Any) -> bool:
+        """Queue a write without blocking.
+
+        Args:
+            kind: Registered write kind, e.g. ``"cache.store"``.
+            payload: Handler-specific payload.
+
+        Returns:
+            True if queued, False if the queue was full or closed.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No write-behind handler registered for {kind!r}")
+        if self._closed:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((kind, payload))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            log.warning(f"[{self._name}] queue full ({self._config.max_pending}), dropping {kind} write")
+            return False
+
+    def pending(self) -> int:
+        """Number of writes queued or being applied."""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued write has been applied.
+
+        Args:
+            timeout: Maximum seconds to wait; None waits indefinitely.
+
+        Returns:
+            True if the queue drained, False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Flush pending writes and stop the worker thread. Idempotent."""
+        timeout = self._config.shutdown_timeout_s if timeout is None else timeout
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is None:
+            return
+        if not self.flush(timeout):
+            log.warning(f"[{self._name}] {self.pending()} writes still pending at shutdown")
+        try:
+            self._queue.put_nowait(_SHUTDOWN)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        log.info(f"[{self._name}] stopped")
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _SHUTDOWN:
+                self._queue.task_done()
+                return
+            batch: List[Tuple[str, Any]] = [item]
+            deadline = time.monotonic() + self._config.linger_s
+            while len(batch) < self._config.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _SHUTDOWN:
+                    # Re-queue so the loop exits after this batch is applied
+                    self._queue.task_done()
+                    self._queue.put(_SHUTDOWN)
+                    break
+                batch.append(nxt)
+            try:
+                self._apply(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _apply(self, batch: List[Tuple[str, Any]]) -> None:
+        by_kind: Dict[str, List[Any]] = {}
+        for kind, payload in batch:
+            by_kind.setdefault(kind, []).append(payload)
+        for kind, payloads in by_kind.items():
+            try:
+                self._handlers[kind](payloads)
+                log.debug(f"[{self._name}] applied {len(payloads)} {kind} writes")
+            except Exception:
+                log.exception(f"[{self._name}] {kind} batch of {len(payloads)} failed")
+
+
+# Global queue instance
+_write_behind: Optional[WriteBehindQueue] = None
+_write_behind_lock = threading.Lock()
+
+
+def get_write_behind() -> WriteBehindQueue:
+    """Get the process-wide write-behind queue.
+
+    Returns:
+        Global queue instance configured from the environment.
+    """
+    global _write_behind
+    if _write_behind is None:
+        with _write_behind_lock:
+            if _write_behind is None:
+                _write_behind = WriteBehindQueue(WriteBehindConfig.from_env())
+    return _write_behind
@@ -0,0 +1,145 @@
+"""Replay logged questions through a simulated cache to tune its thresholds.
+
+The questions are replayed in order against a cache that starts empty, as
+if the log were live traffic: a question hits when an earlier question was
+stored with the same normalized text, or when the nearest stored question
+passes the candidate ``CacheConfig.threshold`` and ``min_overlap``;
+otherwise it misses and is stored. The questions are embedded once, and
+the replay is repeated for every candidate pair without re-embedding. The
+real cache collection is neither read nor written.
+
+Usage:
+    python evaluation/run_cache_replay.py --history-path chat_history.json \
+        --thresholds 0.8 0.85 0.9 0.95 --overlaps 0.0 0.2 0.3
+"""
+
+import argparse
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.cache_warmup import GOLDEN_DATASET_PATH, history_questions, load_question_file
+from core.singleflight import normalize_question
+
+
+def score_questions(
+    questions: Sequence[str],
+    embed: Optional[Callable[[List[str]], List[List[float]]]] = None,
+) -> Dict[str, Any]:
+    """Embed the logged questions and score every pair once.
+
+    Args:
+        questions: Logged questions, in order.
+        embed: Batch embedding function; defaults to ``embed_texts``.
+
+    Returns:
+        Dict with 'questions', 'keys' (normalized questions) and
+        'similarity' (matrix of pairwise cosine similarities).
+    """
+    if embed is None:
+        from core.embeddings import embed_texts as embed
+    questions = list(questions)
+    vectors = np.asarray(embed(questions), dtype=np.float32).reshape(len(questions), -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1.0, norms)
+    return {
+        "questions": questions,
+        "keys": [normalize_question(q) for q in questions],
+        "similarity": unit @ unit.T,
+    }
+
+
+def replay_hit_rates(
+    scored: Dict[str, Any],
+    thresholds: Sequence[float],
+    overlaps: Sequence[float],
+    overlap: Callable[[str, str], float],
+) -> List[Dict[str, Any]]:
+    """Replay the questions in order for each (threshold, min_overlap) pair.
+
+    Args:
+        scored: Output of :func:`score_questions`.
+        thresholds: Candidate similarity thresholds.
+        overlaps: Candidate minimum lexical overlaps.
+        overlap: Lexical overlap of a question and a cached question, e.g.
+            ``SemanticCache.lexical_overlap``.
+
+    Returns:
+        One row per pair with 'threshold', 'min_overlap', 'hits',
+        'hit_rate' and 'entries' (cache size at the end of the replay).
+    """
+    questions: List[str] = scored["questions"]
+    keys: List[str] = scored["keys"]
+    similarity = scored["similarity"]
+    overlap_of: Dict[Tuple[int, int], float] = {}
+
+    rows: List[Dict[str, Any]] = []
+    total = len(questions)
+    for threshold in thresholds:
+        for min_overlap in overlaps:
+            stored: List[int] = []
+            stored_keys = set()
+            hits = 0
+            for i, key in enumerate(keys):
+                if key in stored_keys:
+                    hits += 1
+                    continue
+                if stored:
+                    j = stored[int(np.argmax(similarity[i, stored]))]
+                    if (i, j) not in overlap_of:
+                        overlap_of[(i, j)] = overlap(questions[i], questions[j])
+                    if similarity[i, j] >= threshold and overlap_of[(i, j)] >= min_overlap:
+                        hits += 1
+                        continue
+                stored.append(i)
+                stored_keys.add(key)
+            rows.append({
+                "threshold": threshold,
+                "min_overlap": min_overlap,
+                "hits": hits,
+                "hit_rate": hits / total if total else 0.0,
+                "entries": len(stored),
+            })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Estimate semantic cache hit rate for candidate thresholds")
+    parser.add_argument("--history-path", default=os.getenv("CHAT_HISTORY_PATH", "chat_history.json"),
+                        help="Chat history to replay")
+    parser.add_argument("--file", action="append", default=[],
+                        help="Additional question file (JSON, JSONL or text)")
+    parser.add_argument("--golden", action="store_true", help=f"Also replay {GOLDEN_DATASET_PATH}")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.8, 0.85, 0.9, 0.95])
+    parser.add_argument("--overlaps", type=float, nargs="+", default=[0.0, 0.2, 0.3, 0.5])
+    args = parser.parse_args(argv)
+
+    questions: List[str] = history_questions(args.history_path)
+    if args.golden:
+        questions.extend(load_question_file(GOLDEN_DATASET_PATH))
+    for path in args.file:
+        questions.extend(load_question_file(path))
+    if not questions:
+        print("No questions to replay.")
+        return
+
+    from core.semantic_cache import SemanticCache
+
+    scored = score_questions(questions)
+
+    print(f"Replayed {len(questions)} questions against an initially empty cache.")
+    print(f"{'threshold':>9} | {'overlap':>7} | {'hits':>5} | {'hit rate':>8} | {'entries':>7}")
+    for row in replay_hit_rates(scored, args.thresholds, args.overlaps, SemanticCache.lexical_overlap):
+        print(
+            f"{row['threshold']:9.2f} | {row['min_overlap']:7.2f} | {row['hits']:5d} | "
+            f"{row['hit_rate']:8.1%} | {row['entries']:7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# kgbuild/frozen.py
+"""Frozen, read-only form of the knowledge graph with CSR adjacency.
+
+``KG`` keeps edges as a list of dicts and repeats a ``CALLS`` edge once per
+call site. ``FrozenKG`` is built once from a finished graph for queries:
+
+- node ids are interned to integers ``0..n-1``; edge endpoints that are not
+  nodes themselves (unresolved call targets such as ``print``) are interned
+  too, without a type;
+- every edge type has a forward (``src -> dst``) and a reverse
+  (``dst -> src``) adjacency in compressed sparse row form: ``offsets``
+  (``n + 1`` int64) indexes into ``targets`` (int32) sorted by neighbor;
+- duplicate edges collapse into one entry whose ``counts`` (int32) holds the
+  multiplicity;
+- node ``scores`` (centrality, see ``centrality``) become one float64 array
+  per metric.
+
+``save`` writes the arrays as ``.npy`` files plus ``meta.json`` into a
+directory; ``load`` memory-maps the arrays, so opening a large graph costs
+the id table only.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from graph_indexing.kgbuild.graph import KG
+
+logger = logging.getLogger(__name__)
+
+CSR_VERSION = 1
+_ARRAYS = ("offsets", "targets", "counts")
+
+
+@dataclass(frozen=True)
+class CSR:
+    """Adjacency of one edge type in one direction."""
+    offsets: np.ndarray
+    targets: np.ndarray
+    counts: np.ndarray
+
+    def row(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the neighbor indices of ``index`` and their multiplicities."""
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.targets[start:end], self.counts[start:end]
+
+    @classmethod
+    def build(cls, rows: np.ndarray, cols: np.ndarray, n: int) -> "CSR":
+        """Build from parallel arrays of edge endpoints, merging duplicates."""
+        keys, counts = np.unique(rows.astype(np.int64) * n + cols, return_counts=True)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // n, minlength=n), out=offsets[1:])
+        return cls(offsets, (keys % n).astype(np.int32), counts.astype(np.int32))
+
+
+class FrozenKG:
+    """Read-only knowledge graph with interned ids and per-type CSR adjacency."""
+
+    def __init__(
+        self,
+        ids: List[str],
+        types: List[Optional[str]],
+        props: List[Dict[str, Any]],
+        forward: Dict[str, CSR],
+        reverse: Dict[str, CSR],
+        scores: Optional[Dict[str, np.ndarray]] = None,
+    ) -> None:
+        """Wrap already built tables; use ``build`` or ``load`` instead.
+
+        Args:
+            ids: Node id per integer index.
+            types: Node type per index (``None`` for edge-only endpoints).
+            props: Node properties per index.
+            forward: ``src -> dst`` adjacency per edge type.
+            reverse: ``dst -> src`` adjacency per edge type.
+            scores: Per-node score arrays by metric name.
+        """
+        self.ids = ids
+        self.types = types
+        self.props = props
+        self.forward = forward
+        self.reverse = reverse
+        self.scores = scores or {}
+        self._index = {node_id: i for i, node_id in enumerate(ids)}
+
+    # ------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------
+    @classmethod
+    def build(cls, nodes: Iterable[Dict[str, Any]], edges: Iterable[Dict[str, Any]]) -> "FrozenKG":
+        """Freeze node and edge records as stored in ``knowledge_graph.json``."""
+        ids: List[str] = []
+        types: List[Optional[str]] = []
+        props: List[Dict[str, Any]] = []
+        index: Dict[str, int] = {}
+        node_scores: Dict[int, Dict[str, float]] = {}
+
+        def intern(node_id: str) -> int:
+            i = index.get(node_id)
+            if i is None:
+                i = index[node_id] = len(ids)
+                ids.append(node_id)
+                types.append(None)
+                props.append({})
+            return i
+
+        for node in nodes:
+            i = intern(node["id"])
+            types[i] = node.get("type")
+            props[i] = dict(node.get("props", {}))
+            if node.get("scores"):
+                node_scores[i] = node["scores"]
+
+        by_type: Dict[str, Tuple[List[int], List[int]]] = {}
+        for edge in edges:
+            src, dst = by_type.setdefault(edge["type"], ([], []))
+            src.append(intern(edge["src"]))
+            dst.append(intern(edge["dst"]))
+
+        n = len(ids)
+        forward, reverse = {}, {}
+        for edge_type, (src, dst) in sorted(by_type.items()):
+            rows, cols = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+            forward[edge_type] = CSR.build(rows, cols, n)
+            reverse[edge_type] = CSR.build(cols, rows, n)
+
+        scores: Dict[str, np.ndarray] = {}
+        for i, values in node_scores.items():
+            for metric, value in values.items():
+                scores.setdefault(metric, np.zeros(n))[i] = value
+        return cls(ids, types, props, forward, reverse, scores)
+
+    @classmethod
+    def from_kg(cls, kg: Union[KG, Dict[str, Any]]) -> "FrozenKG":
+        """Freeze a ``KG`` or a graph dict."""
+        if isinstance(kg, KG):
+            return cls.build(kg.nodes.values(), kg.edges)
+        return cls.build(kg.get("nodes", []), kg.get("edges", []))
+
+    @classmethod
+    def from_file(cls, path: str) -> "FrozenKG":
+        """Freeze a graph file (JSON or NDJSON, see ``kgio``)."""
+        from graph_indexing.kgbuild.kgio import iter_edges, iter_nodes
+
+        return cls.build(iter_nodes(path), iter_edges(path))
+
+    # ------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._index
+
+    @property
+    def edge_types(self) -> List[str]:
+        """Edge types present in the graph, sorted."""
+        return list(self.forward)
+
+    def index_of(self, node_id: str) -> Optional[int]:
+        """Return the integer index of ``node_id``, or None."""
+        return self._index.get(node_id)
+
+    def node(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """Return the node record of ``node_id`` (None for unknown or edge-only ids)."""
+        i = self._index.get(node_id)
+        if i is None or self.types[i] is None:
+            return None
+        return {"id": node_id, "type": self.types[i], "props": self.props[i]}
+
+    def score(self, node_id: str, metric: str, default: float = 0.0) -> float:
+        """Return a precomputed score of ``node_id`` (``default`` if unknown)."""
+        i = self._index.get(node_id)
+        values = self.scores.get(metric)
+        return default if i is None or values is None else float(values[i])
+
+    def neighbors(
+        self,
+        node_id: str,
+        edge_types: Optional[Sequence[str]] = None,
+        direction: str = "out",
+    ) -> List[Tuple[str, str, int]]:
+        """Return the neighbors of a node.
+
+        Args:
+            node_id: Node to look up.
+            edge_types: Edge types to follow; all types when None.
+            direction: ``"out"`` (``node -> x``), ``"in"`` (``x -> node``)
+                or ``"both"``.
+
+        Returns:
+            ``(neighbor id, edge type, multiplicity)`` per distinct neighbor
+            and edge type, in edge type then index order.
+        """
+        i = self._index.get(node_id)
+        if i is None:
+            return []
+        tables = []
+        if direction in ("out", "both"):
+            tables.append(self.forward)
+        if direction in ("in", "both"):
+            tables.append(self.reverse)
+        if not tables:
+            raise ValueError(f"direction must be 'out', 'in' or 'both', not {direction!r}")
+
+        result = []
+        for table in tables:
+            for edge_type in edge_types if edge_types is not None else table:
+                csr = table.get(edge_type)
+                if csr is None:
+                    continue
+                targets, counts = csr.row(i)
+                result.extend((self.ids[t], edge_type, int(c)) for t, c in zip(targets.tolist(), counts.tolist()))
+        return result
+
+    def multiplicity(self, src: str, dst: str, edge_type: str) -> int:
+        """Return how many times the edge ``src -[edge_type]-> dst`` occurs."""
+        i, j, csr = self._index.get(src), self._index.get(dst), self.forward.get(edge_type)
+        if i is None or j is None or csr is None:
+            return 0
+        targets, counts = csr.row(i)
+        pos = int(np.searchsorted(targets, j))
+        return int(counts[pos]) if pos < len(targets) and targets[pos] == j else 0
+
+    def edge_count(self, edge_type: Optional[str] = None, distinct: bool = False) -> int:
+        """Return the number of edges, of one type or all, with or without duplicates."""
+        tables = [self.forward[edge_type]] if edge_type is not None else list(self.forward.values())
+        return sum(len(csr.targets) if distinct else int(csr.counts.sum()) for csr in tables)
+
+    def iter_edges(self) -> Iterator[Dict[str, Any]]:
+        """Yield each distinct edge once, with its multiplicity as ``count``."""
+        for edge_type, csr in self.forward.items():
+            for i in range(len(self.ids)):
+                targets, counts = csr.row(i)
+                for t, c in zip(targets.tolist(), counts.tolist()):
+                    yield {"src": self.ids[i], "dst": self.ids[t], "type": edge_type, "count": c}
+
+    # ------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------
+    def save(self, directory: str) -> None:
+        """Write the graph to ``directory`` (``meta.json`` and one ``.npy`` per array)."""
+        os.makedirs(directory, exist_ok=True)
+        edge_types = self.edge_types
+        for k, edge_type in enumerate(edge_types):
+            for direction, table in (("fwd", self.forward), ("rev", self.reverse)):
+                for name in _ARRAYS:
+                    np.save(os.path.join(directory, f"e{k}.{direction}.{name}.npy"), getattr(table[edge_type], name))
+        for metric, values in self.scores.items():
+            np.save(os.path.join(directory, f"score.{metric}.npy"), values)
+        meta = {
+            "version": CSR_VERSION,
+            "ids": self.ids,
+            "types": self.types,
+            "props": self.props,
+            "edge_types": edge_types,
+            "scores": list(self.scores),
+        }
+        # meta.json last: a directory without it is an incomplete save
+        tmp = os.path.join(directory, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(directory, "meta.json"))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "FrozenKG":
+        """Open a graph written by ``save``.
+
+        Args:
+            directory: Directory passed to ``save``.
+            mmap: Memory-map the adjacency arrays instead of reading them.
+
+        Raises:
+            FileNotFoundError: If ``directory`` holds no saved graph.
+            ValueError: If it was saved by an incompatible version.
+        """
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != CSR_VERSION:
+            raise ValueError(f"{directory} holds CSR version {meta.get('version')}, expected {CSR_VERSION}")
+
+        mode = "r" if mmap else None
+        forward, reverse = {}, {}
+        for k, edge_type in enumerate(meta["edge_types"]):
+            for direction, table in (("fwd", forward), ("rev", reverse)):
+                arrays = [np.load(os.path.join(directory, f"e{k}.{direction}.{name}.npy"), mmap_mode=mode) for name in _ARRAYS]
+                table[edge_type] = CSR(*arrays)
+        scores = {
+            metric: np.load(os.path.join(directory, f"score.{metric}.npy"), mmap_mode=mode)
+            for metric in meta.get("scores", [])
+        }
+        return cls(meta["ids"], meta["types"], meta["props"], forward, reverse, scores)
+
+
+def csr_path_for(kg_path: str) -> str:
+    """Return the directory a graph file's frozen form is saved in."""
+    from graph_indexing.kgbuild.kgio import graph_stem
+
+    return f"{graph_stem(kg_path)}.csr"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Freeze a knowledge graph into memory-mappable CSR arrays")
+    parser.add_argument("kg", help="Graph file (.json or .ndjson[.gz])")
+    parser.add_argument("--output", default=None, help="Output directory (default: <graph>.csr next to the graph)")
+    args = parser.parse_args()
+    frozen = FrozenKG.from_file(args.kg)
+    output = args.output or csr_path_for(args.kg)
+    frozen.save(output)
+    print(
+        f"Froze {len(frozen)} nodes, {frozen.edge_count(distinct=True)} distinct edges "
+        f"({frozen.edge_count()} with duplicates) into {output}"
+    )
@@ -1,6 +1,6 @@
 # kgbuild/graph.py
 
-from typing import Dict, List, Any
+from typing import Any, Dict, Iterable, Iterator, List, Set
 from pathlib import Path
 
 
@@ -56,34 +56,79 @@ class KG:
             "type": edge_type
         })
 
+    def merge(self, other: "KG"):
+        """Add the nodes and edges of another graph (e.g. a per-file fragment)."""
+        for node_id, node in other.nodes.items():
+            if node_id not in self.nodes:
+                self.nodes[node_id] = {"id": node_id, "type": node["type"], "props": {}}
+            self.nodes[node_id]["props"].update(node["props"])
+        self.edges.extend(other.edges)
+
+    def remove_files(self, files: Iterable[str]) -> Set[str]:
+        """Remove everything extracted from ``files`` and return the removed node ids.
+
+        Removes the module, class and function nodes whose ``file`` is one of
+        ``files``, their docstring and comment nodes, and every edge leaving
+        any of them. Edges from other files into them are kept, like the
+        unresolved targets of CALLS and IMPORTS edges.
+        """
+        files = {str(Path(f)) for f in files}
+        owners = set()
+        for node_id, node in self.nodes.items():
+            file_path = node["props"].get("file")
+            if file_path and str(Path(file_path)) in files:
+                owners.add(node_id)
+        removed = {node_id for node_id in self.nodes if node_id.split("::", 1)[0] in owners}
+        for node_id in removed:
+            del self.nodes[node_id]
+        self.edges = [edge for edge in self.edges if edge["src"] not in removed]
+        return removed
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KG":
+        """Rebuild a graph from the dict written by ``to_dict``."""
+        kg = cls()
+        for node in data.get("nodes", []):
+            kg.nodes[node["id"]] = {"id": node["id"], "type": node.get("type"), "props": dict(node.get("props", {}))}
+        kg.edges = [dict(edge) for edge in data.get("edges", [])]
+        return kg
+
     # ------------------------------------------------------
     # Export
     # ------------------------------------------------------
+    def iter_nodes(self, root_path: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield JSON-safe copies of the nodes, sanitized one at a time.
+
+        If root_path is provided, convert absolute file paths to relative paths.
+        """
+        if root_path:
+            root_path = str(Path(root_path).resolve())
+        for node in self.nodes.values():
+            node = self._sanitize(node)
+            if root_path and "props" in node and "file" in node["props"]:
+                file_path = node["props"]["file"]
+                if Path(file_path).is_absolute() and file_path.startswith(root_path):
+                    node["props"]["file"] = str(Path(file_path).relative_to(root_path))
+            yield node
+
+    def iter_edges(self) -> Iterator[Dict[str, Any]]:
+        """Yield JSON-safe copies of the edges."""
+        for edge in self.edges:
+            yield self._sanitize(edge)
+
     def to_dict(self, root_path: str = None):
         """
         Return a fully JSON-safe dict.
-        We sanitize the whole structure again, in case anything
-        sneaked in without going through add_node/add_edge.
+        Every record is sanitized again, in case anything sneaked in
+        without going through add_node/add_edge.
         
         If root_path is provided, convert absolute file paths to relative paths.
         """
-        raw = {
-            "nodes": list(self.nodes.values()),
-            "edges": self.edges,
+        return {
+            "nodes": list(self.iter_nodes(root_path)),
+            "edges": list(self.iter_edges()),
         }
-        
-        sanitized = self._sanitize(raw)
-        
-        # Convert absolute paths to relative if root_path is provided
-        if root_path:
-            root_path = str(Path(root_path).resolve())
-            for node in sanitized["nodes"]:
-                if "props" in node and "file" in node["props"]:
-                    file_path = node["props"]["file"]
-                    if Path(file_path).is_absolute() and file_path.startswith(root_path):
-                        node["props"]["file"] = str(Path(file_path).relative_to(root_path))
-        
-        return sanitized
 
     @staticmethod
     def convert_absolute_to_relative(json_file_path: str, root_path: str, output_file_path: str = None):
@@ -0,0 +1,193 @@
+# kgbuild/incremental.py
+"""Per-file fragment cache and graph diffs for incremental KG builds.
+
+``FragmentCache`` stores each file's extracted KG fragment keyed by the
+sha256 of the file's content, so a re-run only re-parses files whose
+content changed. Fragments do not depend on other files (calls and bases
+are resolved against their own module's imports), so a cached fragment
+stays valid however the rest of the project changes.
+
+``diff_graphs`` compares two graphs as written to ``knowledge_graph.json``
+and returns the added, removed and changed nodes and the added and removed
+edges, which ``core.embed_nodes`` and ``core.loadneo`` can apply instead of
+reloading the whole graph.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from graph_indexing.kgbuild.graph import KG
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction changes, so cached fragments are re-extracted
+FRAGMENT_VERSION = 2
+
+
+def file_digest(path: str) -> str:
+    """Return the sha256 hex digest of a file's content."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class FragmentCache:
+    """KG fragments per file, keyed by content hash, stored in one JSON file.
+
+    The cache is tied to a project root and an extractor configuration; a
+    cache written for another root or configuration is ignored.
+    """
+
+    def __init__(self, path: str, root: str, extractor: str = "") -> None:
+        """Open the cache at ``path`` (missing or stale caches start empty).
+
+        Args:
+            path: Location of the cache JSON file.
+            root: Project root the fragments were extracted from.
+            extractor: Extra extractor settings the fragments depend on.
+        """
+        self.path = path
+        self.root = root
+        self.extractor = f"{FRAGMENT_VERSION}:{extractor}"
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @classmethod
+    def for_output(cls, output: str, root: str, extractor: str = "") -> "FragmentCache":
+        """Open the cache kept next to a ``knowledge_graph.json`` output."""
+        from graph_indexing.kgbuild.kgio import graph_stem
+
+        return cls(f"{graph_stem(output)}.fragments.json", root, extractor)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            logger.warning(f"Ignoring unreadable fragment cache at {self.path}")
+            return
+        if data.get("root") != self.root or data.get("extractor") != self.extractor:
+            logger.info(f"Fragment cache {self.path} was built differently, re-extracting everything")
+            return
+        self._files = data.get("files", {})
+
+    def lookup(self, rel: str, digest: str) -> Optional[KG]:
+        """Return the cached fragment of ``rel`` if its content hash matches."""
+        entry = self._files.get(rel)
+        if entry is None or entry.get("sha256") != digest:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return KG.from_dict(entry)
+
+    def store(self, rel: str, digest: str, fragment: KG) -> None:
+        """Record the fragment extracted from ``rel`` with content hash ``digest``."""
+        self._files[rel] = {"sha256": digest, "nodes": list(fragment.nodes.values()), "edges": fragment.edges}
+
+    def retain(self, rels: Iterable[str]) -> None:
+        """Drop the entries of files not in ``rels`` (deleted files)."""
+        keep = set(rels)
+        self._files = {rel: entry for rel, entry in self._files.items() if rel in keep}
+
+    def save(self) -> None:
+        """Write the cache atomically."""
+        data = {"root": self.root, "extractor": self.extractor, "files": self._files}
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+
+def _edge_key(edge: Dict[str, Any]) -> Tuple[str, str, str]:
+    return edge["src"], edge["dst"], edge["type"]
+
+
+@dataclass
+class KGDiff:
+    """Difference between two graphs; edges compare as (src, dst, type)."""
+    added_nodes: List[Dict[str, Any]] = field(default_factory=list)
+    changed_nodes: List[Dict[str, Any]] = field(default_factory=list)
+    removed_nodes: List[str] = field(default_factory=list)
+    added_edges: List[Dict[str, Any]] = field(default_factory=list)
+    removed_edges: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        """Whether the graphs are the same."""
+        return not (self.added_nodes or self.changed_nodes or self.removed_nodes
+                    or self.added_edges or self.removed_edges)
+
+    def summary(self) -> str:
+        """Return the counts as a short string."""
+        return (
+            f"nodes +{len(self.added_nodes)} ~{len(self.changed_nodes)} -{len(self.removed_nodes)}, "
+            f"edges +{len(self.added_edges)} -{len(self.removed_edges)}"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view."""
+        return {
+            "added_nodes": self.added_nodes,
+            "changed_nodes": self.changed_nodes,
+            "removed_nodes": self.removed_nodes,
+            "added_edges": self.added_edges,
+            "removed_edges": self.removed_edges,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KGDiff":
+        """Rebuild a diff from the dict written by ``to_dict``."""
+        return cls(**{name: list(data.get(name, [])) for name in cls.__dataclass_fields__})
+
+
+def diff_graphs(old: Dict[str, Any], new: Dict[str, Any]) -> KGDiff:
+    """Compare two graphs in ``knowledge_graph.json`` form.
+
+    Args:
+        old: The previous graph (``{"nodes": [...], "edges": [...]}``).
+        new: The current graph.
+
+    Returns:
+        Nodes added, changed (type or properties differ) and removed, and
+        edges added and removed, each in the order of its graph.
+    """
+    old_nodes = {node["id"]: node for node in old.get("nodes", [])}
+    new_nodes = {node["id"]: node for node in new.get("nodes", [])}
+    old_edges = {_edge_key(edge) for edge in old.get("edges", [])}
+    new_edges = {_edge_key(edge) for edge in new.get("edges", [])}
+
+    diff = KGDiff()
+    for node_id, node in new_nodes.items():
+        previous = old_nodes.get(node_id)
+        if previous is None:
+            diff.added_nodes.append(node)
+        elif previous.get("type") != node.get("type") or previous.get("props") != node.get("props"):
+            diff.changed_nodes.append(node)
+    diff.removed_nodes = [node_id for node_id in old_nodes if node_id not in new_nodes]
+
+    seen = set()
+    for edge in new.get("edges", []):
+        key = _edge_key(edge)
+        if key not in old_edges and key not in seen:
+            seen.add(key)
+            diff.added_edges.append(edge)
+    seen = set()
+    for edge in old.get("edges", []):
+        key = _edge_key(edge)
+        if key not in new_edges and key not in seen:
+            seen.add(key)
+            diff.removed_edges.append(edge)
+    return diff
+
+
+def load_diff(path: str) -> KGDiff:
+    """Read a diff written next to a ``knowledge_graph.json`` build."""
+    with open(path, "r", encoding="utf-8") as f:
+        return KGDiff.from_dict(json.load(f))
@@ -0,0 +1,153 @@
+# kgbuild/kgio.py
+"""Reading and writing knowledge graphs in JSON or streaming NDJSON.
+
+The format follows the file name:
+
+- ``*.json``: one JSON document ``{"nodes": [...], "edges": [...]}``
+  (the original format, indented). Reading it loads the whole file.
+- ``*.ndjson`` / ``*.jsonl``, optionally ``.gz``: a header line, then one
+  compact JSON record per line, all nodes before all edges. Reading streams
+  it record by record in constant memory, and writing never builds the
+  whole document.
+
+Node records are ``{"id", "type", "props"}`` and edge records
+``{"src", "dst", "type"}`` in both formats, so every consumer handles both.
+``python -m graph_indexing.kgbuild.kgio IN OUT`` converts between them.
+"""
+
+import gzip
+import io
+import json
+import os
+from itertools import chain
+from typing import IO, Any, Dict, Iterable, Iterator, Tuple, Union
+
+from graph_indexing.kgbuild.graph import KG
+
+NDJSON_FORMAT = {"kg_format": "ndjson", "version": 1}
+NDJSON_SUFFIXES = (".ndjson", ".jsonl", ".ndjson.gz", ".jsonl.gz")
+
+Graph = Union[KG, Dict[str, Any]]
+
+
+def is_ndjson(path: str) -> bool:
+    """Whether ``path`` names a streaming NDJSON graph."""
+    return path.endswith(NDJSON_SUFFIXES)
+
+
+def graph_stem(path: str) -> str:
+    """Return ``path`` without its graph suffix, for naming sibling files."""
+    for suffix in NDJSON_SUFFIXES + (".json",):
+        if path.endswith(suffix):
+            return path[: -len(suffix)]
+    return os.path.splitext(path)[0]
+
+
+def _open_text(path: str, mode: str, compressed: bool) -> IO[str]:
+    if compressed:
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def iter_records(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``("node", node)`` and ``("edge", edge)`` records of a graph file.
+
+    NDJSON files are streamed; JSON files are loaded whole first.
+    """
+    if not is_ndjson(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        yield from (("node", node) for node in data.get("nodes", []))
+        yield from (("edge", edge) for edge in data.get("edges", []))
+        return
+
+    with _open_text(path, "r", path.endswith(".gz")) as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("kg_format") != NDJSON_FORMAT["kg_format"]:
+            raise ValueError(f"{path} is not an NDJSON knowledge graph")
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield ("edge" if "src" in record else "node"), record
+
+
+def iter_nodes(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the nodes of a graph file (NDJSON stops reading at the first edge)."""
+    for kind, record in iter_records(path):
+        if kind != "node":
+            return
+        yield record
+
+
+def iter_edges(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the edges of a graph file."""
+    return (record for kind, record in iter_records(path) if kind == "edge")
+
+
+def read_graph(path: str) -> Dict[str, Any]:
+    """Load a whole graph file as ``{"nodes": [...], "edges": [...]}``."""
+    graph: Dict[str, Any] = {"nodes": [], "edges": []}
+    for kind, record in iter_records(path):
+        graph["nodes" if kind == "node" else "edges"].append(record)
+    return graph
+
+
+def write_graph(path: str, graph: Graph, root_path: str = None) -> None:
+    """Write a graph atomically in the format ``path`` names.
+
+    Args:
+        path: Output file.
+        graph: A ``KG`` (records are sanitized one at a time) or a graph dict.
+        root_path: For a ``KG``, make ``file`` properties relative to it.
+    """
+    if isinstance(graph, KG):
+        nodes: Iterable[Dict[str, Any]] = graph.iter_nodes(root_path)
+        edges: Iterable[Dict[str, Any]] = graph.iter_edges()
+    else:
+        nodes, edges = graph.get("nodes", []), graph.get("edges", [])
+
+    tmp = f"{path}.tmp"
+    if is_ndjson(path):
+        with _open_text(tmp, "w", path.endswith(".gz")) as f:
+            f.write(json.dumps(NDJSON_FORMAT) + "\n")
+            for record in chain(nodes, edges):
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"nodes": list(nodes), "edges": list(edges)}, f, indent=2)
+    os.replace(tmp, path)
+
+
+def convert(source: str, destination: str) -> Tuple[int, int]:
+    """Convert a graph file between formats, streaming when possible.
+
+    Returns:
+        Number of nodes and edges written.
+    """
+    counts = {"node": 0, "edge": 0}
+    if not is_ndjson(destination):
+        graph = read_graph(source)
+        write_graph(destination, graph)
+        return len(graph["nodes"]), len(graph["edges"])
+
+    def records(kind: str) -> Iterator[Dict[str, Any]]:
+        for record_kind, record in iter_records(source):
+            if record_kind == kind:
+                counts[kind] += 1
+                yield record
+
+    # Two passes over the source keep memory constant
+    write_graph(destination, {"nodes": records("node"), "edges": records("edge")})
+    return counts["node"], counts["edge"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a knowledge graph between JSON and NDJSON")
+    parser.add_argument("source", help="Graph file to read (.json, .ndjson, .jsonl, optionally .gz)")
+    parser.add_argument("destination", help="Graph file to write; the format follows the extension")
+    args = parser.parse_args()
+    n_nodes, n_edges = convert(args.source, args.destination)
+    print(f"Wrote {n_nodes} nodes and {n_edges} edges to {args.destination}")
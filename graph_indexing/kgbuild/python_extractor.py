@@ -4,6 +4,7 @@ import logging
 from pathlib import Path
 from typing import List
 import libcst as cst
+from libcst.helpers import get_full_name_for_node
 
 from graph_indexing.kgbuild.graph import KG, Resolver
 from graph_indexing.kgbuild.treesitter_extractor import compute_module
@@ -36,6 +37,17 @@ class PyExtract(cst.CSTVisitor):
         parts = [self.module] + self.stack + [name]
         return ".".join(parts)
 
+    def signature(self, node) -> str:
+        """Header of a definition up to its colon, whitespace collapsed (no decorators)."""
+        header = node.with_changes(
+            body=cst.SimpleStatementSuite(body=[cst.Expr(cst.Ellipsis())]),
+            decorators=[],
+            leading_lines=[],
+            lines_after_decorators=[],
+        )
+        code = cst.Module(body=[]).code_for_node(header)
+        return " ".join(code.rsplit(":", 1)[0].split())
+
     def add_doc(self, node, parent_id: str):
         docstring = node.get_docstring()
         if not docstring:
@@ -73,9 +85,9 @@ class PyExtract(cst.CSTVisitor):
     def visit_ClassDef(self, node: cst.ClassDef):
         class_name = node.name.value
         class_id = self.fq(class_name)
-        parent = self.module if not self.stack else self.fq(self.stack[-1])
+        parent = ".".join([self.module] + self.stack)
 
-        self.kg.add_node(class_id, "class", file=self.path, name=class_name)
+        self.kg.add_node(class_id, "class", file=self.path, name=class_name, signature=self.signature(node))
         self.kg.add_edge(parent, class_id, "CONTAINS")
 
         self.add_doc(node, class_id)
@@ -97,9 +109,10 @@ class PyExtract(cst.CSTVisitor):
     def visit_FunctionDef(self, node: cst.FunctionDef):
         function_name = node.name.value
         function_id = self.fq(function_name)
-        parent = self.module if not self.stack else self.fq(self.stack[-1])
+        parent = ".".join([self.module] + self.stack)
 
-        self.kg.add_node(function_id, "function", file=self.path, name=function_name)
+        self.kg.add_node(function_id, "function", file=self.path, name=function_name,
+                         signature=self.signature(node))
         self.kg.add_edge(parent, function_id, "CONTAINS")
 
         self.add_doc(node, function_id)
@@ -136,17 +149,18 @@ class PyExtract(cst.CSTVisitor):
     # Imports
     def visit_Import(self, node: cst.Import):
         for alias in node.names:
-            name = alias.name.value
-            asname = alias.asname.name.value if alias.asname else name
+            # Dotted names (import a.b) are Attribute nodes
+            name = get_full_name_for_node(alias.name) or ""
+            asname = get_full_name_for_node(alias.asname.name) if alias.asname else name
             self.resolver.add_import(self.module, asname, name)
             # Edge at module level to imported module/symbol
             self.kg.add_edge(self.module, name, "IMPORTS")
 
     def visit_ImportFrom(self, node: cst.ImportFrom):
-        if not node.module:
+        if not node.module or isinstance(node.names, cst.ImportStar):
             return
 
-        base = node.module.value
+        base = get_full_name_for_node(node.module)
         for alias in node.names:
             if isinstance(alias.name, cst.Name):
                 name = alias.name.value
@@ -2,16 +2,18 @@
 
 import json
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import libcst as cst
+from typing import Any, Dict, List, Optional
 import argparse
 
-from graph_indexing.kgbuild.graph import KG, Resolver
+from graph_indexing.kgbuild.centrality import annotate_centrality
+from graph_indexing.kgbuild.graph import KG
+from graph_indexing.kgbuild.incremental import FragmentCache, KGDiff, diff_graphs, file_digest
+from graph_indexing.kgbuild.kgio import graph_stem, read_graph, write_graph
 from graph_indexing.kgbuild.treesitter_extractor import extract_ts
-from graph_indexing.kgbuild.python_extractor import PyExtract
-
-# Switch this to True if you want Tree-sitter nodes too
-from graph_indexing.kgbuild.python_extractor import PyExtract
+from graph_indexing.kgbuild.unified import parse_source
 
 # Switch this to True if you want Tree-sitter nodes too
 USE_TREESITTER = False
@@ -20,43 +22,150 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def extract_project(root: str) -> KG:
-    """Extract a knowledge graph from all Python files under root."""
+# Below this many files a process pool costs more than it saves
+POOL_MIN_FILES = 16
+
+
+def extract_file(path: str, root: str) -> KG:
+    """Extract the KG fragment of one file.
+
+    Fragments are independent: calls and base classes are resolved against
+    the imports of their own module only, so a fragment is the same whether
+    it is built alone or alongside the rest of the project.
+    """
+    fragment = KG()
+    if USE_TREESITTER:
+        extract_ts(path, root, fragment)
+    # Nodes and edges from the single Tree-sitter pass the chunker also uses
+    fragment.merge(parse_source(path, root).kg)
+    return fragment
+
+
+def _extract_batch(paths: List[str], root: str) -> List[KG]:
+    return [extract_file(path, root) for path in paths]
+
+
+def _extract_all(paths: List[str], root: str, workers: int) -> List[KG]:
+    """Extract the fragments of ``paths``, in order."""
+    if workers <= 1 or len(paths) < POOL_MIN_FILES:
+        return [extract_file(path, root) for path in paths]
+
+    # Contiguous batches amortize pickling; several per worker balance uneven files
+    size = max(1, len(paths) // (workers * 8))
+    batches = [paths[i:i + size] for i in range(0, len(paths), size)]
+    logger.info(f"Extracting {len(paths)} files with {workers} workers in {len(batches)} batches")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map yields batches in submission order, whatever order they finish in
+        return [fragment for batch in pool.map(_extract_batch, batches, [root] * len(batches)) for fragment in batch]
+
+
+def extract_project(root: str, workers: Optional[int] = None, cache: Optional[FragmentCache] = None) -> KG:
+    """Extract a knowledge graph from all Python files under root.
+
+    Files are extracted in a process pool and the fragments merged in
+    sorted path order, so the graph is identical for any number of workers.
+
+    Args:
+        root: Project root.
+        workers: Extraction processes; ``None`` or 0 uses all CPUs but one,
+            1 extracts in this process.
+        cache: Fragment cache; only files whose content hash is not in it
+            are parsed, and the cache is updated (the caller saves it).
+
+    Returns:
+        The merged knowledge graph.
+    """
     root_path = Path(root).resolve()
     root = str(root_path)
 
     knowledge_graph = KG()
-    resolver = Resolver()
 
-    python_files = [
-        file_path for file_path in root_path.rglob("*.py")
+    python_files = sorted(
+        str(file_path) for file_path in root_path.rglob("*.py")
         if "__pycache__" not in file_path.parts
-    ]
+    )
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
 
     logger.info(f"Found {len(python_files)} Python files in {root}")
 
-    for file_path in python_files:
-        logger.info(f"Processing {file_path}")
+    fragments: Dict[str, KG] = {}
+    digests: Dict[str, str] = {}
+    todo = python_files
+    if cache is not None:
+        todo = []
+        for path in python_files:
+            rel = os.path.relpath(path, root)
+            digests[path] = file_digest(path)
+            cached = cache.lookup(rel, digests[path])
+            if cached is None:
+                todo.append(path)
+            else:
+                fragments[path] = cached
+        cache.retain(os.path.relpath(path, root) for path in python_files)
+        logger.info(f"Fragment cache: {len(fragments)} files unchanged, {len(todo)} to extract")
+
+    for path, fragment in zip(todo, _extract_all(todo, root, workers)):
+        fragments[path] = fragment
+        if cache is not None:
+            cache.store(os.path.relpath(path, root), digests[path], fragment)
+
+    for path in python_files:
+        knowledge_graph.merge(fragments[path])
+    return knowledge_graph
 
-        if USE_TREESITTER:
-            extract_ts(str(file_path), root, knowledge_graph)
 
-        # Handle LibCST extraction.
-        try:
-            source_code = file_path.read_text(encoding="utf-8")
-            tree = cst.parse_module(source_code)
-            tree.visit(PyExtract(str(file_path), root, knowledge_graph, resolver))
-        except Exception as e:
-            logger.error(f"LibCST processing failed for {file_path}: {e}")
+def build_knowledge_graph(root: str, output: str, workers: Optional[int] = None, full: bool = False) -> KGDiff:
+    """Build ``output`` from ``root``, re-extracting only changed files.
 
-    return knowledge_graph
+    Fragments are cached next to ``output`` (``<name>.fragments.json``). The
+    difference to the previous ``output`` is written to ``<name>.diff.json``
+    for downstream consumers that apply deltas. Each node carries its
+    centrality scores (see ``centrality``). The format of ``output``
+    follows its extension (see ``kgio``).
+
+    Args:
+        root: Project root.
+        output: Knowledge-graph JSON to write.
+        workers: Extraction processes, as for ``extract_project``.
+        full: Ignore cached fragments and re-extract every file.
+
+    Returns:
+        The difference between the previous and the new graph.
+    """
+    root_path = str(Path(root).resolve())
+    cache = FragmentCache.for_output(output, root_path, extractor=f"treesitter={USE_TREESITTER}")
+    if full:
+        cache.retain(())
+    graph = extract_project(root_path, workers=workers, cache=cache).to_dict(root_path=root_path)
+    annotate_centrality(graph)
+
+    previous: Dict[str, Any] = read_graph(output) if os.path.exists(output) else {}
+    diff = diff_graphs(previous, graph)
+
+    write_graph(output, graph)
+    with open(f"{graph_stem(output)}.diff.json", "w", encoding="utf-8") as f:
+        json.dump(diff.to_dict(), f, indent=2)
+    cache.save()
+    logger.info(f"Knowledge graph saved to {output} ({cache.misses} files extracted, {diff.summary()})")
+    return diff
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Extract knowledge graph from Python code")
     parser.add_argument("root", nargs="?", default=".", help="Root directory to extract from")
     parser.add_argument("--convert-absolute", help="Convert existing JSON file with absolute paths to relative paths")
-    parser.add_argument("--output", default="knowledge_graph.json", help="Output file name")
+    parser.add_argument("--output", default="knowledge_graph.json",
+                        help="Output file name (.ndjson or .ndjson.gz for the streaming format)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Extraction processes (0 = all CPUs but one, 1 = no pool)")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-extract every file instead of only those whose content changed")
+    parser.add_argument("--csr", action="store_true",
+                        help="Also freeze the graph into memory-mappable CSR arrays (<output>.csr/)")
+    parser.add_argument("--index", action="store_true",
+                        help="Also index code chunks into ChromaDB from the same parse")
+    parser.add_argument("--watch", action="store_true",
+                        help="Build with --index, then keep the graph and code chunks in sync with file changes")
     
     args = parser.parse_args()
     
@@ -71,11 +180,29 @@ if __name__ == "__main__":
         target_root = args.root
         logger.info(f"Starting extraction for project at: {target_root}")
 
-        knowledge_graph = extract_project(target_root)
-
         output_file = args.output
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(knowledge_graph.to_dict(root_path=target_root), f, indent=2)
+        if args.index or args.watch:
+            # One parse per file feeds both the graph and the code chunks
+            from core.chunker import run_ingest
+
+            knowledge_graph = KG()
+            run_ingest(target_root, kg=knowledge_graph)
+            write_graph(output_file, annotate_centrality(knowledge_graph.to_dict(root_path=target_root)))
+            logger.info(f"Knowledge graph saved to {output_file}")
+        else:
+            diff = build_knowledge_graph(target_root, output_file, workers=args.workers, full=args.full)
+            print(f"Changes: {diff.summary()}")
 
-        logger.info(f"Knowledge graph saved to {output_file}")
         print(f"Saved {output_file}")
+
+        if args.csr:
+            from graph_indexing.kgbuild.frozen import FrozenKG, csr_path_for
+
+            csr_dir = csr_path_for(output_file)
+            FrozenKG.from_file(output_file).save(csr_dir)
+            print(f"Saved {csr_dir}")
+
+        if args.watch:
+            from core.index_watcher import watch_forever
+
+            watch_forever([target_root], kg_path=output_file)
@@ -0,0 +1,400 @@
+# kgbuild/unified.py
+"""Single-pass extraction of knowledge-graph fragments and code blocks.
+
+Each file is read once as bytes and parsed once with Tree-sitter. One walk
+over the tree emits the file's KG nodes and edges (the same ones
+``PyExtract`` builds with LibCST) and the file's code blocks, each tagged with
+the id of the KG node it belongs to. The knowledge-graph builder and the code
+chunker both consume this, so a file is no longer parsed once per consumer,
+and chunks can be joined to graph nodes through their ``kg_node`` metadata.
+
+Blocks are hierarchical and never overlap: a class yields a skeleton (its
+header, docstring, attributes and member signatures, with member bodies
+elided), each method yields its own block pointing back at the class, and a
+function's block contains any functions or classes nested inside it.
+
+Tree-sitter rather than LibCST is the shared parser because it is an order
+of magnitude faster.
+"""
+
+import ast
+import hashlib
+import inspect
+import logging
+import time
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from graph_indexing.kgbuild.graph import KG, Resolver
+from graph_indexing.kgbuild.treesitter_extractor import compute_module
+
+logger = logging.getLogger(__name__)
+
+try:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=FutureWarning)
+        from tree_sitter_languages import get_parser  # type: ignore[import-untyped]
+
+        _parser: Any = get_parser("python")
+except Exception as e:  # pragma: no cover - depends on the installed grammar
+    logger.error(f"Tree-sitter could not load Python grammar: {e}")
+    _parser = None
+
+DEFINITIONS = ("class_definition", "function_definition")
+
+
+@dataclass
+class CodeBlock:
+    """Source of one class (skeleton) or function and the KG node it belongs to."""
+    kg_node: str
+    kind: str
+    text: str
+    start_line: int
+    end_line: int
+    # KG node of the enclosing class, if any
+    parent: Optional[str] = None
+
+
+@dataclass
+class ParsedFile:
+    """Everything extracted from one file in one parse."""
+    path: str
+    module: str
+    source: str
+    kg: KG
+    blocks: List[CodeBlock] = field(default_factory=list)
+    parse_s: float = 0.0
+    error: Optional[str] = None
+
+
+def _docstring(literal: str) -> Optional[str]:
+    """Evaluate a string literal the way LibCST's ``get_docstring`` does."""
+    try:
+        value = ast.literal_eval(literal)
+    except Exception:
+        return None  # f-strings and anything else that is not a constant
+    if not isinstance(value, str):
+        return None
+    return inspect.cleandoc(value)
+
+
+def class_skeleton(definition: Any, data: bytes) -> str:
+    """Return a class's source with the bodies of its methods and nested classes elided.
+
+    The header, docstring, attributes, comments and member signatures
+    (with decorators) are kept verbatim; each member body becomes ``...``.
+    """
+    body = definition.child_by_field_name("body")
+    pieces: List[bytes] = []
+    pos = definition.start_byte
+    for child in body.named_children if body is not None else []:
+        member = child.child_by_field_name("definition") if child.type == "decorated_definition" else child
+        if member is None or member.type not in DEFINITIONS:
+            continue
+        member_body = member.child_by_field_name("body")
+        if member_body is None:
+            continue
+        pieces.append(data[pos:member_body.start_byte])
+        pieces.append(b"...")
+        pos = member_body.end_byte
+    pieces.append(data[pos:definition.end_byte])
+    return b"".join(pieces).decode("utf-8", errors="replace")
+
+
+def _last_code_child(node: Any) -> Optional[Any]:
+    for child in reversed(node.children):
+        if child.type != "comment":
+            return child
+    return None
+
+
+def _prev_code_sibling(node: Any) -> Optional[Any]:
+    sibling = node.prev_sibling
+    while sibling is not None and sibling.type == "comment":
+        sibling = sibling.prev_sibling
+    return sibling
+
+
+class TsExtract:
+    """Builds the same KG as ``PyExtract`` from a Tree-sitter tree, plus code blocks.
+
+    Builds:
+      - module, class, function nodes
+      - docstring and comment nodes
+      - CONTAINS, CALLS, IMPORTS, INHERITS, HAS_DOC, HAS_COMMENT edges
+    """
+
+    def __init__(self, path: str, root: str, kg: KG, resolver: Resolver, data: bytes):
+        self.path = str(Path(path).relative_to(root))
+        self.module = compute_module(path, root)
+        self.kg = kg
+        self.resolver = resolver
+        self.data = data
+        self.lines = data.split(b"\n")
+
+        self.stack: List[str] = []   # class/function nesting
+        self.current_fn = None       # fully-qualified name of current function
+        self.fn_depth = 0            # functions enclosing the current node
+        self.blocks: List[CodeBlock] = []
+
+    # Helper utility methods.
+    def fq(self, name: str) -> str:
+        """Build fully qualified name from current nesting."""
+        parts = [self.module] + self.stack + [name]
+        return ".".join(parts)
+
+    def text(self, node: Any) -> str:
+        return self.data[node.start_byte:node.end_byte].decode("utf-8", errors="replace")
+
+    def signature(self, definition: Any) -> str:
+        """Header of a definition up to its colon, whitespace collapsed (no decorators)."""
+        colon = next((c for c in reversed(definition.children) if c.type == ":"), None)
+        end = colon.start_byte if colon is not None else definition.end_byte
+        return " ".join(self.data[definition.start_byte:end].decode("utf-8", errors="replace").split())
+
+    def add_doc(self, body: Optional[Any], parent_id: str):
+        """Add the docstring found at the start of ``body`` (a block or the module)."""
+        if body is None:
+            return
+        first = next((c for c in body.children if c.is_named and c.type != "comment"), None)
+        if first is None or first.type != "expression_statement" or first.named_child_count != 1:
+            return
+        literal = first.named_children[0]
+        if literal.type not in ("string", "concatenated_string"):
+            return
+        docstring = _docstring(self.text(literal))
+        if not docstring:
+            return
+        doc_id = f"{parent_id}::doc"
+        self.kg.add_node(doc_id, "docstring", text=docstring)
+        self.kg.add_edge(parent_id, doc_id, "HAS_DOC")
+
+    def leading_comments(self, anchor: Any) -> List[str]:
+        """Comment lines LibCST would attach to ``anchor`` as its leading lines.
+
+        These are the comment lines between the previous statement (or the
+        enclosing block's header) and ``anchor``, except that when the
+        previous statement ends with an indented block, comments up to the
+        last one indented at that block's level belong to the block.
+        Comments before the first statement of a file belong to the module.
+        """
+        node, previous = anchor, None
+        while previous is None:
+            previous = _prev_code_sibling(node)
+            if previous is None:
+                node = node.parent
+                if node is None or node.type == "module":
+                    return []
+
+        # Deepest row of the previous code, ignoring trailing comments
+        last = previous
+        while last.child_count and _last_code_child(last) is not None:
+            last = _last_code_child(last)
+        start_row = last.end_point[0] + 1
+
+        threshold = None
+        block = previous
+        while block is not None and block.type != "block":
+            block = _last_code_child(block) if block.child_count else None
+        if block is not None:
+            first = next((c for c in block.children if c.is_named and c.type != "comment"), None)
+            colon = _prev_code_sibling(block)
+            if first is not None and (colon is None or first.start_point[0] != colon.end_point[0]):
+                threshold = first.start_point[1]
+
+        comments: List[Tuple[int, str]] = []
+        for row in range(start_row, anchor.start_point[0]):
+            line = self.lines[row].decode("utf-8", errors="replace")
+            stripped = line.strip()
+            if stripped.startswith("#"):
+                comments.append((len(line) - len(line.lstrip()), stripped))
+        if threshold is not None:
+            owned = [i for i, (indent, _) in enumerate(comments) if indent >= threshold]
+            if owned:
+                comments = comments[owned[-1] + 1:]
+        return [comment for _, comment in comments]
+
+    def add_comments(self, anchor: Any, parent_id: str):
+        for comment in self.leading_comments(anchor):
+            comment_id = f"{parent_id}::c::{hashlib.md5(comment.encode()).hexdigest()[:6]}"
+            self.kg.add_node(comment_id, "comment", text=comment)
+            self.kg.add_edge(parent_id, comment_id, "HAS_COMMENT")
+
+    # Tree walk
+    def extract(self, root: Any) -> None:
+        self.kg.add_node(self.module, "module", file=self.path)
+        self.add_doc(root, self.module)
+        self.walk(root)
+
+    def walk(self, node: Any) -> None:
+        node_type = node.type
+        if node_type == "decorated_definition":
+            definition = node.child_by_field_name("definition")
+            if definition is not None and definition.type in DEFINITIONS:
+                # LibCST visits the definition before its decorators
+                self.enter(definition, node)
+                for child in node.children:
+                    if child.type == "decorator":
+                        self.walk(child)
+                self.visit_children(definition)
+                self.leave(definition)
+                return
+        elif node_type in DEFINITIONS:
+            self.enter(node, node)
+            self.visit_children(node)
+            self.leave(node)
+            return
+        elif node_type == "call":
+            self.visit_call(node)
+        elif node_type == "import_statement":
+            self.visit_import(node)
+        elif node_type in ("import_from_statement", "future_import_statement"):
+            self.visit_import_from(node)
+        for child in node.children:
+            self.walk(child)
+
+    def visit_children(self, definition: Any) -> None:
+        for child in definition.children:
+            self.walk(child)
+
+    def enter(self, definition: Any, anchor: Any) -> None:
+        name_node = definition.child_by_field_name("name")
+        name = self.text(name_node) if name_node is not None else "?"
+        node_id = self.fq(name)
+        parent = ".".join([self.module] + self.stack)
+        kind = "class" if definition.type == "class_definition" else "function"
+
+        self.kg.add_node(node_id, kind, file=self.path, name=name, signature=self.signature(definition))
+        self.kg.add_edge(parent, node_id, "CONTAINS")
+
+        self.add_doc(definition.child_by_field_name("body"), node_id)
+        self.add_comments(anchor, node_id)
+
+        if kind == "class":
+            # Handle INHERITS edges.
+            bases = definition.child_by_field_name("superclasses")
+            for base in bases.named_children if bases is not None else []:
+                if base.type == "identifier":
+                    resolved = self.resolver.resolve(self.module, self.text(base))
+                    self.kg.add_edge(node_id, resolved, "INHERITS")
+
+        if not self.fn_depth:
+            # Definitions nested in a function are part of that function's block
+            self.blocks.append(CodeBlock(
+                kg_node=node_id,
+                kind=kind,
+                text=class_skeleton(definition, self.data) if kind == "class" else self.text(definition),
+                start_line=definition.start_point[0] + 1,
+                end_line=definition.end_point[0] + 1,
+                parent=parent if self.stack else None,
+            ))
+        self.stack.append(name)
+        if kind == "function":
+            self.current_fn = node_id
+            self.fn_depth += 1
+
+    def leave(self, definition: Any) -> None:
+        self.stack.pop()
+        if definition.type == "function_definition":
+            self.current_fn = None
+            self.fn_depth -= 1
+
+    # Calls
+    def visit_call(self, node: Any) -> None:
+        if not self.current_fn:
+            return
+        func = node.child_by_field_name("function")
+        if func is None:
+            return
+
+        # direct function call: f(...)
+        if func.type == "identifier":
+            target = self.resolver.resolve(self.module, self.text(func))
+            self.kg.add_edge(self.current_fn, target, "CALLS")
+
+        # method/attribute call: obj.method(...)
+        elif func.type == "attribute":
+            method = self.text(func.child_by_field_name("attribute"))
+            obj = func.child_by_field_name("object")
+            if obj is not None and obj.type == "identifier":
+                resolved_obj = self.resolver.resolve(self.module, self.text(obj))
+                target = f"{resolved_obj}.{method}"
+            else:
+                target = f"?.{method}"
+            self.kg.add_edge(self.current_fn, target, "CALLS")
+
+    # Imports
+    def _names(self, node: Any) -> List[Tuple[str, str]]:
+        names = []
+        for child in node.children_by_field_name("name"):
+            if child.type == "aliased_import":
+                name = self.text(child.child_by_field_name("name"))
+                names.append((name, self.text(child.child_by_field_name("alias"))))
+            else:
+                name = self.text(child)
+                names.append((name, name))
+        return names
+
+    def visit_import(self, node: Any) -> None:
+        for name, asname in self._names(node):
+            self.resolver.add_import(self.module, asname, name)
+            # Edge at module level to imported module/symbol
+            self.kg.add_edge(self.module, name, "IMPORTS")
+
+    def visit_import_from(self, node: Any) -> None:
+        if node.type == "future_import_statement":
+            base = "__future__"
+        else:
+            module_name = node.child_by_field_name("module_name")
+            if module_name is not None and module_name.type == "relative_import":
+                # Like LibCST, relative imports keep only their dotted part
+                module_name = next((c for c in module_name.children if c.type == "dotted_name"), None)
+            if module_name is None:
+                return
+            base = self.text(module_name)
+
+        for name, asname in self._names(node):
+            resolved = f"{base}.{name}"
+            self.resolver.add_import(self.module, asname, resolved)
+            self.kg.add_edge(self.module, resolved, "IMPORTS")
+
+
+def parse_source(path: str, root: str, data: Optional[bytes] = None) -> ParsedFile:
+    """Read and parse one file, returning its KG fragment and code blocks.
+
+    The fragment uses a per-file resolver, which resolves exactly like the
+    project-wide one since imports are only looked up within their module.
+
+    Args:
+        path: File to parse (under ``root``).
+        root: Project root; node ids and ``file`` properties are relative to it.
+        data: File contents, if already read.
+
+    Returns:
+        The parsed file. Tree-sitter recovers from syntax errors, so a file
+        with errors still yields what could be parsed; ``error`` notes them.
+    """
+    t0 = time.perf_counter()
+    data = Path(path).read_bytes() if data is None else data
+    kg = KG()
+    parsed = ParsedFile(
+        path=str(Path(path).relative_to(root)),
+        module=compute_module(path, root),
+        source=data.decode("utf-8", errors="replace"),
+        kg=kg,
+    )
+    if _parser is None:
+        parsed.error = "Tree-sitter Python grammar unavailable"
+        return parsed
+
+    tree = _parser.parse(data)
+    extractor = TsExtract(path, root, kg, Resolver(), data)
+    extractor.extract(tree.root_node)
+    parsed.blocks = extractor.blocks
+    if tree.root_node.has_error:
+        parsed.error = "syntax error"
+        logger.warning(f"Tree-sitter found syntax errors in {path}, extraction may be partial")
+    parsed.parse_s = time.perf_counter() - t0
+    return parsed
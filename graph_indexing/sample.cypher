@@ -12,5 +12,5 @@ MATCH (a:Node)-[:CALLS]->(b:Node)
 RETURN a.id, b.id LIMIT 20;
 
 // Find all docstrings of classes
-MATCH (c:Node {type: "class"})-[:HAS_DOCSTRING]->(d:Node)
-RETURN c.id, d.props.text LIMIT 20;
+MATCH (c:Node {type: "class"})-[:HAS_DOC]->(d:Node)
+RETURN c.id, d.text LIMIT 20;
@@ -1,9 +1,16 @@
-import os
+import time
 import unittest
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 from api.main import app
+from config.settings import IndexConfig
+from core.index_jobs import IndexJobManager
+
+
+def _fake_index_job(path, rebuild, events, cancel, niceness, threads, kg_path=None):
+    """Stand-in for the indexing process."""
+    events.put(("done", {"indexed_files": [f"{path}/a.py"], "stored": 2, "affected_chunk_ids": [], "counts": {}}))
 
 
 class TestAPIIntegration(unittest.TestCase):
@@ -22,6 +29,14 @@ class TestAPIIntegration(unittest.TestCase):
         body = response.json()
         self.assertIn("cleared", body)
 
+    def test_cache_stats_endpoint(self):
+        response = self.client.get("/api/cache/stats")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["status"], "ok")
+        self.assertIn("miss_similarity_histogram", body)
+        self.assertIn("entries", body)
+
     def test_chat_endpoint_with_mocked_answer(self):
         with patch("api.controllers.answer_question", return_value="Hello"):
             response = self.client.post("/api/chat", json={"message": "Hi"})
@@ -30,13 +45,27 @@ class TestAPIIntegration(unittest.TestCase):
             self.assertEqual(body["answer"], "Hello")
 
     def test_index_endpoint(self):
-        abs_path = os.path.join(os.getcwd(), "t_for_testing")
-        with patch("core.embeddings.embed_text", return_value=[0.1, 0.2, 0.3]):
-            response = self.client.post("/api/index", json={"path": abs_path})
+        # The job process is spawned, so patches would not reach it: run a stand-in job
+        manager = IndexJobManager(IndexConfig(job_niceness=0), target=_fake_index_job)
+        self.addCleanup(manager.shutdown, 5.0)
+        with patch("api.controllers.get_index_jobs", return_value=manager):
+            response = self.client.post("/api/index", json={"path": "src"})
             self.assertEqual(response.status_code, 200)
-            body = response.json()
-            self.assertIn("indexed_files", body)
-            self.assertIn("chunks_processed", body)
+            job_id = response.json()["job_id"]
+
+            deadline = time.monotonic() + 30.0
+            body = self.client.get(f"/api/index/jobs/{job_id}").json()
+            while body["status"] not in ("succeeded", "failed") and time.monotonic() < deadline:
+                time.sleep(0.05)
+                body = self.client.get(f"/api/index/jobs/{job_id}").json()
+
+        self.assertEqual(body["status"], "succeeded", body["error"])
+        self.assertEqual(body["indexed_files"], ["src/a.py"])
+        self.assertEqual(body["chunks_processed"], 2)
+
+    def test_unknown_index_job(self):
+        response = self.client.get("/api/index/jobs/does-not-exist")
+        self.assertEqual(response.status_code, 404)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.batch_writer import BatchUpserter
+from core.code_exceptions import EmbeddingError
+
+
+def _vectors(texts):
+    return [[0.1, 0.2, 0.3] for _ in texts]
+
+
+class TestBatchUpserter(unittest.TestCase):
+    def test_flushes_one_upsert_per_batch(self):
+        collection = MagicMock()
+        with patch("core.batch_writer.embed_texts", side_effect=_vectors) as embed:
+            writer = BatchUpserter(collection, batch_size=2)
+            for i in range(5):
+                writer.add(f"id{i}", f"doc {i}", {"n": i})
+            writer.flush()
+
+        self.assertEqual(embed.call_count, 3)
+        self.assertEqual(collection.upsert.call_count, 3)
+        self.assertEqual(collection.upsert.call_args_list[0].kwargs["ids"], ["id0", "id1"])
+        self.assertEqual(writer.written, [f"id{i}" for i in range(5)])
+
+    def test_failed_batch_retries_individually(self):
+        collection = MagicMock()
+
+        def embed(texts):
+            if len(texts) > 1 or texts[0] == "bad":
+                raise EmbeddingError("boom")
+            return _vectors(texts)
+
+        with patch("core.batch_writer.embed_texts", side_effect=embed):
+            writer = BatchUpserter(collection, batch_size=10)
+            writer.add("a", "good")
+            writer.add("b", "bad")
+            writer.flush()
+
+        self.assertEqual(writer.written, ["a"])
+        self.assertEqual(writer.skipped, ["b"])
+        self.assertEqual(collection.upsert.call_args.kwargs["ids"], ["a"])
+
+    def test_unchanged_documents_are_not_embedded(self):
+        collection = MagicMock()
+        collection.get.return_value = {"ids": ["a", "b"], "documents": ["same", "old"], "metadatas": [{"n": 1}, {"n": 2}]}
+        with patch("core.batch_writer.embed_texts", side_effect=_vectors) as embed:
+            writer = BatchUpserter(collection, batch_size=10, skip_unchanged=True)
+            writer.add("a", "same", {"n": 1})
+            writer.add("b", "new", {"n": 2})
+            writer.add("c", "added")
+            writer.flush()
+
+        embed.assert_called_once_with(["new", "added"])
+        self.assertEqual(writer.unchanged, ["a"])
+        self.assertEqual(writer.written, ["b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
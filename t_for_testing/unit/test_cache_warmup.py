@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+
+from core.cache_warmup import frequent_history_questions, load_question_file
+from core.semantic_cache import SemanticCache
+from evaluation.run_cache_replay import replay_hit_rates, score_questions
+
+
+class TestWarmupQuestionSources(unittest.TestCase):
+    def test_golden_dataset_questions(self):
+        questions = load_question_file(os.path.join("evaluation", "golden_dataset.json"))
+        self.assertIn("How does routing work in fastapi?", questions)
+
+    def test_frequent_history_questions(self):
+        history = [
+            {"id": 1, "title": "FastAPI Routing", "question": "How does routing work?"},
+            {"id": 2, "title": "TestClient Overview", "question": "what is TestClient"},
+            {"id": 3, "title": "Routing Basics", "question": "how does routing work"},
+            # Older entries kept only the summarized title
+            {"id": 4, "title": "TestClient Overview"},
+            {"id": 5, "title": "TestClient Overview"},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "chat_history.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(history, f)
+            self.assertEqual(frequent_history_questions(path, limit=1), ["How does routing work?"])
+
+    def test_plain_text_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "questions.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# startup set\nWhat is APIRouter?\n\nExplain Depends\n")
+            self.assertEqual(load_question_file(path), ["What is APIRouter?", "Explain Depends"])
+
+
+
+class TestCacheReplay(unittest.TestCase):
+    def test_replays_against_an_initially_empty_cache(self):
+        vectors = {
+            "how does routing work": [1.0, 0.0],
+            "How does routing work?": [1.0, 0.0],
+            "how does fastapi routing work": [0.95, 0.31],
+            "what is TestClient": [0.0, 1.0],
+        }
+        questions = list(vectors)
+        scored = score_questions(questions, embed=lambda texts: [vectors[t] for t in texts])
+        rows = replay_hit_rates(scored, [0.9, 0.99], [0.3], SemanticCache.lexical_overlap)
+
+        # The first question of each kind misses; nobody hits their own entry
+        self.assertEqual([(r["threshold"], r["hits"], r["entries"]) for r in rows], [(0.9, 2, 2), (0.99, 1, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
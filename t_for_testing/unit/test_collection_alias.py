@@ -0,0 +1,75 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import chromadb
+
+from config.settings import IndexConfig
+from core.code_exceptions import ChromaError, IndexingCancelled
+from core.collection_alias import CollectionAliases, blue_green_rebuild
+
+
+def _fill(collection, n, dim=8):
+    rng = random.Random(n)
+    collection.add(
+        ids=[f"doc{i}" for i in range(n)],
+        embeddings=[[rng.random() for _ in range(dim)] for _ in range(n)],
+        documents=[f"text {i}" for i in range(n)],
+    )
+
+
+class TestBlueGreenRebuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.client = chromadb.PersistentClient(path=os.path.join(self.tmp, "chroma"))
+        self.aliases = CollectionAliases(os.path.join(self.tmp, "aliases.json"))
+        self.config = IndexConfig(keep_versions=1, min_count_ratio=0.5, min_recall=0.9, recall_samples=10)
+        _fill(self.client.get_or_create_collection("code_chunks", metadata={"hnsw:space": "cosine"}), 20)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _rebuild(self, n):
+        return blue_green_rebuild(self.client, self.aliases, "code_chunks", lambda c: _fill(c, n), self.config)
+
+    def test_unaliased_name_resolves_to_itself(self):
+        self.assertEqual(self.aliases.resolve("code_chunks"), "code_chunks")
+
+    def test_alias_manifest_follows_chroma_path(self):
+        with patch.dict("os.environ", {"CHROMA_PATH": "/data/chroma"}):
+            os.environ.pop("INDEX_ALIAS_MANIFEST", None)
+            self.assertEqual(IndexConfig.from_env().alias_manifest, os.path.join("/data/chroma", "collection_aliases.json"))
+
+    def test_rebuild_flips_alias_and_collects_old_versions(self):
+        self.assertEqual(self._rebuild(20), "code_chunks__v1")
+        self.assertEqual(self.aliases.resolve("code_chunks"), "code_chunks__v1")
+        # A second manifest reader sees the flip
+        self.assertEqual(CollectionAliases(self.aliases.path).resolve("code_chunks"), "code_chunks__v1")
+
+        self.assertEqual(self._rebuild(25), "code_chunks__v2")
+        names = {c.name for c in self.client.list_collections()}
+        # The previous version is kept for readers that have not switched yet
+        self.assertIn("code_chunks__v1", names)
+        self.assertNotIn("code_chunks", names)
+
+    def test_rejected_version_leaves_alias_unchanged(self):
+        self._rebuild(20)
+        with self.assertRaises(ChromaError):
+            self._rebuild(3)  # fewer than half the serving documents
+        self.assertEqual(self.aliases.resolve("code_chunks"), "code_chunks__v1")
+        self.assertNotIn("code_chunks__v2", {c.name for c in self.client.list_collections()})
+
+    def test_cancelled_build_propagates(self):
+        def build(collection):
+            raise IndexingCancelled("stop")
+
+        with self.assertRaises(IndexingCancelled):
+            blue_green_rebuild(self.client, self.aliases, "code_chunks", build, self.config)
+        self.assertEqual(self.aliases.resolve("code_chunks"), "code_chunks")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import tempfile
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from graph_indexing.kgbuild.centrality import annotate_centrality
+from graph_indexing.kgbuild.frozen import FrozenKG
+from graph_indexing.kgbuild.graph import KG
+
+
+class TestFrozenKG(unittest.TestCase):
+    def setUp(self):
+        self.kg = KG()
+        self.kg.add_node("m", "Module", file="m.py")
+        self.kg.add_node("m.f", "Function", file="m.py", line=1)
+        self.kg.add_node("m.g", "Function", file="m.py", line=5)
+        self.kg.add_edge("m", "m.f", "DEFINES")
+        self.kg.add_edge("m", "m.g", "DEFINES")
+        # One CALLS edge per call site
+        self.kg.add_edge("m.f", "m.g", "CALLS")
+        self.kg.add_edge("m.f", "m.g", "CALLS")
+        self.kg.add_edge("m.f", "print", "CALLS")
+
+    def test_adjacency_and_multiplicities(self):
+        frozen = FrozenKG.from_kg(self.kg)
+
+        self.assertEqual(frozen.multiplicity("m.f", "m.g", "CALLS"), 2)
+        self.assertEqual(frozen.multiplicity("m.g", "m.f", "CALLS"), 0)
+        self.assertEqual(frozen.edge_count("CALLS"), 3)
+        self.assertEqual(frozen.edge_count("CALLS", distinct=True), 2)
+        self.assertEqual(sorted(frozen.neighbors("m.f", ["CALLS"])), [("m.g", "CALLS", 2), ("print", "CALLS", 1)])
+        self.assertEqual(sorted(frozen.neighbors("m.g", direction="in")), [("m", "DEFINES", 1), ("m.f", "CALLS", 2)])
+        self.assertIn("print", frozen)
+        self.assertIsNone(frozen.node("print"))
+        self.assertEqual(frozen.node("m.g")["props"]["line"], 5)
+        expected = Counter((e["src"], e["dst"], e["type"]) for e in self.kg.edges)
+        self.assertEqual({(e["src"], e["dst"], e["type"]): e["count"] for e in frozen.iter_edges()}, dict(expected))
+
+    def test_save_and_memory_map(self):
+        frozen = FrozenKG.from_kg(self.kg)
+        with tempfile.TemporaryDirectory() as tmp:
+            frozen.save(tmp)
+            loaded = FrozenKG.load(tmp)
+
+            self.assertIsInstance(loaded.forward["CALLS"].targets, np.memmap)
+            self.assertEqual(loaded.ids, frozen.ids)
+            self.assertEqual(list(loaded.iter_edges()), list(frozen.iter_edges()))
+            self.assertEqual(sorted(loaded.neighbors("m.g", direction="both")), sorted(frozen.neighbors("m.g", direction="both")))
+
+    def test_centrality_scores(self):
+        kg = KG()
+        for node_id in ("a", "b", "c"):
+            kg.add_node(node_id, "Function")
+        kg.add_edge("a", "b", "CALLS")
+        kg.add_edge("b", "c", "CALLS")
+        kg.add_edge("a", "c", "DEFINES")
+        graph = annotate_centrality(kg.to_dict(), samples=None)
+        scores = {node["id"]: node["scores"] for node in graph["nodes"]}
+
+        # Only b lies on a shortest path; DEFINES does not count
+        self.assertEqual([scores[n]["betweenness"] for n in "abc"], [0.0, 0.5, 0.0])
+        self.assertEqual([scores[n]["degree"] for n in "abc"], [1, 2, 1])
+        self.assertGreater(scores["c"]["pagerank"], scores["b"]["pagerank"])
+        self.assertGreater(scores["b"]["pagerank"], scores["a"]["pagerank"])
+
+        frozen = FrozenKG.from_kg(graph)
+        with tempfile.TemporaryDirectory() as tmp:
+            frozen.save(tmp)
+            loaded = FrozenKG.load(tmp)
+            self.assertEqual(loaded.score("b", "betweenness"), 0.5)
+            self.assertEqual(loaded.score("c", "pagerank"), scores["c"]["pagerank"])
+            self.assertEqual(loaded.score("missing", "pagerank"), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from config.settings import GraphConfig
+from core import graph_expansion
+from core.graph_expansion import LocalGraphExpander, estimate_tokens, expand_graph, hydrate_neighbors
+from graph_indexing.kgbuild.frozen import FrozenKG
+from graph_indexing.kgbuild.graph import KG
+from graph_indexing.kgbuild.kgio import write_graph
+
+
+def _graph() -> KG:
+    kg = KG()
+    for node_id in ("m", "m.a", "m.b", "m.c", "m.hub", "m.d"):
+        kg.add_node(node_id, "function", file="m.py")
+    kg.add_edge("m", "m.a", "CONTAINS")
+    kg.add_edge("m.a", "m.b", "CALLS")
+    kg.add_edge("m.b", "m.c", "CALLS")
+    kg.add_edge("m.a", "print", "CALLS")
+    kg.add_edge("m.a", "m.d", "HAS_DOC")
+    for _ in range(3):
+        kg.add_edge("m.a", "m.hub", "CALLS")
+    return kg
+
+
+class TestLocalGraphExpander(unittest.TestCase):
+    def setUp(self):
+        self.graph = FrozenKG.from_kg(_graph())
+
+    def expander(self, **overrides):
+        # Unranked, to check the traversal order itself
+        overrides.setdefault("top_neighbors", 0)
+        return LocalGraphExpander(self.graph, GraphConfig(**overrides))
+
+    def test_hops_edge_types_and_caps(self):
+        # Most frequent edges first, both directions, no edge-only or filtered neighbours
+        self.assertEqual(self.expander().expand(["m.a"]), ["m.hub", "m", "m.b"])
+        self.assertEqual(self.expander(depth=2).expand(["m.a"]), ["m.hub", "m", "m.b", "m.c"])
+        self.assertEqual(self.expander(fanout=1).expand(["m.a"], depth=2), ["m.hub"])
+        self.assertEqual(self.expander(max_neighbors=2).expand(["m.a"], depth=2), ["m.hub", "m"])
+        self.assertEqual(self.expander(edge_types=("CONTAINS",)).expand(["m.a"]), ["m"])
+        self.assertEqual(self.expander().expand(["missing"]), [])
+
+    def test_ranks_by_personalized_pagerank(self):
+        kg = KG()
+        for node_id in ("s1", "s2", "a", "b"):
+            kg.add_node(node_id, "function", file="m.py")
+        kg.add_edge("s1", "a", "CALLS")
+        kg.add_edge("s1", "b", "CALLS")
+        kg.add_edge("s2", "b", "CALLS")
+        expander = LocalGraphExpander(FrozenKG.from_kg(kg), GraphConfig(top_neighbors=0))
+        self.assertEqual(expander.expand(["s1", "s2"]), ["a", "b"])
+
+        # b is reached from both seeds, so it outranks a
+        expander.config = GraphConfig(top_neighbors=1)
+        self.assertEqual(expander.expand(["s1", "s2"]), ["b"])
+        ranked = expander.rank(["s1", "s2"], ["a", "b"])
+        self.assertGreater(ranked[0][1], ranked[1][1])
+
+    def test_reloads_when_graph_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kg.json")
+            write_graph(path, _graph())
+            graph_expansion._expander.set(LocalGraphExpander.from_path(GraphConfig(kg_path=path)))
+            self.addCleanup(graph_expansion._expander.reset)
+            self.assertEqual(expand_graph(["m.b"]), ["m.a", "m.c"])
+
+            kg = _graph()
+            kg.add_node("m.e", "function", file="m.py")
+            kg.add_edge("m.b", "m.e", "CALLS")
+            write_graph(path, kg)
+            os.utime(path, (0, 0))
+            self.assertEqual(expand_graph(["m.b"]), ["m.a", "m.c", "m.e"])
+
+
+class TestHydrateNeighbors(unittest.TestCase):
+    def setUp(self):
+        kg = KG()
+        kg.add_node("m.f", "function", file="m.py", name="f", signature="def f(x: int) -> str")
+        kg.add_node("m.f::doc", "docstring", text="Format x for display.\n\nLong details nobody needs here.")
+        kg.add_node("m.C", "class", file="m.py", name="C", signature="class C(Base)")
+        config = GraphConfig(kg_path=os.path.join(tempfile.gettempdir(), "no-such-kg.json"))
+        graph_expansion._expander.set(LocalGraphExpander(FrozenKG.from_kg(kg), config))
+        self.addCleanup(graph_expansion._expander.reset)
+
+    def test_signature_and_docstring_from_local_graph(self):
+        collection = MagicMock()
+        collection.get.return_value = {
+            "ids": ["m.g", "m.g::doc"],
+            "documents": ["Name: g", "Fetch the record by id and cache it for later calls."],
+            "metadatas": [{"type": "function", "file": "n.py", "signature": "def g(key)"}, {"type": "docstring"}],
+        }
+        hydrated = hydrate_neighbors(["m.f", "m.g", "m.C", "m.missing"], collection, GraphConfig(doc_chars=24))
+
+        self.assertEqual(hydrated[0], {
+            "id": "m.f",
+            "text": "[neighbor:m.f] m.py\ndef f(x: int) -> str\n    Format x for display.",
+        })
+        self.assertEqual(hydrated[1]["text"], "[neighbor:m.g] n.py\ndef g(key)\n    Fetch the record by id…")
+        self.assertEqual([n["id"] for n in hydrated], ["m.f", "m.g", "m.C"])
+        # Only the ids the local graph lacks are fetched, in one batch with their docstrings
+        collection.get.assert_called_once_with(
+            ids=["m.g", "m.missing", "m.g::doc", "m.missing::doc"], include=["documents", "metadatas"]
+        )
+
+    def test_respects_token_budget(self):
+        first = hydrate_neighbors(["m.f"], config=GraphConfig())[0]["text"]
+        budget = estimate_tokens(first) + 2
+        hydrated = hydrate_neighbors(["m.f", "m.C"], config=GraphConfig(context_tokens=budget))
+        self.assertEqual([n["id"] for n in hydrated], ["m.f"])
+        self.assertEqual(hydrate_neighbors(["m.f", "m.C"], config=GraphConfig(context_tokens=0)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
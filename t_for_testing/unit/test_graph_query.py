@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+
+from config.settings import GraphConfig
+from core import graph_expansion
+from core.code_exceptions import GraphQueryError
+from core.graph_expansion import LocalGraphExpander
+from core.graph_query import StructuralQueryEngine, answer_structural, match_structural
+from graph_indexing.kgbuild.frozen import FrozenKG
+from graph_indexing.kgbuild.graph import KG
+
+
+def _graph() -> KG:
+    kg = KG()
+    for module in ("pkg.a", "pkg.b", "pkg.c"):
+        kg.add_node(module, "module", file=module.replace(".", "/") + ".py")
+    kg.add_node("pkg.a.Base", "class", file="pkg/a.py", name="Base")
+    kg.add_node("pkg.a.Base::doc", "docstring", text="Base of everything.")
+    kg.add_node("pkg.b.Child", "class", file="pkg/b.py", name="Child")
+    kg.add_node("pkg.a.helper", "function", file="pkg/a.py", name="helper")
+    kg.add_node("pkg.b.run", "function", file="pkg/b.py", name="run")
+    kg.add_node("pkg.c.main", "function", file="pkg/c.py", name="main")
+    kg.add_edge("pkg.a", "pkg.a.Base", "CONTAINS")
+    kg.add_edge("pkg.a.Base", "pkg.a.Base::doc", "HAS_DOC")
+    kg.add_edge("pkg.b.Child", "pkg.a.Base", "INHERITS")
+    # c -> b -> a, plus an external import
+    kg.add_edge("pkg.b", "pkg.a.helper", "IMPORTS")
+    kg.add_edge("pkg.b", "pkg.a.Base", "IMPORTS")
+    kg.add_edge("pkg.c", "pkg.b.run", "IMPORTS")
+    kg.add_edge("pkg.c", "typing.List", "IMPORTS")
+    kg.add_edge("pkg.b.run", "pkg.a.helper", "CALLS")
+    kg.add_edge("pkg.c.main", "pkg.b.run", "CALLS")
+    kg.add_edge("pkg.c.main", "print", "CALLS")
+    return kg
+
+
+class TestStructuralQueryEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = StructuralQueryEngine(FrozenKG.from_kg(_graph()), GraphConfig(query_limit=100))
+
+    def test_relations_and_closures(self):
+        engine = self.engine
+        self.assertEqual(engine.relation("callers", "pkg.a.helper"), ["pkg.b.run"])
+        self.assertEqual(engine.relation("callers", "pkg.a.helper", transitive=True), ["pkg.b.run", "pkg.c.main"])
+        self.assertEqual(engine.relation("callees", "pkg.c.main"), ["pkg.b.run", "print"])
+        self.assertEqual(engine.relation("subclasses", "pkg.a.Base"), ["pkg.b.Child"])
+        self.assertEqual(engine.importers("pkg.a"), ["pkg.b"])
+        self.assertEqual(engine.importers("typing"), ["pkg.c"])
+        self.assertEqual(engine.dependencies("pkg.b", transitive=True), ["pkg.a"])
+        self.assertEqual(engine.dependencies("pkg.c.main", transitive=True), ["pkg.a", "pkg.b"])
+        self.assertEqual(engine.dependents("pkg.a"), ["pkg.b"])
+        self.assertEqual(engine.dependents("pkg.a.helper", transitive=True), ["pkg.b", "pkg.c"])
+        # Closures are memoized per start node
+        self.assertEqual(engine._closures[("dependencies", "pkg.c")], ("pkg.b", "pkg.a"))
+        self.assertEqual(engine.resolve("helper"), "pkg.a.helper")
+        self.assertEqual(engine.resolve("b.run"), "pkg.b.run")
+        self.assertIsNone(engine.resolve("missing"))
+        with self.assertRaises(GraphQueryError):
+            engine.relation("friends", "pkg.a")
+
+    def test_cypher_subset(self):
+        script = """
+        // Find all functions
+        MATCH (n:Node {type: "function"}) RETURN n.id LIMIT 2;
+        CALL db.relationshipTypes();
+        MATCH (c:Node {type: "class"})-[:HAS_DOC]->(d:Node) RETURN c.id, d.text LIMIT 20;
+        """
+        (_, functions), (_, types), (_, docs) = self.engine.run_script(script)
+        self.assertEqual(functions.rows, [{"n.id": "pkg.a.helper"}, {"n.id": "pkg.b.run"}])
+        self.assertEqual([r["relationshipType"] for r in types.rows], ["CALLS", "CONTAINS", "HAS_DOC", "IMPORTS", "INHERITS"])
+        self.assertEqual(docs.rows, [{"c.id": "pkg.a.Base", "d.text": "Base of everything."}])
+
+        callers = self.engine.cypher(
+            "MATCH (a)-[r:CALLS|IMPORTS]->(b {id: 'pkg.b.run'}) WHERE a.id STARTS WITH 'pkg.c' "
+            "RETURN DISTINCT a.id AS src, type(r)"
+        )
+        self.assertEqual(callers.columns, ["src", "type(r)"])
+        self.assertEqual(callers.rows, [{"src": "pkg.c.main", "type(r)": "CALLS"}, {"src": "pkg.c", "type(r)": "IMPORTS"}])
+        # Edge-only endpoints are not nodes, as after loading into Neo4j
+        self.assertEqual(self.engine.cypher("MATCH (a)<-[:CALLS]-(b) RETURN count(*)").rows, [{"count(*)": 2}])
+        for bad in ("MATCH (n:Function) RETURN n", "MERGE (n) RETURN n", "MATCH (n) RETURN n.id + 1"):
+            with self.assertRaises(GraphQueryError):
+                self.engine.cypher(bad)
+
+
+class TestStructuralAnswers(unittest.TestCase):
+    def setUp(self):
+        config = GraphConfig(kg_path=os.path.join(tempfile.gettempdir(), "no-such-kg.json"))
+        graph_expansion._expander.set(LocalGraphExpander(FrozenKG.from_kg(_graph()), config))
+        self.addCleanup(graph_expansion._expander.reset)
+
+    def test_questions_answered_from_graph(self):
+        self.assertEqual(match_structural("Which modules depend on the pkg.a module?"), ("dependents", "pkg.a", False, "module"))
+        self.assertEqual(match_structural("What does `main` call?")[:2], ("callees", "main"))
+        self.assertIsNone(match_structural("How are dependencies resolved?"))
+
+        answer = answer_structural("Show me all components that call helper")
+        self.assertEqual(answer["answer"], "Callers of `pkg.a.helper` (1):\n- `pkg.b.run` [node:pkg.b.run]")
+        self.assertEqual(answer["references"], ["[node:pkg.b.run]"])
+        self.assertIn("`pkg.c` [node:pkg.c]", answer_structural("Which modules import typing?")["answer"])
+        # Names the graph does not know, and empty results, fall back to retrieval
+        self.assertIsNone(answer_structural("What calls frobnicate?"))
+        self.assertIsNone(answer_structural("What calls main?"))
+
+    def test_only_whole_structural_questions_match(self):
+        self.assertEqual(match_structural("Could you please list the callers of `helper()`?")[:2], ("callers", "helper"))
+        for question in (
+            "Where is the setup documented and how do I configure it?",
+            "How does pkg.b work, and which code calls helper?",
+            "Which code calls helper, and why?",
+            "Where is helper?",
+            "Where is helper called?",
+            "What is the purpose of the module that imports typing?",
+            "What does the runner call when it starts?",
+        ):
+            self.assertIsNone(match_structural(question), question)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import json
+import os
+import tempfile
+import unittest
+import uuid
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import chromadb
+
+import core.chunker as chunker
+from config.settings import IndexConfig
+from core.code_exceptions import EmbeddingError
+from core.index_manifest import ChunkLocations, IndexManifest
+
+
+FILE_A = "def alpha():\n    return 1\n\n\ndef beta():\n    return 2\n"
+FILE_B = "class Gamma:\n    def run(self):\n        return 3\n"
+
+
+class TestIncrementalIngest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name) / "src"
+        self.root.mkdir()
+        (self.root / "a.py").write_text(FILE_A, encoding="utf-8")
+        (self.root / "b.py").write_text(FILE_B, encoding="utf-8")
+
+        self.collection = chromadb.EphemeralClient().get_or_create_collection(
+            name=f"code_chunks_{uuid.uuid4().hex[:8]}", metadata={"hnsw:space": "cosine"}
+        )
+        self.embed = MagicMock(side_effect=lambda texts: [[0.1, 0.2, 0.3] for _ in texts])
+        self.invalidate = MagicMock(return_value=0)
+        self.manifest_path = manifest_path = str(Path(tmp.name) / "manifest.json")
+        for target, value in (
+            ("core.chunker.collection", self.collection),
+            ("core.batch_writer.embed_texts", self.embed),
+            ("core.chunker.invalidate_cached_references", self.invalidate),
+            ("core.chunker._manifest", lambda target=None: IndexManifest(manifest_path)),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_rerun_without_changes_embeds_nothing(self):
+        _, stored = chunker.ingest_folder(str(self.root))
+        self.assertEqual(stored, 4)
+        self.embed.reset_mock()
+
+        files, stored = chunker.ingest_folder(str(self.root))
+
+        self.assertEqual((files, stored), ([], 0))
+        self.embed.assert_not_called()
+        self.assertEqual(self.collection.count(), 4)
+
+    def test_edit_reembeds_only_changed_chunks(self):
+        chunker.ingest_folder(str(self.root))
+        before = set(self.collection.get()["ids"])
+        self.embed.reset_mock()
+
+        (self.root / "a.py").write_text(FILE_A.replace("return 2", "return 22"), encoding="utf-8")
+        files, stored = chunker.ingest_folder(str(self.root))
+
+        after = set(self.collection.get()["ids"])
+        self.assertEqual(files, [str(self.root / "a.py")])
+        self.assertEqual(stored, 1)
+        self.assertEqual(len(after), 4)
+        self.assertEqual(len(before - after), 1)  # old beta() chunk removed
+        stale = (before - after).pop()
+        self.assertIn(stale, self.invalidate.call_args.kwargs["chunk_ids"])
+
+    def test_failed_chunks_reembedded_next_run(self):
+        def embed(texts):
+            if any("return 3" in t for t in texts):
+                raise EmbeddingError("model unavailable")
+            return [[0.1, 0.2, 0.3] for _ in texts]
+
+        self.embed.side_effect = embed
+        _, stored = chunker.ingest_folder(str(self.root))
+        self.assertEqual(stored, 3)  # b.py's only chunk failed
+
+        self.embed.side_effect = lambda texts: [[0.1, 0.2, 0.3] for _ in texts]
+        files, stored = chunker.ingest_folder(str(self.root))
+
+        self.assertEqual((files, stored), ([str(self.root / "b.py")], 1))
+        self.assertEqual(self.collection.count(), 4)
+
+    def test_empty_collection_discards_manifest(self):
+        chunker.ingest_folder(str(self.root))
+        self.collection.delete(ids=self.collection.get()["ids"])
+
+        files, stored = chunker.ingest_folder(str(self.root))
+
+        self.assertEqual((len(files), stored), (2, 4))
+        self.assertEqual(self.collection.count(), 4)
+
+    def test_manifest_dir_follows_chroma_path(self):
+        with patch.dict("os.environ", {"CHROMA_PATH": "/data/chroma"}):
+            os.environ.pop("INDEX_MANIFEST_DIR", None)
+            self.assertEqual(IndexConfig.from_env().manifest_dir, os.path.join("/data/chroma", "index_manifests"))
+
+    def test_deleted_file_chunks_removed(self):
+        chunker.ingest_folder(str(self.root))
+        (self.root / "b.py").unlink()
+
+        chunker.ingest_folder(str(self.root))
+
+        files = {m["file"] for m in self.collection.get()["metadatas"]}
+        self.assertEqual(files, {str(self.root / "a.py")})
+
+    def test_rebuild_reindexes_everything(self):
+        chunker.ingest_folder(str(self.root))
+        self.embed.reset_mock()
+
+        _, stored = chunker.ingest_folder(str(self.root), rebuild=True)
+
+        self.assertEqual(stored, 4)
+        self.assertEqual(self.collection.count(), 4)
+
+    def test_chunking_change_rechunks_files(self):
+        chunker.ingest_folder(str(self.root))
+        with open(self.manifest_path, encoding="utf-8") as f:
+            data = json.load(f)
+        for files in data["roots"].values():
+            for entry in files.values():
+                del entry["chunking"]  # written before chunking was recorded
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        self.embed.reset_mock()
+
+        files, stored = chunker.ingest_folder(str(self.root))
+
+        self.assertEqual(sorted(files), [str(self.root / "a.py"), str(self.root / "b.py")])
+        self.assertEqual(stored, 0)  # identical chunks keep their embeddings
+        self.assertEqual(self.collection.count(), 4)
+
+    def test_identical_chunks_stored_once(self):
+        (self.root / "copy.py").write_text(FILE_A.replace("return 2", "return 22"), encoding="utf-8")
+
+        _, stored = chunker.ingest_folder(str(self.root))
+
+        self.assertEqual(stored, 5)  # alpha() is shared by a.py and copy.py
+        stored_chunks = self.collection.get()
+        alpha = [cid for cid, doc in zip(stored_chunks["ids"], stored_chunks["documents"]) if "def alpha" in doc]
+        self.assertEqual(len(alpha), 1)
+        files = [loc["file"] for loc in ChunkLocations(self.manifest_path).get(alpha)[alpha[0]]]
+        self.assertEqual(sorted(Path(f).name for f in files), ["a.py", "copy.py"])
+
+        (self.root / "a.py").unlink()
+        chunker.ingest_folder(str(self.root))
+        self.assertIn(alpha[0], self.collection.get()["ids"])  # still in copy.py
+
+        (self.root / "copy.py").unlink()
+        chunker.ingest_folder(str(self.root))
+        self.assertNotIn(alpha[0], self.collection.get()["ids"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from pathlib import Path
+
+from config.settings import IndexConfig
+from core.code_exceptions import IndexJobConflict
+from core.index_jobs import IndexJob, IndexJobManager
+from core.ingest_pipeline import IngestPipeline
+
+
+def _fake_job(path, rebuild, events, cancel, niceness, threads, kg_path=None):
+    """Stand-in for the indexing process: 'slow' runs until cancelled."""
+    events.put(("progress", {"files_total": 4, "files_done": 1, "chunks_embedded": 3, "chunks_written": 3}))
+    if path == "slow":
+        if cancel.wait(20):
+            events.put(("cancelled", None))
+            return
+    events.put(("done", {"indexed_files": ["a.py"], "stored": 3, "affected_chunk_ids": ["a.py::1"], "counts": {}}))
+
+
+def _pool_job(path, rebuild, events, cancel, niceness, threads, kg_path=None):
+    """Runs the real ingest pipeline, parsing in its process pool."""
+    from unittest.mock import patch
+
+    import chromadb
+
+    from core.ingest_pipeline import FileTask, IngestPipeline
+
+    files = sorted(Path(path).glob("*.py"))
+    tasks = [FileTask(rel=f.name, path=str(f), metadata={"file": str(f)}) for f in files]
+    collection = chromadb.EphemeralClient().get_or_create_collection(name=f"jobs_{uuid.uuid4().hex[:8]}")
+    try:
+        with patch("core.batch_writer.embed_texts", lambda texts: [[0.1, 0.2, 0.3] for _ in texts]):
+            result = IngestPipeline(collection, IndexConfig(parse_workers=2), cancelled=cancel.is_set).run(tasks)
+        events.put(("done", {"indexed_files": sorted(result.chunk_ids), "stored": len(result.written)}))
+    except Exception as exc:
+        events.put(("error", f"{type(exc).__name__}: {exc}"))
+
+
+def _wait_for(job, states, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while job.status not in states and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return job.status
+
+
+def _wait_for_progress(job, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not job.progress and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+class TestIndexJobManager(unittest.TestCase):
+    def test_job_succeeds_and_runs_hook(self):
+        finished = threading.Event()
+        manager = IndexJobManager(IndexConfig(job_niceness=0), on_success=lambda job: finished.set(), target=_fake_job)
+
+        job = manager.submit("fast")
+
+        self.assertEqual(_wait_for(job, ("succeeded", "failed")), "succeeded")
+        self.assertTrue(finished.wait(5))
+        snapshot = manager.get(job.id).snapshot()
+        self.assertEqual(snapshot["chunks_processed"], 3)
+        self.assertEqual(snapshot["indexed_files"], ["a.py"])
+
+    def test_one_active_job_per_collection_and_cancel(self):
+        manager = IndexJobManager(IndexConfig(job_niceness=0), target=_fake_job)
+        job = manager.submit("slow")
+        with self.assertRaises(IndexJobConflict):
+            manager.submit("fast")
+        other = manager.submit("fast", collection="node_embeddings")
+
+        manager.cancel(job.id)
+
+        self.assertEqual(_wait_for(job, ("cancelled", "failed")), "cancelled")
+        self.assertEqual(_wait_for(other, ("succeeded", "failed")), "succeeded")
+        # The collection is free again once the job has stopped
+        self.assertEqual(_wait_for(manager.submit("fast"), ("succeeded", "failed")), "succeeded")
+
+    def test_job_parses_in_a_process_pool(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(IngestPipeline.pool_min_files + 2):
+                Path(tmp, f"m{i}.py").write_text(f"def f{i}():\n    return {i}\n", encoding="utf-8")
+            manager = IndexJobManager(IndexConfig(job_niceness=0), target=_pool_job)
+
+            job = manager.submit(tmp)
+
+            self.assertEqual(_wait_for(job, ("succeeded", "failed"), timeout=60.0), "succeeded", job.error)
+            self.assertEqual(job.result["stored"], 10)
+
+    def test_shutdown_stops_running_jobs(self):
+        manager = IndexJobManager(IndexConfig(job_niceness=0), target=_fake_job)
+        job = manager.submit("slow")
+        _wait_for(job, ("running",))
+
+        manager.shutdown(timeout=10.0)
+
+        self.assertEqual(_wait_for(job, ("cancelled", "failed")), "cancelled")
+
+    def test_abandoned_job_does_not_block_exit(self):
+        script = (
+            "from config.settings import IndexConfig\n"
+            "from core.index_jobs import IndexJobManager\n"
+            "from t_for_testing.unit.test_index_jobs import _fake_job\n"
+            "from t_for_testing.unit.test_index_jobs import _wait_for_progress\n"
+            "_wait_for_progress(IndexJobManager(IndexConfig(job_niceness=0), target=_fake_job).submit('slow'))\n"
+        )
+        started = time.monotonic()
+        subprocess.run([sys.executable, "-c", script], check=True, timeout=60)
+        # The fake job would otherwise wait 20s for a cancel
+        self.assertLess(time.monotonic() - started, 15.0)
+
+    def test_events_after_exit_are_drained(self):
+        class Events:
+            def __init__(self):
+                self.items = [
+                    ("progress", {"files_total": 2, "files_done": 1}),
+                    ("progress", {"files_total": 2, "files_done": 2}),
+                    ("done", {"indexed_files": ["a.py", "b.py"], "stored": 4}),
+                ]
+                self.first = True
+
+            def get(self, timeout):
+                # Nothing arrived while the process was running
+                if self.first or not self.items:
+                    self.first = False
+                    raise queue.Empty
+                return self.items.pop(0)
+
+        class Exited:
+            exitcode = 0
+
+            def is_alive(self):
+                return False
+
+            def join(self, timeout=None):
+                pass
+
+        manager = IndexJobManager(IndexConfig(job_niceness=0), target=_fake_job)
+        job = IndexJob(id="j1", collection="code_chunks", path="src", status="running")
+
+        manager._monitor(job, Exited(), Events(), threading.Event())
+
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(job.result["stored"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
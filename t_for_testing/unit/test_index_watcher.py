@@ -0,0 +1,127 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import chromadb
+
+from config.settings import IndexConfig
+from core.embed_nodes import upsert_nodes
+from core.index_manifest import IndexManifest
+from core.index_watcher import IndexWatcher, update_index
+from graph_indexing.kgbuild.centrality import annotate_centrality
+from graph_indexing.kgbuild.runner import extract_project
+
+
+def _graph(data):
+    nodes = {node["id"]: node for node in data["nodes"]}
+    edges = sorted((e["src"], e["dst"], e["type"]) for e in data["edges"])
+    return nodes, edges
+
+
+class TestIndexWatcher(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / "a.py").write_text("x = 1\n", encoding="utf-8")
+        self.config = IndexConfig(
+            watch_backend="poll", watch_poll_interval_s=0.05, watch_debounce_ms=200, watch_max_delay_ms=5000
+        )
+
+    def _watch(self, on_batch):
+        watcher = IndexWatcher([str(self.root)], on_batch, self.config)
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        return watcher
+
+    def _wait(self, calls, n, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while len(calls) < n and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return len(calls)
+
+    def test_burst_of_saves_is_one_batch(self):
+        calls = []
+        self._watch(lambda root: calls.append(root) or True)
+        self.assertEqual(self._wait(calls, 1), 1)  # startup catch-up
+
+        for i in range(3):
+            (self.root / f"m{i}.py").write_text(f"y = {i}\n", encoding="utf-8")
+            time.sleep(0.02)
+        (self.root / "notes.txt").write_text("ignored", encoding="utf-8")
+
+        self.assertEqual(self._wait(calls, 2), 2)
+        time.sleep(0.5)
+        self.assertEqual(calls, [str(self.root.resolve())] * 2)
+
+    def test_busy_batch_is_retried(self):
+        calls = []
+        ready = threading.Event()
+
+        def on_batch(root):
+            calls.append(root)
+            return ready.is_set()
+
+        self._watch(on_batch)
+        self.assertGreaterEqual(self._wait(calls, 3), 3)  # still pending, retried on every tick
+        ready.set()
+        settled = self._wait(calls, 10 ** 6, timeout=0.3)
+        time.sleep(0.3)
+        self.assertEqual(len(calls), settled)
+
+
+class TestGraphPatch(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name) / "src"
+        self.root.mkdir()
+        (self.root / "a.py").write_text("def alpha():\n    return beta()\n\n\ndef beta():\n    return 2\n", encoding="utf-8")
+        (self.root / "b.py").write_text("class Gamma:\n    def run(self):\n        return 3\n", encoding="utf-8")
+        self.kg_path = str(Path(tmp.name) / "kg.json")
+
+        client = chromadb.EphemeralClient()
+        self.chunks = client.get_or_create_collection(f"code_chunks_{uuid.uuid4().hex[:8]}")
+        self.nodes = client.get_or_create_collection(f"node_embeddings_{uuid.uuid4().hex[:8]}")
+        manifest_path = str(Path(tmp.name) / "manifest.json")
+        for target, value in (
+            ("core.chunker.collection", self.chunks),
+            ("core.chunker._manifest", lambda target=None: IndexManifest(manifest_path)),
+            ("core.embed_nodes._open_collection", lambda chroma_path=None: self.nodes),
+            ("core.batch_writer.embed_texts", MagicMock(side_effect=lambda texts: [[0.1, 0.2, 0.3] for _ in texts])),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        graph = extract_project(str(self.root)).to_dict()
+        with open(self.kg_path, "w", encoding="utf-8") as f:
+            json.dump(graph, f)
+        upsert_nodes(self.nodes, graph["nodes"])
+        update_index(str(self.root))  # index chunks; graph already current
+
+    def test_patched_graph_matches_fresh_extraction(self):
+        (self.root / "a.py").write_text("def alpha():\n    return delta()\n\n\ndef delta():\n    return 4\n", encoding="utf-8")
+        (self.root / "b.py").unlink()
+        (self.root / "c.py").write_text("import a\n\n\ndef main():\n    a.alpha()\n", encoding="utf-8")
+
+        report = update_index(str(self.root), self.kg_path)
+
+        with open(self.kg_path, encoding="utf-8") as f:
+            patched = _graph(json.load(f))
+        self.assertEqual(patched, _graph(annotate_centrality(extract_project(str(self.root)).to_dict())))
+        self.assertIn("a.beta", report.affected_node_ids)
+        self.assertIn("b.Gamma.run", report.affected_node_ids)
+        stored = set(self.nodes.get()["ids"])
+        self.assertIn("a.delta", stored)
+        self.assertIn("c.main", stored)
+        self.assertFalse(stored & {"a.beta", "b.Gamma", "b.Gamma.run"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import queue
+import tempfile
+import unittest
+import uuid
+from pathlib import Path
+from unittest.mock import patch
+
+import chromadb
+
+from config.settings import IndexConfig
+from core.code_exceptions import IndexingCancelled
+from core.ingest_pipeline import _DONE, FileTask, IngestPipeline, PipelineResult, StageStats
+
+
+def _vectors(texts):
+    return [[0.1, 0.2, 0.3] for _ in texts]
+
+
+class TestIngestPipeline(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tasks = []
+        for i in range(10):
+            path = Path(tmp.name) / f"m{i}.py"
+            path.write_text(f"def f{i}():\n    return {i}\n\n\ndef g{i}():\n    return -{i}\n", encoding="utf-8")
+            self.tasks.append(FileTask(rel=path.name, path=str(path), metadata={"file": str(path)}))
+        self.collection = chromadb.EphemeralClient().get_or_create_collection(
+            name=f"code_chunks_{uuid.uuid4().hex[:8]}", metadata={"hnsw:space": "cosine"}
+        )
+
+    def test_process_pool_with_small_queues(self):
+        config = IndexConfig(write_batch_size=3, parse_workers=2, queue_size=1)
+        with patch("core.batch_writer.embed_texts", side_effect=_vectors) as embed:
+            result = IngestPipeline(self.collection, config).run(self.tasks)
+
+        self.assertEqual(self.collection.count(), 20)
+        self.assertEqual(sorted(result.chunk_ids), sorted(t.rel for t in self.tasks))
+        self.assertEqual(len(result.written), 20)
+        self.assertEqual(embed.call_count, 7)  # ceil(20 / 3)
+        parse, embed_stage, write = result.stages
+        self.assertEqual((parse.items, embed_stage.items, write.items), (10, 20, 20))
+        self.assertIn("rag.index.stage.write.items_per_s", result.span_attributes())
+
+    def test_stage_error_is_raised(self):
+        config = IndexConfig(write_batch_size=2, parse_workers=1, queue_size=1)
+        with patch("core.batch_writer.embed_texts", side_effect=RuntimeError("model down")):
+            with self.assertRaises(RuntimeError):
+                IngestPipeline(self.collection, config).run(self.tasks)
+        self.assertEqual(self.collection.count(), 0)
+
+    def test_cancelled_parse_does_not_flush_downstream(self):
+        checks = iter([False] * 3)
+        pipeline = IngestPipeline(self.collection, IndexConfig(parse_workers=1), cancelled=lambda: next(checks, True))
+        out: "queue.Queue" = queue.Queue()
+        with self.assertRaises(IndexingCancelled):
+            pipeline._parse_stage(self.tasks, out, StageStats("parse"), PipelineResult())
+
+        # Three parsed files and no end marker, so the embed stage never flushes them
+        items = [out.get_nowait() for _ in range(out.qsize())]
+        self.assertEqual(len(items), 3)
+        self.assertNotIn(_DONE, items)
+
+
+if __name__ == "__main__":
+    unittest.main()
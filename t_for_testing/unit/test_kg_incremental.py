@@ -0,0 +1,106 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import chromadb
+
+from core.embed_nodes import apply_graph_diff, embed_nodes, upsert_nodes
+import graph_indexing.kgbuild.runner as runner
+from graph_indexing.kgbuild.centrality import annotate_centrality
+from graph_indexing.kgbuild.kgio import convert, iter_nodes, read_graph
+from graph_indexing.kgbuild.runner import build_knowledge_graph, extract_project
+
+
+class TestIncrementalKG(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name) / "src"
+        self.root.mkdir()
+        (self.root / "a.py").write_text("def alpha():\n    return beta()\n\n\ndef beta():\n    return 2\n", encoding="utf-8")
+        (self.root / "b.py").write_text("class Gamma:\n    def run(self):\n        return 3\n", encoding="utf-8")
+        (self.root / "c.py").write_text("import a\n\n\ndef main():\n    a.alpha()\n", encoding="utf-8")
+        self.output = str(Path(tmp.name) / "kg.json")
+        patcher = patch("core.batch_writer.embed_texts", MagicMock(side_effect=lambda texts: [[0.1, 0.2] for _ in texts]))
+        self.embed = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _build(self):
+        with patch.object(runner, "extract_file", wraps=runner.extract_file) as spy:
+            diff = build_knowledge_graph(str(self.root), self.output, workers=1)
+        return diff, sorted(Path(call.args[0]).name for call in spy.call_args_list)
+
+    def test_rebuild_extracts_only_changed_files(self):
+        _, extracted = self._build()
+        self.assertEqual(extracted, ["a.py", "b.py", "c.py"])
+
+        (self.root / "a.py").write_text("def alpha():\n    return delta()\n\n\ndef delta():\n    return 4\n", encoding="utf-8")
+        (self.root / "b.py").unlink()
+        diff, extracted = self._build()
+
+        self.assertEqual(extracted, ["a.py"])
+        with open(self.output, encoding="utf-8") as f:
+            graph = json.load(f)
+        self.assertEqual(graph, annotate_centrality(extract_project(str(self.root)).to_dict(root_path=str(self.root))))
+        self.assertIn("a.delta", [node["id"] for node in diff.added_nodes])
+        self.assertTrue({"a.beta", "b.Gamma", "b.Gamma.run"} <= set(diff.removed_nodes))
+        self.assertIn({"src": "a.alpha", "dst": "a.beta", "type": "CALLS"}, diff.removed_edges)
+        self.assertIn({"src": "a.alpha", "dst": "a.delta", "type": "CALLS"}, diff.added_edges)
+
+        diff, extracted = self._build()
+        self.assertEqual(extracted, [])
+        self.assertTrue(diff.empty)
+
+    def test_diff_applies_to_node_embeddings(self):
+        self._build()
+        collection = chromadb.EphemeralClient().get_or_create_collection("kg_incremental_nodes")
+        self.addCleanup(chromadb.EphemeralClient().delete_collection, "kg_incremental_nodes")
+        with open(self.output, encoding="utf-8") as f:
+            upsert_nodes(collection, json.load(f)["nodes"])
+
+        (self.root / "b.py").unlink()
+        self._build()
+        with patch("core.embed_nodes.invalidate_cached_references"):
+            apply_graph_diff(str(Path(self.output).with_name("kg.diff.json")), collection)
+
+        stored = set(collection.get()["ids"])
+        self.assertIn("a.alpha", stored)
+        self.assertFalse(stored & {"b.Gamma", "b.Gamma.run"})
+
+    def test_reembedding_only_touches_changed_nodes(self):
+        self._build()
+        collection = chromadb.EphemeralClient().get_or_create_collection("kg_unchanged_nodes")
+        self.addCleanup(chromadb.EphemeralClient().delete_collection, "kg_unchanged_nodes")
+        with patch("core.embed_nodes.invalidate_cached_references") as invalidate:
+            embed_nodes(self.output, collection=collection)
+            self.embed.reset_mock()
+            embed_nodes(self.output, collection=collection)
+            self.embed.assert_not_called()
+            self.assertEqual(invalidate.call_args.kwargs["node_ids"], [])
+
+            (self.root / "b.py").write_text("class Gamma:\n    def run(self, n=0):\n        return n\n", encoding="utf-8")
+            self._build()
+            embed_nodes(self.output, collection=collection)
+
+        changed = invalidate.call_args.kwargs["node_ids"]
+        self.assertIn("b.Gamma.run", changed)
+        self.assertNotIn("a.alpha", changed)
+        self.assertEqual(sum(len(call.args[0]) for call in self.embed.call_args_list), len(changed))
+
+    def test_ndjson_graph_matches_json(self):
+        self._build()
+        streamed = str(Path(self.output).with_name("kg.ndjson.gz"))
+        self.assertEqual(convert(self.output, streamed)[0], len(read_graph(self.output)["nodes"]))
+        self.assertEqual(read_graph(streamed), read_graph(self.output))
+        self.assertEqual(list(iter_nodes(streamed)), read_graph(self.output)["nodes"])
+
+        collection = chromadb.EphemeralClient().get_or_create_collection("kg_ndjson_nodes")
+        self.addCleanup(chromadb.EphemeralClient().delete_collection, "kg_ndjson_nodes")
+        embed_nodes(streamed, collection=collection)
+        self.assertEqual(set(collection.get()["ids"]), {node["id"] for node in read_graph(self.output)["nodes"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from config.settings import Neo4jConfig
+from core.interfaces import GraphDatabase
+from core.loadneo import Neo4jImporter, export_admin_import
+from graph_indexing.kgbuild.centrality import annotate_centrality
+from graph_indexing.kgbuild.graph import KG
+from graph_indexing.kgbuild.kgio import write_graph
+
+
+class _RecordingGraphDatabase(GraphDatabase):
+    def __init__(self):
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def connect(self):
+        pass
+
+    def close(self):
+        pass
+
+    def expand_neighbors(self, node_ids, depth=1):
+        return []
+
+    def execute_query(self, query, **kwargs):
+        with self._lock:
+            self.queries.append((query, kwargs.get("batch")))
+
+
+def _graph() -> KG:
+    kg = KG()
+    kg.add_node("m.f", "function", file="m.py", line=1, tags=["a"])
+    kg.add_node("m.g", "function", file="m.py", line=5)
+    kg.add_node("m.C", "class", file="m.py", line=9)
+    kg.add_edge("m.f", "m.g", "CALLS")
+    kg.add_edge("m.f", "m.g", "CALLS")
+    kg.add_edge("m.f", "print", "CALLS")
+    kg.add_edge("m.C", "m.f", "CONTAINS")
+    return kg
+
+
+class TestNeo4jImporter(unittest.TestCase):
+    def test_edges_are_typed_merges_with_incremented_counts(self):
+        db = _RecordingGraphDatabase()
+        # One edge per batch: the duplicate call lands in two batches
+        importer = Neo4jImporter(db, Neo4jConfig(import_batch_size=1, import_workers=3))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kg.json")
+            write_graph(path, _graph())
+            importer.import_knowledge_graph(path)
+
+        counts = {}
+        for query, batch in db.queries:
+            self.assertNotIn("apoc", query)
+            for edge_type in ("CALLS", "CONTAINS"):
+                if f"[rel:{edge_type}]" in query:
+                    self.assertIn("SET rel.count = coalesce(rel.count, 0) + row.count", query)
+                    for row in batch:
+                        key = (edge_type, row["src"], row["dst"])
+                        counts[key] = counts.get(key, 0) + row["count"]
+        self.assertEqual(
+            counts,
+            {("CALLS", "m.f", "m.g"): 2, ("CALLS", "m.f", "print"): 1, ("CONTAINS", "m.C", "m.f"): 1},
+        )
+
+
+class TestAdminImportExport(unittest.TestCase):
+    def test_csv_files_for_neo4j_admin(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kg.ndjson")
+            write_graph(path, _graph())
+            # One edge per spill file, so duplicates are merged across files
+            with patch("core.loadneo.EXPORT_RUN_SIZE", 1):
+                command = export_admin_import(path, os.path.join(tmp, "csv"))
+
+            with open(os.path.join(tmp, "csv", "nodes.csv"), newline="", encoding="utf-8") as f:
+                nodes = list(csv.reader(f))
+            with open(os.path.join(tmp, "csv", "rels_CALLS.csv"), newline="", encoding="utf-8") as f:
+                calls = list(csv.reader(f))
+
+        self.assertEqual(
+            nodes[0],
+            ["id:ID", "type", "file", "line:long", "tags", "pagerank:double", "degree:long", "betweenness:double", ":LABEL"],
+        )
+        # Unscored graphs leave the score columns empty
+        self.assertIn(["m.f", "function", "m.py", "1", '["a"]', "", "", "", "Node"], nodes)
+        # The call to print has no node to point at
+        self.assertEqual(calls, [[":START_ID", ":END_ID", "count:long", ":TYPE"], ["m.f", "m.g", "2", "CALLS"]])
+        self.assertEqual(command[:4], ["neo4j-admin", "database", "import", "full"])
+        self.assertEqual(sum(arg.startswith("--relationships=") for arg in command), 2)
+
+    def test_centrality_scores_are_columns(self):
+        graph = annotate_centrality(_graph().to_dict())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "kg.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(graph, f)
+            export_admin_import(path, os.path.join(tmp, "csv"))
+            with open(os.path.join(tmp, "csv", "nodes.csv"), newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+
+        scores = {node["id"]: node["scores"] for node in graph["nodes"]}
+        for row in rows:
+            expected = scores[row["id:ID"]]
+            self.assertAlmostEqual(float(row["pagerank:double"]), expected["pagerank"])
+            self.assertEqual(int(row["degree:long"]), expected["degree"])
+            self.assertAlmostEqual(float(row["betweenness:double"]), expected["betweenness"])
+
+
+if __name__ == "__main__":
+    unittest.main()
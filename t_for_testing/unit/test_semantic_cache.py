@@ -0,0 +1,150 @@
+import threading
+import unittest
+import uuid
+from unittest.mock import patch
+
+import chromadb
+
+from core.semantic_cache import CacheStats, SemanticCache, invalidate_cached_references, reference_keys
+
+
+def _ephemeral_collection():
+    client = chromadb.EphemeralClient()
+    return client.get_or_create_collection(
+        name=f"semantic_cache_{uuid.uuid4().hex[:8]}",
+        metadata={"hnsw:space": "cosine"},
+    )
+
+
+class TestReferenceKeys(unittest.TestCase):
+    def test_parses_chunk_and_node_citations(self):
+        keys = reference_keys(["[chunk:routing.py::3]", "see [node:applications.FastAPI]", "plain"])
+        self.assertEqual(keys, {"chunk:routing.py::3", "node:applications.FastAPI"})
+
+
+class TestCacheInvalidation(unittest.TestCase):
+    def setUp(self):
+        self.collection = _ephemeral_collection()
+        patcher = patch("core.semantic_cache.get_cache_collection", return_value=self.collection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        embed = patch("core.semantic_cache.embed_text", return_value=[0.1, 0.2, 0.3])
+        embed.start()
+        self.addCleanup(embed.stop)
+
+    def test_evicts_only_entries_citing_changed_ids(self):
+        cache = SemanticCache(threshold=0.5)
+        cache.store("how does routing work", "a1", ["[chunk:routing.py::0]", "[node:routing.APIRouter]"])
+        cache.store("what is the test client", "a2", ["[chunk:testclient.py::1]"])
+
+        evicted = cache.invalidate(chunk_ids=["routing.py::0"])
+
+        self.assertEqual(evicted, 1)
+        remaining = self.collection.get()["ids"]
+        self.assertEqual(remaining, ["what is the test client"])
+
+    def test_index_rebuilt_from_collection(self):
+        SemanticCache(threshold=0.5).store("q", "a", ["[node:routing.APIRouter]"])
+
+        # A fresh instance (as used by the indexers) sees entries stored elsewhere.
+        evicted = SemanticCache(threshold=0.5).invalidate(node_ids=["routing.APIRouter"])
+
+        self.assertEqual(evicted, 1)
+        self.assertEqual(self.collection.count(), 0)
+
+    def test_restore_replaces_references(self):
+        cache = SemanticCache(threshold=0.5)
+        cache.invalidate(node_ids=["unused"])  # force the index to be built
+        cache.store("q", "a", ["[chunk:old.py::0]"])
+        cache.store("q", "a", ["[chunk:new.py::0]"])
+
+        self.assertEqual(cache.invalidate(chunk_ids=["old.py::0"]), 0)
+        self.assertEqual(cache.invalidate(chunk_ids=["new.py::0"]), 1)
+
+
+class TestExactTier(unittest.TestCase):
+    def setUp(self):
+        self.collection = _ephemeral_collection()
+        patcher = patch("core.semantic_cache.get_cache_collection", return_value=self.collection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_preload_serves_repeats_without_embedding(self):
+        with patch("core.semantic_cache.embed_text", return_value=[0.1, 0.2, 0.3]):
+            SemanticCache(threshold=0.5).store("How does routing work?", "a1", ["[chunk:routing.py::0]"])
+
+        cache = SemanticCache(threshold=0.5)
+        self.assertEqual(cache.preload(), 1)
+        with patch("core.semantic_cache.embed_text", side_effect=AssertionError("embedded")):
+            hit = cache.lookup("how does routing work")
+        self.assertEqual(hit["answer"], "a1")
+        self.assertEqual(hit["references"], ["[chunk:routing.py::0]"])
+
+    def test_invalidation_clears_exact_tier(self):
+        with patch("core.semantic_cache.embed_text", return_value=[0.1, 0.2, 0.3]):
+            cache = SemanticCache(threshold=0.5)
+            cache.store("q one", "a1", ["[node:n1]"])
+            cache.invalidate(node_ids=["n1"])
+            self.assertIsNone(cache.lookup("q one"))
+
+    def test_module_invalidation_reaches_live_instances(self):
+        with patch("core.semantic_cache.embed_text", return_value=[0.1, 0.2, 0.3]):
+            cache = SemanticCache(threshold=0.5)
+            cache.store("q one", "a1", ["[chunk:a.py::1]"])
+            self.assertEqual(invalidate_cached_references(chunk_ids=["a.py::1"]), 1)
+            self.assertIsNone(cache.lookup("q one"))
+
+
+class TestCacheStats(unittest.TestCase):
+    def setUp(self):
+        self.collection = _ephemeral_collection()
+        patcher = patch("core.semantic_cache.get_cache_collection", return_value=self.collection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_counts_hits_misses_and_evictions(self):
+        with patch("core.semantic_cache.embed_text", return_value=[0.1, 0.2, 0.3]):
+            cache = SemanticCache(threshold=0.5, min_overlap=0.3)
+            self.assertIsNone(cache.lookup("anything"))  # empty cache
+            cache.store("how does routing work", "a1", ["[chunk:routing.py::0]"])
+            cache.lookup("how does routing work")  # exact tier
+            cache.lookup("completely unrelated words")  # same vector, rejected lexically
+            cache.invalidate(chunk_ids=["routing.py::0"])
+            stats = cache.get_stats()
+
+        self.assertEqual(stats["exact_hits"], 1)
+        self.assertEqual(stats["vector_misses"], 2)
+        self.assertEqual(stats["empty_misses"], 1)
+        self.assertEqual(stats["lexical_rejections"], 1)
+        self.assertEqual(stats["miss_similarity_histogram"], {"0.95-1.00": 1})
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["entries"], 0)
+
+    def test_llm_time_saved_uses_average_generation(self):
+        stats = CacheStats()
+        stats.record_generation(1000.0)
+        stats.record_generation(3000.0)
+        stats.record_exact(hit=True)
+        stats.record_vector_hit()
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["avg_generation_ms"], 2000.0)
+        self.assertEqual(snapshot["llm_ms_saved_estimate"], 4000.0)
+
+    def test_paused_thread_is_not_counted(self):
+        stats = CacheStats()
+        with stats.paused():
+            stats.record_exact(hit=False)
+            stats.record_vector_miss(0.4)
+            stats.record_generation(1000.0)
+            other = threading.Thread(target=stats.record_vector_hit)
+            other.start()
+            other.join()
+        stats.record_exact(hit=True)
+        snapshot = stats.snapshot()
+        self.assertEqual((snapshot["exact_hits"], snapshot["exact_misses"]), (1, 0))
+        self.assertEqual((snapshot["vector_hits"], snapshot["vector_misses"]), (1, 0))
+        self.assertEqual(snapshot["avg_generation_ms"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
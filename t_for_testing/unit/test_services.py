@@ -4,7 +4,9 @@ from unittest.mock import MagicMock, patch
 
 from config.settings import EmbeddingConfig, GraphRAGConfig, ChromaConfig, Neo4jConfig, LLMConfig, CacheConfig
 from core.embeddings import SentenceTransformerEmbedding
-from core.services import SemanticCacheProvider, GroqLLMProvider, JSONDocumentProcessor
+from config.settings import GraphConfig
+from core.code_exceptions import Neo4jError
+from core.services import SemanticCacheProvider, GroqLLMProvider, JSONDocumentProcessor, Neo4jGraphDatabase
 
 
 class TestEmbeddingService(unittest.TestCase):
@@ -70,5 +72,75 @@ class TestJSONDocumentProcessor(unittest.TestCase):
         self.assertTrue(isinstance(docs, list) or isinstance(docs, dict))
 
 
+class _FakeTx:
+    def __init__(self, rows):
+        self.rows = rows
+        self.runs = []
+
+    def run(self, query, **params):
+        self.runs.append((query, params))
+        return self.rows
+
+
+class _FakeSession:
+    def __init__(self, tx):
+        self.tx = tx
+        self.reads = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_read(self, work):
+        self.reads += 1
+        return work(self.tx)
+
+
+class TestNeo4jGraphDatabase(unittest.TestCase):
+    def setUp(self):
+        self.config = Neo4jConfig(uri="bolt://fake", username="neo4j", password="pw", use_neo4j=True)
+        self.driver = MagicMock()
+        self.tx = _FakeTx([{"id": "m.b"}, {"id": "m.c"}])
+        self.session = _FakeSession(self.tx)
+        self.driver.session.return_value = self.session
+        patcher = patch("core.services._open_neo4j_driver", return_value=self.driver)
+        self.open_driver = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_expansion_is_one_read_query_for_all_seeds(self):
+        db = Neo4jGraphDatabase(self.config, GraphConfig(edge_types=("CALLS", "INHERITS"), max_neighbors=7))
+        db.connect()
+        self.addCleanup(db.close)
+
+        self.assertEqual(db.expand_neighbors(["m.a", "m.x", "m.a"], depth=2), ["m.b", "m.c"])
+        self.assertEqual(self.session.reads, 1)
+        query, params = self.tx.runs[0]
+        self.assertIn("MATCH (n:Node {id: id})", query)
+        # One distinct expansion per hop, no variable-length path enumeration
+        self.assertEqual(query.count("MATCH (f)-[:CALLS|INHERITS]-(m:Node)"), 2)
+        self.assertNotIn("*", query)
+        self.assertIn("LIMIT $limit", query)
+        self.assertEqual(params, {"ids": ["m.a", "m.x"], "limit": 7})
+
+    def test_instances_share_one_driver(self):
+        first, second = Neo4jGraphDatabase(self.config), Neo4jGraphDatabase(self.config)
+        first.connect()
+        second.connect()
+        self.assertEqual(self.open_driver.call_count, 1)
+        first.close()
+        self.driver.close.assert_not_called()
+        second.close()
+        self.driver.close.assert_called_once()
+
+    def test_rejects_invalid_edge_types(self):
+        db = Neo4jGraphDatabase(self.config, GraphConfig(edge_types=("CALLS]-() DETACH DELETE (n",)))
+        db.connect()
+        self.addCleanup(db.close)
+        with self.assertRaises(Neo4jError):
+            db.expand_neighbors(["m.a"])
+
+
 if __name__ == "__main__":
     unittest.main()
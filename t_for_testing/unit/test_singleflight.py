@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+
+from core.singleflight import SingleFlight, coalesce_key
+
+
+class TestCoalesceKey(unittest.TestCase):
+    def test_near_identical_questions_share_key(self):
+        a = coalesce_key("How does routing work?", llm={"temperature": 0.2})
+        b = coalesce_key("  how does   ROUTING work ", llm={"temperature": 0.2})
+        self.assertEqual(a, b)
+
+    def test_llm_params_split_keys(self):
+        a = coalesce_key("q", llm={"temperature": 0.2})
+        b = coalesce_key("q", llm={"temperature": 0.7})
+        self.assertNotEqual(a, b)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_run_once(self):
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def work():
+            calls.append(1)
+            release.wait(2)
+            return {"answer": "shared"}
+
+        results = []
+
+        def caller():
+            results.append(flight.do("k", work))
+
+        threads = [threading.Thread(target=caller) for _ in range(5)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r[0]["answer"] for r in results], ["shared"] * 5)
+        self.assertEqual(sum(1 for _, shared in results if not shared), 1)
+
+    def test_error_propagates_to_followers(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def work():
+            release.wait(2)
+            raise RuntimeError("boom")
+
+        def caller():
+            try:
+                flight.do("k", work)
+            except RuntimeError as exc:
+                errors.append(str(exc))
+
+        threads = [threading.Thread(target=caller) for _ in range(3)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join(2)
+
+        self.assertEqual(errors, ["boom"] * 3)
+
+    def test_stream_subscribers_share_tokens(self):
+        flight = SingleFlight()
+        produced = []
+        gate = threading.Event()
+
+        def tokens():
+            produced.append(1)
+            yield "A"
+            gate.wait(2)
+            yield "B"
+            yield "C"
+
+        first = flight.stream("k", tokens)
+        self.assertEqual(next(first), "A")
+        second = flight.stream("k", tokens)  # joins mid-stream and replays "A"
+        gate.set()
+
+        self.assertEqual("A" + "".join(first), "ABC")
+        self.assertEqual("".join(second), "ABC")
+        self.assertEqual(len(produced), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from core import startup
+from core.startup import LazyService, warm_up
+
+
+class TestLazyService(unittest.TestCase):
+    def test_concurrent_gets_create_once(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        service = LazyService("test_concurrent", factory)
+        self.addCleanup(startup._services.pop, "test_concurrent", None)
+        values = []
+        threads = [threading.Thread(target=lambda: values.append(service.get())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(value) for value in values}), 1)
+        self.assertTrue(service.ready)
+        self.assertIsNotNone(service.init_ms)
+
+    def test_reset_and_set(self):
+        counter = iter(range(10))
+        service = LazyService("test_reset", lambda: next(counter))
+        self.addCleanup(startup._services.pop, "test_reset", None)
+        self.assertFalse(service.ready)
+        self.assertEqual(service.get(), 0)
+
+        service.reset()
+        self.assertFalse(service.ready)
+        self.assertIsNone(service.init_ms)
+        self.assertEqual(service.get(), 1)
+
+        service.set(42)
+        self.assertEqual(service.get(), 42)
+        self.assertEqual(next(counter), 2)
+
+
+def _failing_warmer():
+    raise RuntimeError("model missing")
+
+
+def _slow_warmer():
+    time.sleep(0.02)
+
+
+class TestWarmUp(unittest.TestCase):
+    def test_failing_warmer_is_reported_and_budget_flagged(self):
+        warmers = {
+            "broken": f"{__name__}:_failing_warmer",
+            "slow": f"{__name__}:_slow_warmer",
+        }
+        with patch.dict("core.startup.WARMERS", warmers):
+            report = warm_up(["broken", "slow", "unknown"], budget_ms=1)
+
+        self.assertEqual(report.errors, {"broken": "model missing"})
+        self.assertEqual(list(report.timings_ms), ["slow"])
+        self.assertTrue(report.over_budget)
+        self.assertTrue(report.to_dict()["over_budget"])
+
+    def test_within_budget(self):
+        with patch.dict("core.startup.WARMERS", {"slow": f"{__name__}:_slow_warmer"}):
+            report = warm_up(["slow"], budget_ms=60_000)
+        self.assertFalse(report.over_budget)
+        self.assertEqual(report.errors, {})
+
+    def test_import_opens_nothing(self):
+        # A fresh interpreter, since other tests have already created the services
+        script = (
+            "import sys\n"
+            "from unittest.mock import patch\n"
+            "with patch('chromadb.PersistentClient') as client, "
+            "patch('core.embeddings._sentence_transformer_class') as model:\n"
+            "    import core.chunker, core.graphrag\n"
+            "assert not client.called, 'Chroma opened at import'\n"
+            "assert not model.called, 'embedding model loaded at import'\n"
+            "assert 'sentence_transformers' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True, timeout=120)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import libcst as cst
+
+import graph_indexing.kgbuild.runner as runner
+from core.code_splitter import extract_blocks, parse_file
+from graph_indexing.kgbuild.graph import KG, Resolver
+from graph_indexing.kgbuild.python_extractor import PyExtract
+from graph_indexing.kgbuild.unified import parse_source
+
+SAMPLE = '''"""Module docstring."""
+import os.path
+import json as j
+from collections import abc, OrderedDict as OD
+from . import sibling
+from .pkg.mod import thing
+
+
+# Leading comment of Base
+class Base(abc.Mapping, OD):
+    """Base docstring."""
+
+    # comment on method
+    @staticmethod
+    def helper(x):
+        return os.path.join(j.dumps(x), thing(x))
+
+    class Inner:
+        def deep(self):
+            self.helper(1)
+            # trailing comment inside deep
+
+    # comment after Inner
+
+def top(a, b):
+    \'\'\'
+        Indented docstring.
+    \'\'\'
+    return Base().helper(sibling(a) + b)
+'''
+
+
+def _edges(kg):
+    return sorted((e["src"], e["dst"], e["type"]) for e in kg.edges)
+
+
+class TestUnifiedParse(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.path = Path(tmp.name) / "pkg" / "sample.py"
+        self.path.parent.mkdir()
+        self.path.write_text(SAMPLE, encoding="utf-8")
+
+    def test_graph_matches_libcst_extractor(self):
+        expected = KG()
+        cst.parse_module(SAMPLE).visit(PyExtract(str(self.path), self.root, expected, Resolver()))
+
+        parsed = parse_source(str(self.path), self.root)
+
+        self.assertIsNone(parsed.error)
+        self.assertEqual(parsed.kg.nodes, expected.nodes)
+        self.assertEqual(_edges(parsed.kg), _edges(expected))
+        self.assertIn(("pkg.sample", "os.path", "IMPORTS"), _edges(parsed.kg))
+        self.assertEqual(parsed.kg.nodes["pkg.sample.Base"]["props"]["signature"], "class Base(abc.Mapping, OD)")
+        self.assertEqual(parsed.kg.nodes["pkg.sample.Base.helper"]["props"]["signature"], "def helper(x)")
+
+    def test_chunks_are_tagged_with_their_graph_node(self):
+        parsed = parse_source(str(self.path), self.root)
+        self.assertEqual([b.text for b in parsed.blocks], extract_blocks(SAMPLE))
+
+        chunks = parse_file(str(self.path), self.root, with_graph=True)
+        self.assertEqual(list(zip(chunks.kg_nodes, chunks.parents)), [
+            ("pkg.sample.Base", None),
+            ("pkg.sample.Base.helper", "pkg.sample.Base"),
+            ("pkg.sample.Base.Inner", "pkg.sample.Base"),
+            ("pkg.sample.Base.Inner.deep", "pkg.sample.Base.Inner"),
+            ("pkg.sample.top", None),
+        ])
+        self.assertTrue(set(chunks.kg_nodes) <= set(chunks.graph.nodes))
+
+    def test_class_chunks_are_skeletons(self):
+        skeleton, helper, inner, deep, _ = parse_source(str(self.path), self.root).blocks
+
+        self.assertIn('"""Base docstring."""', skeleton.text)
+        self.assertIn("@staticmethod\n    def helper(x):\n        ...", skeleton.text)
+        self.assertIn("class Inner:\n        ...", skeleton.text)
+        self.assertNotIn("os.path.join", skeleton.text)
+        self.assertNotIn("self.helper(1)", inner.text)
+        # Each line of code is embedded exactly once
+        self.assertEqual(sum(b.text.count("self.helper(1)") for b in (skeleton, helper, inner, deep)), 1)
+
+    def test_syntax_errors_keep_what_parses(self):
+        self.path.write_text("def ok():\n    return 1\n\ndef broken(:\n", encoding="utf-8")
+        parsed = parse_source(str(self.path), self.root)
+        self.assertIsNotNone(parsed.error)
+        self.assertIn("pkg.sample.ok", parsed.kg.nodes)
+
+    def test_parallel_extraction_matches_serial(self):
+        for i in range(6):
+            (Path(self.root) / "pkg" / f"mod{i}.py").write_text(
+                f"from pkg.sample import top\n\n\ndef f{i}():\n    return top({i}, {i})\n", encoding="utf-8"
+            )
+        serial = runner.extract_project(self.root, workers=1).to_dict()
+        with patch.object(runner, "POOL_MIN_FILES", 2):
+            parallel = runner.extract_project(self.root, workers=3).to_dict()
+        self.assertEqual(parallel, serial)
+        self.assertIn({"src": "pkg.mod3.f3", "dst": "pkg.sample.top", "type": "CALLS"}, parallel["edges"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import threading
+import unittest
+
+from config.settings import WriteBehindConfig
+from core.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+    def test_batches_writes_and_flushes(self):
+        writer = WriteBehindQueue(WriteBehindConfig(batch_size=8, linger_s=0.05))
+        self.addCleanup(writer.shutdown)
+        batches = []
+        writer.register("cache.store", batches.append)
+
+        for i in range(10):
+            self.assertTrue(writer.submit("cache.store", i))
+        self.assertTrue(writer.flush(timeout=2))
+
+        self.assertEqual(sorted(x for b in batches for x in b), list(range(10)))
+        self.assertLess(len(batches), 10)
+        self.assertEqual(writer.pending(), 0)
+
+    def test_drops_when_full(self):
+        writer = WriteBehindQueue(WriteBehindConfig(max_pending=1, batch_size=1, linger_s=0))
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow(batch):
+            started.set()
+            release.wait(2)
+
+        writer.register("history.append", slow)
+        self.assertTrue(writer.submit("history.append", 1))
+        started.wait(2)
+        self.assertTrue(writer.submit("history.append", 2))
+        self.assertFalse(writer.submit("history.append", 3))
+        self.assertEqual(writer.dropped, 1)
+        release.set()
+        writer.shutdown()
+
+    def test_shutdown_applies_pending_writes(self):
+        writer = WriteBehindQueue(WriteBehindConfig(linger_s=0))
+        seen = []
+        writer.register("cache.store", seen.extend)
+        writer.submit("cache.store", "a")
+        writer.shutdown()
+        self.assertEqual(seen, ["a"])
+        self.assertFalse(writer.submit("cache.store", "b"))
+
+    def test_handler_errors_do_not_stop_worker(self):
+        writer = WriteBehindQueue(WriteBehindConfig(batch_size=1, linger_s=0))
+        self.addCleanup(writer.shutdown)
+        seen = []
+
+        def flaky(batch):
+            if batch == ["bad"]:
+                raise RuntimeError("boom")
+            seen.extend(batch)
+
+        writer.register("cache.store", flaky)
+        writer.submit("cache.store", "bad")
+        writer.submit("cache.store", "good")
+        writer.flush(timeout=2)
+        self.assertEqual(seen, ["good"])
+
+
+if __name__ == "__main__":
+    unittest.main()